@@ -5,29 +5,41 @@ V7 is not robust because it adapts to stress.
 It is robust because stress has nowhere to propagate.
 """
 
+import argparse
+import hashlib
 import json
 import random
 import numpy as np
-import matplotlib.pyplot as plt
+
+import instrument
+from metrics_stream import (CHUNK_SIZE, OutcomeAccumulator, accumulate_adaptive, accumulate_chunks,
+                            paired_delta)
+from rare_events import DEFENSIVE, IS_SAMPLES, structurally_zero, tilted_uniform, weighted_rate
+from result_cache import default_cache, memoize
 
 random.seed(42)
 np.random.seed(42)
 
 N_SAMPLES = 2000
+ROOT_SEED = 42
+ADAPTIVE_TOL = 0.05       # half-width of the 95% CI on effective
+ADAPTIVE_CAT_TOL = 0.25   # half-width of the 95% CI on cat_rate, percentage points
+MAX_SAMPLES = 1_000_000
+EROSION_LEVELS = np.linspace(0, 0.5, 1001)
+EROSION_CURVE_SAMPLES = 1_000_000
 
 def calc_effective(outcomes, cat_penalty_weight=2.0):
-    arr = np.array(outcomes)
-    mean = arr.mean()
-    std = arr.std()
-    catastrophic = sum(1 for x in outcomes if x < 0)
-    cat_rate = catastrophic / len(outcomes)
-    effective = mean - 0.5 * std - cat_penalty_weight * cat_rate * 10
+    return effective_metrics(OutcomeAccumulator().update(outcomes), cat_penalty_weight)
+
+def effective_metrics(acc, cat_penalty_weight=2.0):
+    """calc_effective metrics from a streaming OutcomeAccumulator."""
+    effective = acc.effective(lambda_weight=0.5, mu_weight=cat_penalty_weight)
     return {
-        "mean": round(mean, 2),
-        "std": round(std, 2),
-        "min": round(arr.min(), 2),
-        "catastrophic": catastrophic,
-        "cat_rate": round(cat_rate * 100, 1),
+        "mean": round(acc.mean, 2),
+        "std": round(acc.std, 2),
+        "min": round(acc.min, 2),
+        "catastrophic": acc.catastrophic,
+        "cat_rate": round(acc.cat_fraction * 100, 1),
         "effective": round(effective, 2)
     }
 
@@ -43,225 +55,506 @@ def simulate_system(n, system_type, twist_config=None):
     exec_spike = cfg.get('exec_spike', 1.0)
     obs_noise = cfg.get('obs_noise', 0)
     
+    trace = instrument.start("stress.simulate_system", n=n, system=system_type, twist=cfg)
+    uniform = instrument.counted(random.random, trace, "uniform")
+    normal = instrument.counted(np.random.normal, trace, "normal")
+    
     outcomes = []
     
     for _ in range(n):
-        latent = np.random.normal(6.0, 1.5)
-        freedom = min(1.0, random.random() + freedom_boost)
+        latent = normal(6.0, 1.5)
+        freedom = min(1.0, uniform() + freedom_boost)
         
         if system_type == 'V7':
-            if random.random() < structure_erosion:
+            if uniform() < structure_erosion:
+                if trace:
+                    trace.count("eroded")
                 if freedom > 0.5:
-                    cost = random.random() * 0.6
+                    cost = uniform() * 0.6
                 else:
-                    cost = random.random() * 0.4
+                    cost = uniform() * 0.4
             else:
                 if freedom > 0.5:
-                    cost = random.random() * 0.1
+                    cost = uniform() * 0.1
                 else:
-                    cost = random.random() * 0.5
+                    cost = uniform() * 0.5
             
-            latent -= obs_noise * random.random()
+            latent -= obs_noise * uniform()
             
             if structure_erosion > 0 and freedom > 0.6 and cost > 0.4:
-                if random.random() < structure_erosion * 0.5:
+                if trace:
+                    trace.count("danger")
+                if uniform() < structure_erosion * 0.5:
+                    if trace:
+                        trace.count("catastrophic")
                     outcomes.append(cat_penalty)
                     continue
             
-            outcome = max(2.0 - obs_noise, min(10, latent + np.random.normal(0, 0.5)))
+            outcome = max(2.0 - obs_noise, min(10, latent + normal(0, 0.5)))
             outcomes.append(outcome)
         
         else:
-            cost = random.random()
+            cost = uniform()
             danger_threshold = 0.5 if system_type == 'S1' else 0.4
             cat_prob = 0.12 if system_type == 'S1' else 0.08
             
             cat_prob *= exec_spike
             
             if freedom > danger_threshold and cost > danger_threshold:
-                if random.random() < cat_prob:
+                if trace:
+                    trace.count("danger")
+                if uniform() < cat_prob:
+                    if trace:
+                        trace.count("catastrophic")
                     outcomes.append(cat_penalty)
                     continue
-                latent += np.random.normal(0, 1.5 * exec_spike)
+                latent += normal(0, 1.5 * exec_spike)
             
-            outcome = max(0, min(10, latent + np.random.normal(0, 1.0)))
+            outcome = max(0, min(10, latent + normal(0, 1.0)))
             outcomes.append(outcome)
     
+    if trace:
+        trace.finish()
+    return outcomes
+
+def simulate_system_batch(n, system_type, twist_config=None, rng=None):
+    """
+    Vectorized simulate_system: all n samples are drawn as arrays and the
+    S1/S2/V7 branch rules are applied as boolean masks.
+
+    Same outcome distribution as simulate_system (not the same stream).
+    rng: np.random.Generator, or a seed for np.random.default_rng
+    """
+    cfg = twist_config or {}
+    rng = np.random.default_rng(rng)
+    trace = instrument.start("stress.simulate_system_batch", n=n, system=system_type, twist=cfg)
+    
+    latent = rng.normal(6.0, 1.5, n)
+    freedom = np.minimum(1.0, rng.random(n) + cfg.get('freedom_boost', 0))
+    outcomes, catastrophic = SYSTEM_BRANCHES[system_type](rng, latent, freedom, system_type, cfg, trace)
+    
+    outcomes[catastrophic] = cfg.get('cat_penalty', -10)
+    if trace:
+        trace.count("catastrophic", np.count_nonzero(catastrophic))
+        trace.finish()
     return outcomes
 
-print("=" * 70)
-print("ADVERSARIAL STRESS TEST")
-print("=" * 70)
-
-results = {}
-
-print("\n[BASELINE] Normal Conditions")
-print("-" * 50)
-for sys in ['S1', 'S2', 'V7']:
-    outcomes = simulate_system(N_SAMPLES, sys)
-    metrics = calc_effective(outcomes)
-    results[f"baseline_{sys}"] = metrics
-    print(f"  {sys}: Eff={metrics['effective']}, Cat={metrics['cat_rate']}%")
-
-print("\n[TWIST 1] Cost Inflation: penalty -10 → -50")
-print("-" * 50)
-for sys in ['S1', 'S2', 'V7']:
-    outcomes = simulate_system(N_SAMPLES, sys, {'cat_penalty': -50})
-    metrics = calc_effective(outcomes)
-    results[f"twist1_{sys}"] = metrics
-    baseline_eff = results[f"baseline_{sys}"]['effective']
-    delta = metrics['effective'] - baseline_eff
-    print(f"  {sys}: Eff={metrics['effective']} (Δ={delta:+.2f}), Cat={metrics['cat_rate']}%")
-
-print("\n[TWIST 2] Freedom Injection: +0.3 boost")
-print("-" * 50)
-for sys in ['S1', 'S2', 'V7']:
-    outcomes = simulate_system(N_SAMPLES, sys, {'freedom_boost': 0.3})
-    metrics = calc_effective(outcomes)
-    results[f"twist2_{sys}"] = metrics
-    print(f"  {sys}: Eff={metrics['effective']}, Cat={metrics['cat_rate']}%")
-
-print("\n[TWIST 3] Structure Erosion (V7 only): 30% constraint failure")
-print("-" * 50)
-outcomes = simulate_system(N_SAMPLES, 'V7', {'structure_erosion': 0.3})
-metrics = calc_effective(outcomes)
-results["twist3_V7_eroded"] = metrics
-print(f"  V7 (eroded): Eff={metrics['effective']}, Cat={metrics['cat_rate']}%")
-print(f"  → Catastrophic appears ONLY when structure breaks")
-
-print("\n[TWIST 4] Execution Spike: 2x execution rate")
-print("-" * 50)
-for sys in ['S1', 'S2', 'V7']:
-    outcomes = simulate_system(N_SAMPLES, sys, {'exec_spike': 2.0})
-    metrics = calc_effective(outcomes)
-    results[f"twist4_{sys}"] = metrics
-    print(f"  {sys}: Eff={metrics['effective']}, Std={metrics['std']}, Cat={metrics['cat_rate']}%")
-
-print("\n[TWIST 5] Observation Noise: info degradation")
-print("-" * 50)
-for sys in ['S1', 'S2', 'V7']:
-    outcomes = simulate_system(N_SAMPLES, sys, {'obs_noise': 1.5})
-    metrics = calc_effective(outcomes)
-    results[f"twist5_{sys}"] = metrics
-    print(f"  {sys}: Eff={metrics['effective']}, Cat={metrics['cat_rate']}%")
-
-with open("results/adversarial_stress_results.json", "w") as f:
-    json.dump(results, f, indent=2)
-print("\n✅ Saved: results/adversarial_stress_results.json")
-
-fig, axes = plt.subplots(2, 3, figsize=(15, 10), facecolor='white')
-
-twists = ['baseline', 'twist1', 'twist2', 'twist4', 'twist5']
-twist_names = ['Baseline', 'Cost Inflation\n(-10→-50)', 'Freedom\nInjection', 
-               'Execution\nSpike (2x)', 'Observation\nNoise']
-
-ax = axes[0, 0]
-x = np.arange(len(twists))
-width = 0.25
-s1_eff = [results[f"{t}_S1"]['effective'] for t in twists]
-s2_eff = [results[f"{t}_S2"]['effective'] for t in twists]
-v7_eff = [results[f"{t}_V7"]['effective'] for t in twists]
-
-ax.bar(x - width, s1_eff, width, label='S1', color='#e53935', alpha=0.8)
-ax.bar(x, s2_eff, width, label='S2', color='#FFC107', alpha=0.8)
-ax.bar(x + width, v7_eff, width, label='V7', color='#26a69a', alpha=0.8)
-ax.set_ylabel('Effective Performance')
-ax.set_title('Effective Performance Under Stress', weight='bold')
-ax.set_xticks(x)
-ax.set_xticklabels(twist_names, fontsize=8)
-ax.legend()
-ax.axhline(y=0, color='#cc0000', linestyle='--', alpha=0.5)
-
-ax = axes[0, 1]
-s1_cat = [results[f"{t}_S1"]['cat_rate'] for t in twists]
-s2_cat = [results[f"{t}_S2"]['cat_rate'] for t in twists]
-v7_cat = [results[f"{t}_V7"]['cat_rate'] for t in twists]
-
-ax.bar(x - width, s1_cat, width, label='S1', color='#e53935', alpha=0.8)
-ax.bar(x, s2_cat, width, label='S2', color='#FFC107', alpha=0.8)
-ax.bar(x + width, v7_cat, width, label='V7', color='#26a69a', alpha=0.8)
-ax.set_ylabel('Catastrophic Rate (%)')
-ax.set_title('Catastrophic Rate Under Stress', weight='bold')
-ax.set_xticks(x)
-ax.set_xticklabels(twist_names, fontsize=8)
-ax.legend()
-
-ax = axes[0, 2]
-erosion_levels = [0, 0.1, 0.2, 0.3, 0.4, 0.5]
-erosion_cats = []
-for e in erosion_levels:
-    outcomes = simulate_system(N_SAMPLES, 'V7', {'structure_erosion': e})
-    metrics = calc_effective(outcomes)
-    erosion_cats.append(metrics['cat_rate'])
-
-ax.plot(erosion_levels, erosion_cats, 'o-', color='#26a69a', linewidth=2, markersize=8)
-ax.fill_between(erosion_levels, erosion_cats, alpha=0.3, color='#26a69a')
-ax.set_xlabel('Structure Erosion Rate')
-ax.set_ylabel('Catastrophic Rate (%)')
-ax.set_title('V7: Structure Erosion Effect', weight='bold')
-ax.axhline(y=0, color='#999', linestyle='--', alpha=0.5)
-
-ax = axes[1, 0]
-s1_std = [results[f"{t}_S1"]['std'] for t in twists]
-s2_std = [results[f"{t}_S2"]['std'] for t in twists]
-v7_std = [results[f"{t}_V7"]['std'] for t in twists]
-
-ax.bar(x - width, s1_std, width, label='S1', color='#e53935', alpha=0.8)
-ax.bar(x, s2_std, width, label='S2', color='#FFC107', alpha=0.8)
-ax.bar(x + width, v7_std, width, label='V7', color='#26a69a', alpha=0.8)
-ax.set_ylabel('Standard Deviation')
-ax.set_title('Variance Under Stress', weight='bold')
-ax.set_xticks(x)
-ax.set_xticklabels(twist_names, fontsize=8)
-ax.legend()
-
-ax = axes[1, 1]
-summary_data = {
-    'Cost Inflation': ('No effect', 'Collapse', 'Collapse'),
-    'Freedom Injection': ('Safe', 'Risk ↑', 'Risk ↑'),
-    'Execution Spike': ('Stable', 'Variance ↑', 'Variance ↑'),
-    'Obs Noise': ('Slower', 'Crash', 'Crash'),
-    'Structure Erosion': ('Risk appears', '-', '-')
-}
-ax.axis('off')
-table_data = [['Twist', 'V7', 'S1', 'S2']]
-for twist, (v7, s1, s2) in summary_data.items():
-    table_data.append([twist, v7, s1, s2])
-
-table = ax.table(cellText=table_data, loc='center', cellLoc='center',
-                  colWidths=[0.35, 0.2, 0.2, 0.2])
-table.auto_set_font_size(False)
-table.set_fontsize(9)
-table.scale(1.2, 1.8)
-
-for i in range(4):
-    table[(0, i)].set_facecolor('#333333')
-    table[(0, i)].set_text_props(color='white', weight='bold')
-
-for i in range(1, 6):
-    table[(i, 1)].set_facecolor('#e0f2f1')
-
-ax.set_title('Summary: V7 Resilience', weight='bold', pad=20)
-
-ax = axes[1, 2]
-ax.text(0.5, 0.7, "V7 is not robust because\nit adapts to stress.", 
-        ha='center', va='center', fontsize=12, style='italic')
-ax.text(0.5, 0.4, "It is robust because\nstress has nowhere to propagate.", 
-        ha='center', va='center', fontsize=13, weight='bold', color='#00695c')
-ax.text(0.5, 0.15, "If breaking the system requires\nbreaking the structure,\nthen the structure IS the system.", 
-        ha='center', va='center', fontsize=10, color='#666')
-ax.axis('off')
-ax.set_title('Conclusion', weight='bold')
-
-plt.tight_layout()
-plt.savefig("../images/adversarial_stress_test.png", dpi=200, facecolor='white', bbox_inches='tight')
-print("✅ Saved: images/adversarial_stress_test.png")
-plt.close()
-
-print("\n" + "=" * 70)
-print("FINAL VERDICT")
-print("=" * 70)
-print("✅ V7 catastrophic = 0 across ALL stress conditions (except erosion)")
-print("✅ V7 effective performance remains highest in ALL conditions")
-print("✅ Structure erosion proves: catastrophic ONLY occurs when structure breaks")
-print("\n→ V7 is structurally robust, not statistically lucky.")
+def _v7_batch(rng, latent, freedom, system_type, cfg, trace=None):
+    """V7 rules for simulate_system_batch: (outcomes, catastrophic mask)."""
+    n = len(latent)
+    structure_erosion = cfg.get('structure_erosion', 0)
+    obs_noise = cfg.get('obs_noise', 0)
+    
+    eroded = rng.random(n) < structure_erosion
+    high_freedom = freedom > 0.5
+    cost_scale = np.where(eroded,
+                          np.where(high_freedom, 0.6, 0.4),
+                          np.where(high_freedom, 0.1, 0.5))
+    cost = rng.random(n) * cost_scale
+    
+    latent -= obs_noise * rng.random(n)
+    
+    coin = rng.random(n)
+    if structure_erosion > 0:
+        catastrophic = (freedom > 0.6) & (cost > 0.4) & (coin < structure_erosion * 0.5)
+    else:
+        catastrophic = np.zeros(n, dtype=bool)
+    
+    outcomes = np.clip(latent + rng.normal(0, 0.5, n), 2.0 - obs_noise, 10)
+    if trace:
+        # same counter names as simulate_system; every sample draws every array
+        trace.count("eroded", np.count_nonzero(eroded))
+        if structure_erosion > 0:
+            trace.count("danger", np.count_nonzero((freedom > 0.6) & (cost > 0.4)))
+        trace.draw("uniform", 5 * n)
+        trace.draw("normal", 2 * n)
+    return outcomes, catastrophic
+
+def _baseline_batch(rng, latent, freedom, system_type, cfg, trace=None):
+    """S1/S2 rules for simulate_system_batch: (outcomes, catastrophic mask)."""
+    n = len(latent)
+    exec_spike = cfg.get('exec_spike', 1.0)
+    
+    cost = rng.random(n)
+    danger_threshold = 0.5 if system_type == 'S1' else 0.4
+    cat_prob = 0.12 if system_type == 'S1' else 0.08
+    
+    cat_prob *= exec_spike
+    
+    danger = (freedom > danger_threshold) & (cost > danger_threshold)
+    catastrophic = danger & (rng.random(n) < cat_prob)
+    latent += np.where(danger, rng.normal(0, 1.5 * exec_spike, n), 0.0)
+    
+    outcomes = np.clip(latent + rng.normal(0, 1.0, n), 0, 10)
+    if trace:
+        trace.count("danger", np.count_nonzero(danger))
+        trace.draw("uniform", 3 * n)
+        trace.draw("normal", 3 * n)
+    return outcomes, catastrophic
+
+SYSTEM_BRANCHES = {'S1': _baseline_batch, 'S2': _baseline_batch, 'V7': _v7_batch}
+
+def common_draws(n, rng=None):
+    """
+    Every random number a sample can consume, drawn once so S1, S2 and V7
+    can be evaluated on the same sample i (common random numbers).
+    """
+    rng = np.random.default_rng(rng)
+    return {
+        "latent": rng.standard_normal(n),
+        "freedom": rng.random(n),
+        "erosion": rng.random(n),
+        "cost": rng.random(n),
+        "coin": rng.random(n),
+        "obs": rng.random(n),
+        "danger_noise": rng.standard_normal(n),
+        "noise": rng.standard_normal(n),
+    }
+
+def outcomes_from_draws(draws, system_type, twist_config=None):
+    """simulate_system_batch's rules applied to shared draws; same per-system distribution."""
+    cfg = twist_config or {}
+    cat_penalty = cfg.get('cat_penalty', -10)
+    freedom_boost = cfg.get('freedom_boost', 0)
+    structure_erosion = cfg.get('structure_erosion', 0)
+    exec_spike = cfg.get('exec_spike', 1.0)
+    obs_noise = cfg.get('obs_noise', 0)
+    
+    latent = 6.0 + 1.5 * draws["latent"]
+    freedom = np.minimum(1.0, draws["freedom"] + freedom_boost)
+    
+    if system_type == 'V7':
+        eroded = draws["erosion"] < structure_erosion
+        high_freedom = freedom > 0.5
+        cost_scale = np.where(eroded,
+                              np.where(high_freedom, 0.6, 0.4),
+                              np.where(high_freedom, 0.1, 0.5))
+        cost = draws["cost"] * cost_scale
+        
+        latent = latent - obs_noise * draws["obs"]
+        
+        if structure_erosion > 0:
+            catastrophic = (freedom > 0.6) & (cost > 0.4) & (draws["coin"] < structure_erosion * 0.5)
+        else:
+            catastrophic = np.zeros(len(latent), dtype=bool)
+        
+        outcomes = np.clip(latent + 0.5 * draws["noise"], 2.0 - obs_noise, 10)
+    
+    else:
+        cost = draws["cost"]
+        danger_threshold = 0.5 if system_type == 'S1' else 0.4
+        cat_prob = 0.12 if system_type == 'S1' else 0.08
+        
+        cat_prob *= exec_spike
+        
+        danger = (freedom > danger_threshold) & (cost > danger_threshold)
+        catastrophic = danger & (draws["coin"] < cat_prob)
+        latent = latent + np.where(danger, 1.5 * exec_spike * draws["danger_noise"], 0.0)
+        
+        outcomes = np.clip(latent + draws["noise"], 0, 10)
+    
+    outcomes[catastrophic] = cat_penalty
+    return outcomes
+
+def erosion_curve(n, levels=EROSION_LEVELS, twist_config=None, rng=None):
+    """
+    V7 metrics at every erosion level from one set of draws.
+
+    Erosion only matters through one rule: a sample with freedom > 0.6 and
+    a cost draw above 2/3 turns catastrophic once erosion exceeds
+    max(erosion draw, 2·coin). Everything else is erosion-free, so each
+    sample has a fixed threshold, and a sorted pass over the thresholds
+    gives every level at once. The curve is monotone by construction.
+    Returns columns {"structure_erosion": [...], "cat_rate": [...], ...}.
+    """
+    cfg = dict(twist_config or {})
+    cat_penalty = cfg.get('cat_penalty', -10)
+    cfg['structure_erosion'] = 0
+    draws = common_draws(n, rng)
+    base = outcomes_from_draws(draws, 'V7', cfg)
+    
+    freedom = np.minimum(1.0, draws["freedom"] + cfg.get('freedom_boost', 0))
+    eligible = (freedom > 0.6) & (draws["cost"] * 0.6 > 0.4)
+    threshold = np.maximum(draws["erosion"], 2 * draws["coin"])[eligible]
+    order = np.argsort(threshold)
+    threshold = threshold[order]
+    
+    # Shift by the base mean so the running sums of squares stay well conditioned
+    shift = base.mean()
+    flipped = base[eligible][order] - shift
+    penalty = cat_penalty - shift
+    cum_sum = np.concatenate([[0.0], np.cumsum(flipped)])
+    cum_sq = np.concatenate([[0.0], np.cumsum(flipped * flipped)])
+    cum_neg = np.concatenate([[0], np.cumsum(flipped + shift < 0)])
+    
+    levels = np.asarray(levels, dtype=float)
+    k = np.searchsorted(threshold, levels, side='left')
+    total = (base - shift).sum() - cum_sum[k] + k * penalty
+    total_sq = np.square(base - shift).sum() - cum_sq[k] + k * penalty * penalty
+    mean = total / n
+    std = np.sqrt(np.maximum(total_sq / n - mean * mean, 0.0))
+    catastrophic = np.count_nonzero(base < 0) - cum_neg[k] + (k if cat_penalty < 0 else 0)
+    cat_rate = catastrophic / n
+    effective = mean + shift - 0.5 * std - 2.0 * cat_rate * 10
+    
+    return {
+        "n": n,
+        "structure_erosion": [round(float(e), 6) for e in levels],
+        "mean": np.round(mean + shift, 4).tolist(),
+        "std": np.round(std, 4).tolist(),
+        "min": np.where(k > 0, min(base.min(), cat_penalty), base.min()).round(4).tolist(),
+        "catastrophic": catastrophic.tolist(),
+        "cat_rate": np.round(cat_rate * 100, 4).tolist(),
+        "effective": np.round(effective, 4).tolist(),
+    }
+
+def catastrophic_rate_is(n, system_type, twist_config=None, rng=None, defensive=DEFENSIVE):
+    """
+    Importance-sampled catastrophic rate for one (system, twist) cell.
+
+    Only the uniforms that gate a catastrophe are tilted toward the danger
+    region (high freedom, high cost, erosion and the catastrophe coin);
+    the indicator itself is the same rule simulate_system_batch applies.
+    """
+    cfg = twist_config or {}
+    freedom_boost = cfg.get('freedom_boost', 0)
+    structure_erosion = cfg.get('structure_erosion', 0)
+    exec_spike = cfg.get('exec_spike', 1.0)
+    
+    rng = np.random.default_rng(rng)
+    
+    if system_type == 'V7':
+        if structure_erosion <= 0:
+            return structurally_zero(n)
+        u_f, w_f = tilted_uniform(rng, n, 0.6 - freedom_boost, 1.0, defensive)
+        freedom = np.minimum(1.0, u_f + freedom_boost)
+        u_e, w_e = tilted_uniform(rng, n, 0.0, structure_erosion, defensive)
+        eroded = u_e < structure_erosion
+        high_freedom = freedom > 0.5
+        cost_scale = np.where(eroded,
+                              np.where(high_freedom, 0.6, 0.4),
+                              np.where(high_freedom, 0.1, 0.5))
+        u_c, w_c = tilted_uniform(rng, n, 0.4 / 0.6, 1.0, defensive)
+        cost = u_c * cost_scale
+        coin, w_k = tilted_uniform(rng, n, 0.0, structure_erosion * 0.5, defensive)
+        catastrophic = (freedom > 0.6) & (cost > 0.4) & (coin < structure_erosion * 0.5)
+    
+    else:
+        danger_threshold = 0.5 if system_type == 'S1' else 0.4
+        cat_prob = (0.12 if system_type == 'S1' else 0.08) * exec_spike
+        
+        u_f, w_f = tilted_uniform(rng, n, danger_threshold - freedom_boost, 1.0, defensive)
+        freedom = np.minimum(1.0, u_f + freedom_boost)
+        cost, w_c = tilted_uniform(rng, n, danger_threshold, 1.0, defensive)
+        coin, w_k = tilted_uniform(rng, n, 0.0, cat_prob, defensive)
+        w_e = 1.0
+        catastrophic = (freedom > danger_threshold) & (cost > danger_threshold) & (coin < cat_prob)
+    
+    return weighted_rate(catastrophic, w_f * w_e * w_c * w_k)
+
+def accumulate_system(n, system_type, twist_config=None, rng=None, chunk_size=CHUNK_SIZE):
+    """Stream n vectorized samples into an OutcomeAccumulator, chunk by chunk."""
+    rng = np.random.default_rng(rng)
+    return accumulate_chunks(
+        lambda k: simulate_system_batch(k, system_type, twist_config, rng), n, chunk_size)
+
+_cached_accumulators = {}
+
+def cached_accumulate(system_type):
+    """
+    accumulate_system behind the result cache, keyed on the shared driver,
+    the accumulator and this system's branch only: editing the V7 rules
+    leaves S1/S2 hits.
+    """
+    if system_type not in _cached_accumulators:
+        _cached_accumulators[system_type] = memoize(
+            accumulate_system, depends_on=(simulate_system_batch, SYSTEM_BRANCHES[system_type],
+                                           accumulate_chunks, OutcomeAccumulator))
+    return _cached_accumulators[system_type]
+
+def cell_seed(system_type, twist_config, root_seed=ROOT_SEED):
+    """
+    SeedSequence keyed by the cell's identity, not by its position in the
+    work order: the same cell gets the same stream however the grid is
+    split across workers, and distinct cells get independent streams.
+    """
+    key = json.dumps([system_type, sorted((k, float(v)) for k, v in (twist_config or {}).items())])
+    digest = hashlib.sha256(key.encode()).digest()
+    spawn_key = tuple(int.from_bytes(digest[i:i + 4], 'little') for i in range(0, 16, 4))
+    return np.random.SeedSequence(root_seed, spawn_key=spawn_key)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Adversarial stress & twist validation")
+    parser.add_argument("--engine", choices=["scalar", "vectorized"], default="scalar",
+                        help="scalar reproduces the published results; vectorized scales to large N")
+    parser.add_argument("--samples", type=int, default=N_SAMPLES,
+                        help="samples per (system, twist) cell")
+    parser.add_argument("--cache", action="store_true",
+                        help="reuse cached cell results (vectorized engine only)")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="sample each cell until its confidence intervals converge")
+    parser.add_argument("--tol", type=float, default=ADAPTIVE_TOL,
+                        help="adaptive: target CI half-width on effective")
+    parser.add_argument("--cat-tol", type=float, default=ADAPTIVE_CAT_TOL,
+                        help="adaptive: target CI half-width on cat_rate (percentage points)")
+    parser.add_argument("--max-samples", type=int, default=MAX_SAMPLES,
+                        help="adaptive: per-cell sample budget")
+    parser.add_argument("--importance", action="store_true",
+                        help="add an importance-sampled catastrophic rate with its standard error")
+    parser.add_argument("--is-samples", type=int, default=IS_SAMPLES,
+                        help="importance samples per cell")
+    parser.add_argument("--paired", action="store_true",
+                        help="common random numbers across systems; report per-sample paired deltas")
+    args = parser.parse_args(argv)
+    if args.cache and args.engine != "vectorized":
+        parser.error("--cache needs --engine vectorized: the scalar engine shares one global RNG stream")
+    if args.cache and args.adaptive:
+        parser.error("--cache and --adaptive are exclusive: an adaptive cell's N is not known up front")
+    if args.paired and (args.adaptive or args.cache):
+        parser.error("--paired needs one fixed N shared by every system (no --adaptive or --cache)")
+    
+    paired_outcomes = {}
+    if args.paired:
+        def measure(system_type, twist_config=None):
+            # Seeded by the twist alone: every system in a twist sees the same draws
+            draws = common_draws(args.samples, cell_seed("paired", twist_config))
+            outcomes = outcomes_from_draws(draws, system_type, twist_config)
+            twist_key = json.dumps(twist_config or {}, sort_keys=True)
+            paired_outcomes.setdefault(twist_key, {})[system_type] = outcomes
+            return effective_metrics(OutcomeAccumulator().update(outcomes))
+    elif args.adaptive:
+        def measure(system_type, twist_config=None):
+            if args.engine == "vectorized":
+                rng = np.random.default_rng(cell_seed(system_type, twist_config))
+                sample_chunk = lambda k: simulate_system_batch(k, system_type, twist_config, rng)
+                batch_size = 10_000
+            else:
+                sample_chunk = lambda k: simulate_system(k, system_type, twist_config)
+                batch_size = 1_000
+            acc, info = accumulate_adaptive(sample_chunk, args.tol, args.cat_tol,
+                                            args.max_samples, batch_size=batch_size)
+            return {**effective_metrics(acc), **info}
+    elif args.engine == "vectorized":
+        def measure(system_type, twist_config=None):
+            seed = cell_seed(system_type, twist_config)
+            accumulate = cached_accumulate(system_type) if args.cache else accumulate_system
+            return effective_metrics(accumulate(args.samples, system_type, twist_config, seed))
+    else:
+        def measure(system_type, twist_config=None):
+            return calc_effective(simulate_system(args.samples, system_type, twist_config))
+    
+    if args.importance:
+        plain_measure = measure
+        def measure(system_type, twist_config=None):
+            metrics = plain_measure(system_type, twist_config)
+            seed = cell_seed(system_type, twist_config).spawn(1)[0]
+            metrics.update(catastrophic_rate_is(args.is_samples, system_type, twist_config, seed))
+            return metrics
+    
+    def notes(metrics):
+        text = ""
+        if "n" in metrics:
+            flag = "" if metrics["converged"] else ", budget hit"
+            text += (f"  [N={metrics['n']:,}, ±{metrics['effective_ci']:.3f} eff, "
+                     f"±{metrics['cat_rate_ci']:.3f}% cat{flag}]")
+        if "cat_rate_is" in metrics:
+            text += f"  [IS: {metrics['cat_rate_is']:.3g}% ± {metrics['cat_rate_se']:.2g}]"
+        return text
+    
+    print("=" * 70)
+    print("ADVERSARIAL STRESS TEST")
+    print("=" * 70)
+
+    results = {}
+
+    print("\n[BASELINE] Normal Conditions")
+    print("-" * 50)
+    for sys in ['S1', 'S2', 'V7']:
+        metrics = measure(sys)
+        results[f"baseline_{sys}"] = metrics
+        print(f"  {sys}: Eff={metrics['effective']}, Cat={metrics['cat_rate']}%{notes(metrics)}")
+
+    print("\n[TWIST 1] Cost Inflation: penalty -10 → -50")
+    print("-" * 50)
+    for sys in ['S1', 'S2', 'V7']:
+        metrics = measure(sys, {'cat_penalty': -50})
+        results[f"twist1_{sys}"] = metrics
+        baseline_eff = results[f"baseline_{sys}"]['effective']
+        delta = metrics['effective'] - baseline_eff
+        print(f"  {sys}: Eff={metrics['effective']} (Δ={delta:+.2f}), Cat={metrics['cat_rate']}%{notes(metrics)}")
+
+    print("\n[TWIST 2] Freedom Injection: +0.3 boost")
+    print("-" * 50)
+    for sys in ['S1', 'S2', 'V7']:
+        metrics = measure(sys, {'freedom_boost': 0.3})
+        results[f"twist2_{sys}"] = metrics
+        print(f"  {sys}: Eff={metrics['effective']}, Cat={metrics['cat_rate']}%{notes(metrics)}")
+
+    print("\n[TWIST 3] Structure Erosion (V7 only): 30% constraint failure")
+    print("-" * 50)
+    metrics = measure('V7', {'structure_erosion': 0.3})
+    results["twist3_V7_eroded"] = metrics
+    print(f"  V7 (eroded): Eff={metrics['effective']}, Cat={metrics['cat_rate']}%{notes(metrics)}")
+    print(f"  → Catastrophic appears ONLY when structure breaks")
+
+    print("\n[TWIST 4] Execution Spike: 2x execution rate")
+    print("-" * 50)
+    for sys in ['S1', 'S2', 'V7']:
+        metrics = measure(sys, {'exec_spike': 2.0})
+        results[f"twist4_{sys}"] = metrics
+        print(f"  {sys}: Eff={metrics['effective']}, Std={metrics['std']}, Cat={metrics['cat_rate']}%{notes(metrics)}")
+
+    print("\n[TWIST 5] Observation Noise: info degradation")
+    print("-" * 50)
+    for sys in ['S1', 'S2', 'V7']:
+        metrics = measure(sys, {'obs_noise': 1.5})
+        results[f"twist5_{sys}"] = metrics
+        print(f"  {sys}: Eff={metrics['effective']}, Cat={metrics['cat_rate']}%{notes(metrics)}")
+
+    print("\n[EROSION CURVE] V7 under increasing structure erosion")
+    print("-" * 50)
+    curve = erosion_curve(EROSION_CURVE_SAMPLES, rng=cell_seed('V7', {'erosion_curve': 1}))
+    results["erosion_curve"] = curve
+    step = (len(EROSION_LEVELS) - 1) // 5
+    for i in range(0, len(EROSION_LEVELS), step):
+        print(f"  erosion={curve['structure_erosion'][i]:.1f}: Cat={curve['cat_rate'][i]:.3f}%, "
+              f"Eff={curve['effective'][i]:.3f}")
+    print(f"  ({len(EROSION_LEVELS)} coupled levels from one {EROSION_CURVE_SAMPLES:,}-sample pass)")
+
+    if args.paired:
+        print("\n[PAIRED DELTAS] Common random numbers, 95% CI half-widths")
+        print("-" * 50)
+        results["paired_deltas"] = []
+        for twist_key, by_system in paired_outcomes.items():
+            for a, b in [('V7', 'S1'), ('V7', 'S2'), ('S2', 'S1')]:
+                if a not in by_system or b not in by_system:
+                    continue
+                d = paired_delta(by_system[a], by_system[b])
+                results["paired_deltas"].append({"twist": json.loads(twist_key), "pair": f"{a}-{b}", **d})
+                print(f"  {twist_key:<26} {a}-{b}: ΔEff={d['delta_effective']:+.3f} "
+                      f"±{d['ci_paired']:.3f} (independent ±{d['ci_independent']:.3f}, "
+                      f"{d['variance_reduction']:.1f}x fewer samples)")
+
+    with open("results/adversarial_stress_results.json", "w") as f:
+        json.dump(results, f, indent=2)
+    print("\n✅ Saved: results/adversarial_stress_results.json")
+
+    from figures import render_figures  # matplotlib only for the CLI, not for twist_grid_sweep's workers
+    render_figures(["adversarial_stress_test"])
+    
+    if args.cache:
+        stats = default_cache().stats()
+        print(f"Result cache: {stats['hits']} hits, {stats['misses']} misses, "
+              f"{stats['entries']} entries ({stats['bytes'] / 1e6:.1f} MB)")
+
+    print("\n" + "=" * 70)
+    print("FINAL VERDICT")
+    print("=" * 70)
+    print("✅ V7 catastrophic = 0 across ALL stress conditions (except erosion)")
+    print("✅ V7 effective performance remains highest in ALL conditions")
+    print("✅ Structure erosion proves: catastrophic ONLY occurs when structure breaks")
+    print("\n→ V7 is structurally robust, not statistically lucky.")
+
+
+if __name__ == "__main__":
+    main()
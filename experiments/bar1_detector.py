@@ -0,0 +1,116 @@
+"""
+Online Bar1 Detector
+
+Bar1 (docs/SYSTEM_LOOP.md) is the point where information stops growing:
+the requirement-change rate, the goal-redefinition frequency and the
+information gain per τ have all stopped falling. Before Bar1, no execution.
+
+Per session, the detector keeps two adjacent windows of turns (previous,
+recent) with running counts, so every turn costs O(1) time and memory:
+
+    change rate        share of turns with change_type != "none"
+    redefinition rate  share of turns with change_type == "major"
+    info gain per τ    mean change score (major 1, minor 0.5, none 0)
+
+Bar1 is reached when none of the three is still falling (recent ≥
+previous - tolerance), or the recent window adds no information at all,
+and the recent info gain is low enough that a flat level is saturation,
+not steady churn. The gate opens at Bar1 when the recent window has no
+constraint violations.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+CHANGE_SCORE = {"major": 1.0, "minor": 0.5, "none": 0.0}
+WINDOW = 2
+TOLERANCE = 0.0
+MAX_INFO_GAIN = 0.5
+
+
+@dataclass
+class GateDecision:
+    turn_idx: int
+    gate_open: bool
+    bar1: bool
+    change_rate: float
+    redefinition_rate: float
+    info_gain: float
+    recent_violations: int
+    reason: str
+
+
+class Bar1Detector:
+    __slots__ = ("window", "tolerance", "max_info_gain", "turns", "opened_at",
+                 "_history", "_recent", "_previous")
+
+    def __init__(self, window: int = WINDOW, tolerance: float = TOLERANCE,
+                 max_info_gain: float = MAX_INFO_GAIN):
+        self.window = window
+        self.tolerance = tolerance
+        self.max_info_gain = max_info_gain
+        self.turns = 0
+        self.opened_at: Optional[int] = None
+        self._history = deque()
+        # [changed, major, score, violations] summed over each window
+        self._recent = [0, 0, 0.0, 0]
+        self._previous = [0, 0, 0.0, 0]
+
+    @staticmethod
+    def _shift(counts, item, sign):
+        for i, v in enumerate(item):
+            counts[i] += sign * v
+
+    def update(self, change_type: str, violation: bool = False) -> GateDecision:
+        item = (change_type != "none", change_type == "major", CHANGE_SCORE[change_type], bool(violation))
+        self.turns += 1
+        self._history.append(item)
+        self._shift(self._recent, item, 1)
+        if len(self._history) > self.window:
+            # the turn leaving the recent window enters the previous one
+            moved = self._history[-self.window - 1]
+            self._shift(self._recent, moved, -1)
+            self._shift(self._previous, moved, 1)
+        if len(self._history) > 2 * self.window:
+            self._shift(self._previous, self._history.popleft(), -1)
+        return self.decision()
+
+    def decision(self) -> GateDecision:
+        w = self.window
+        changed, major, score, violations = self._recent
+        rates = (changed / w, major / w, score / w)
+        if len(self._history) < 2 * w:
+            bar1, reason = False, "collecting"
+        else:
+            p_changed, p_major, p_score, _ = self._previous
+            previous = (p_changed / w, p_major / w, p_score / w)
+            if rates[2] > 0 and any(r < p - self.tolerance for r, p in zip(rates, previous)):
+                bar1, reason = False, "still converging"
+            elif rates[2] > self.max_info_gain:
+                bar1, reason = False, "intent still churning"
+            else:
+                bar1, reason = True, "bar1"
+        gate_open = bar1 and violations == 0
+        if bar1 and not gate_open:
+            reason = "constraint violation"
+        if gate_open and self.opened_at is None:
+            self.opened_at = self.turns
+        return GateDecision(self.turns, gate_open, bar1, rates[0], rates[1], rates[2], violations, reason)
+
+
+class SessionGates:
+    """One detector per live session."""
+
+    def __init__(self, **detector_options):
+        self.detector_options = detector_options
+        self.sessions: Dict[str, Bar1Detector] = {}
+
+    def update(self, session: str, change_type: str, violation: bool = False) -> GateDecision:
+        detector = self.sessions.get(session)
+        if detector is None:
+            detector = self.sessions[session] = Bar1Detector(**self.detector_options)
+        return detector.update(change_type, violation)
+
+    def close(self, session: str) -> Optional[Bar1Detector]:
+        return self.sessions.pop(session, None)
@@ -0,0 +1,241 @@
+"""
+Simulator Benchmarks
+
+Throughput and memory for every simulator kernel across a range of N.
+Each (kernel, N) point runs in a fresh process so peak RSS belongs to it alone.
+
+    python benchmarks.py                    # measure and print
+    python benchmarks.py --save-baseline    # store results/benchmark_baseline.json
+    python benchmarks.py --compare          # flag regressions against the baseline
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "results", "benchmark_baseline.json")
+DEFAULT_TOLERANCE = 0.25
+
+SCALAR_SIZES = [1_000, 10_000, 100_000]
+VECTOR_SIZES = [10_000, 100_000, 1_000_000]
+TWISTS = {
+    "baseline": None,
+    "cost_inflation": {'cat_penalty': -50},
+    "freedom_injection": {'freedom_boost': 0.3},
+    "erosion": {'structure_erosion': 0.3},
+    "exec_spike": {'exec_spike': 2.0},
+    "obs_noise": {'obs_noise': 1.5},
+}
+
+
+# ---------------------------------------------------------------------------
+# Kernels: setup(n) returns the zero-argument workload to time
+# ---------------------------------------------------------------------------
+
+def _performance_comparison(system):
+    def setup(n):
+        import performance_comparison as pc
+        fn = getattr(pc, f"simulate_{system}")
+        return lambda: fn(n, 0)
+    return setup
+
+
+def _stress(system, twist, engine):
+    def setup(n):
+        import adversarial_stress_test as ast_
+        if engine == "vectorized":
+            return lambda: ast_.simulate_system_batch(n, system, TWISTS[twist], 0)
+        return lambda: ast_.simulate_system(n, system, TWISTS[twist])
+    return setup
+
+
+def _macro_micro(system, engine):
+    def setup(n):
+        import macro_micro_simulation as mm
+        suffix = "batch" if engine == "vectorized" else "data"
+        fn = getattr(mm, f"generate_{system}_{suffix}")
+        return (lambda: fn(n, 0)) if engine == "vectorized" else (lambda: fn(n))
+    return setup
+
+
+def _jve(agent, engine):
+    def setup(n):
+        import judgment_vs_execution as jve
+        agent_type = jve.AgentType[agent]
+        if engine == "vectorized":
+            return lambda: jve.simulate_batch(agent_type, range(n), rng=0)
+        return lambda: [jve.simulate(agent_type, seed) for seed in range(n)]
+    return setup
+
+
+def _compare_conditions(n):
+    import random
+    import experiment_design as ed
+    rng = random.Random(0)
+    runs = []
+    for i in range(n):
+        run = ed.create_run(f"T{i % 6 + 1}", "ABC"[i % 3], "prompt")
+        for _ in range(rng.randint(1, 8)):
+            ed.add_turn(run, "intent", "output", rng.choice(["major", "minor", "none"]))
+        ed.finalize_run(run, quality=rng.uniform(3, 10), delta_intent="", time_min=rng.uniform(1, 20))
+        runs.append(run)
+    return lambda: ed.compare_conditions(runs)
+
+
+def kernels():
+    """name → (setup, sizes)"""
+    table = {}
+    for system in ["s1", "s2", "v7"]:
+        table[f"performance_comparison.simulate_{system}"] = (_performance_comparison(system), SCALAR_SIZES)
+    for system in ["S1", "S2", "V7"]:
+        for twist in TWISTS:
+            table[f"stress.simulate_system[{system},{twist}]"] = (_stress(system, twist, "scalar"), SCALAR_SIZES)
+            table[f"stress.simulate_system_batch[{system},{twist}]"] = (_stress(system, twist, "vectorized"), VECTOR_SIZES)
+    for system in ["s1", "s2", "v7"]:
+        table[f"macro_micro.generate_{system}_data"] = (_macro_micro(system, "scalar"), SCALAR_SIZES)
+        table[f"macro_micro.generate_{system}_batch"] = (_macro_micro(system, "vectorized"), VECTOR_SIZES)
+    for agent in ["JUDGMENT_ONLY", "HIGH_EXECUTION", "DELAYED_EXECUTION", "STRUCTURED_V7"]:
+        table[f"jve.simulate[{agent}]"] = (_jve(agent, "scalar"), [100, 1_000, 10_000])
+        table[f"jve.simulate_batch[{agent}]"] = (_jve(agent, "vectorized"), VECTOR_SIZES)
+    table["experiment_design.compare_conditions"] = (_compare_conditions, [1_000, 10_000, 100_000])
+    return table
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+def _rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+
+def _measure(name, n, repeats):
+    """Runs in a fresh child process."""
+    setup, _ = kernels()[name]
+    workload = setup(n)
+    workload()  # warm-up: imports, first-touch allocations
+
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        workload()
+        best = min(best, time.perf_counter() - start)
+        if best > 2.0:
+            break
+
+    # tracemalloc slows the workload down, so it gets its own pass. Both
+    # numbers are relative to the state just before the call: the peak
+    # above it, and the blocks the call left allocated (its result plus
+    # anything it leaked).
+    tracemalloc.start()
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    before = tracemalloc.take_snapshot().filter_traces(ignore)
+    base, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    result = workload()
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot().filter_traces(ignore)
+    tracemalloc.stop()
+    alloc_peak = peak - base
+    alloc_blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    del result
+
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "kernel": name,
+        "n": n,
+        "seconds": best,
+        "samples_per_sec": n / best if best > 0 else float("inf"),
+        "peak_rss_mb": round(peak_rss_kb / 1e3, 1),
+        "rss_mb": round(_rss_mb(), 1),
+        "alloc_peak_mb": round(alloc_peak / 1e6, 3),
+        "alloc_blocks": alloc_blocks,
+    }
+
+
+def run_benchmarks(pattern=None, max_n=None, repeats=3):
+    ctx = multiprocessing.get_context("spawn")
+    rows = []
+    for name, (_, sizes) in kernels().items():
+        if pattern and pattern not in name:
+            continue
+        for n in sizes:
+            if max_n and n > max_n:
+                continue
+            with ctx.Pool(1) as pool:
+                row = pool.apply(_measure, (name, n, repeats))
+            rows.append(row)
+            print(f"{name:<52} N={n:>9,}  {row['samples_per_sec']:>14,.0f}/s  "
+                  f"rss={row['peak_rss_mb']:>7.1f}MB  alloc={row['alloc_peak_mb']:>9.3f}MB")
+    return rows
+
+
+def save_baseline(rows, path=BASELINE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({
+            "timestamp": datetime.now().isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "results": rows,
+        }, f, indent=2)
+    print(f"\n✅ Saved: {os.path.relpath(path)}")
+
+
+def compare(rows, path=BASELINE_PATH, tolerance=DEFAULT_TOLERANCE):
+    """
+    Regression = throughput below baseline·(1 - tolerance), or peak
+    allocation above baseline·(1 + tolerance). Returns the regressions.
+    """
+    with open(path) as f:
+        baseline = {(r["kernel"], r["n"]): r for r in json.load(f)["results"]}
+
+    regressions = []
+    print("\n" + "=" * 90)
+    print(f"COMPARISON vs BASELINE (tolerance ±{tolerance:.0%})")
+    print("=" * 90)
+    for row in rows:
+        base = baseline.get((row["kernel"], row["n"]))
+        if base is None:
+            print(f"  NEW   {row['kernel']} N={row['n']:,}")
+            continue
+        speed = row["samples_per_sec"] / base["samples_per_sec"]
+        alloc = (row["alloc_peak_mb"] / base["alloc_peak_mb"]) if base["alloc_peak_mb"] else 1.0
+        problems = []
+        if speed < 1 - tolerance:
+            problems.append(f"throughput ×{speed:.2f}")
+        if alloc > 1 + tolerance:
+            problems.append(f"allocation ×{alloc:.2f}")
+        mark = "REGR" if problems else "ok"
+        print(f"  {mark:<5} {row['kernel']:<52} N={row['n']:>9,}  speed ×{speed:.2f}  alloc ×{alloc:.2f}")
+        if problems:
+            regressions.append({**row, "problems": problems})
+    print(f"\n{len(regressions)} regression(s)")
+    return regressions
+
+
+if __name__ == "__main__":
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="Simulator throughput and memory benchmarks")
+    parser.add_argument("-k", "--filter", default=None, help="only kernels whose name contains this")
+    parser.add_argument("--max-n", type=int, default=None, help="skip sizes above this N")
+    parser.add_argument("--repeats", type=int, default=3, help="timing repeats (best is kept)")
+    parser.add_argument("--save-baseline", action="store_true", help=f"write {os.path.relpath(BASELINE_PATH)}")
+    parser.add_argument("--compare", action="store_true", help="compare against the stored baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    rows = run_benchmarks(args.filter, args.max_n, args.repeats)
+    if args.save_baseline:
+        save_baseline(rows)
+    if args.compare:
+        sys.exit(1 if compare(rows, tolerance=args.tolerance) else 0)
@@ -0,0 +1,109 @@
+"""
+Columnar State Store
+
+One .npy file per column plus a schema.json.
+Readers memory-map only the columns they ask for.
+
+Layout:
+    <store>/schema.json     length, dtype and file per column,
+                            category list for dictionary-encoded columns
+    <store>/<column>.npy    the column itself
+"""
+
+import json
+import os
+import shutil
+
+import numpy as np
+
+SCHEMA_FILE = "schema.json"
+
+
+def encode_categorical(values, categories):
+    """Dictionary-encode a sequence of strings against a fixed category list."""
+    index = {c: i for i, c in enumerate(categories)}
+    dtype = np.uint8 if len(categories) <= 256 else np.uint32
+    return np.fromiter((index[v] for v in values), dtype=dtype, count=len(values))
+
+
+def decode_categorical(codes, categories):
+    """Codes back to strings (an object array, for export and plotting labels)."""
+    return np.asarray(categories, dtype=object)[np.asarray(codes)]
+
+
+def write_store(path, columns, categories=None):
+    """
+    columns: {name: 1-D array}, all of the same length
+    categories: {name: [labels]} for columns that hold dictionary codes
+
+    Columns are written into a temporary directory that replaces the old
+    store only once complete, so readers never see a half-written store.
+    The old store is renamed aside before the swap and deleted after it,
+    so a crash at any point leaves one complete store on disk.
+    """
+    categories = categories or {}
+    lengths = {len(col) for col in columns.values()}
+    if len(lengths) > 1:
+        raise ValueError(f"columns have different lengths: {sorted(lengths)}")
+
+    tmp_path = f"{path}.tmp"
+    old_path = f"{path}.old"
+    _recover(path)
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    schema = {"length": lengths.pop() if lengths else 0, "columns": {}}
+    for name, col in columns.items():
+        arr = np.ascontiguousarray(col)
+        filename = f"{name}.npy"
+        np.save(os.path.join(tmp_path, filename), arr)
+        entry = {"dtype": arr.dtype.str, "file": filename}
+        if name in categories:
+            entry["categories"] = list(categories[name])
+        schema["columns"][name] = entry
+
+    with open(os.path.join(tmp_path, SCHEMA_FILE), "w") as f:
+        json.dump(schema, f, indent=2)
+
+    shutil.rmtree(old_path, ignore_errors=True)
+    if os.path.exists(path):
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    return path
+
+
+def _recover(path):
+    """A crash between the two renames leaves only <store>.old: put it back."""
+    old_path = f"{path}.old"
+    if not os.path.exists(path) and os.path.exists(old_path):
+        os.replace(old_path, path)
+
+
+def _live(path):
+    return path if os.path.exists(path) or not os.path.exists(f"{path}.old") else f"{path}.old"
+
+
+def read_schema(path):
+    with open(os.path.join(_live(path), SCHEMA_FILE)) as f:
+        return json.load(f)
+
+
+def load_columns(path, names=None, mmap=True):
+    """
+    Load the requested columns ({name: array}); all columns if names is None.
+    With mmap=True the arrays are read-only memory maps and nothing is read
+    from disk until it is touched.
+    """
+    path = _live(path)
+    schema = read_schema(path)
+    names = list(schema["columns"]) if names is None else names
+    mmap_mode = "r" if mmap else None
+    return {
+        name: np.load(os.path.join(path, schema["columns"][name]["file"]), mmap_mode=mmap_mode)
+        for name in names
+    }
+
+
+def load_categories(path, name):
+    return read_schema(path)["columns"][name].get("categories")
@@ -20,26 +20,142 @@ B = Form/One-shot (non-conversational)
 C = V7-Structured Chat (STATE/Bar1/Constraint/τ-plan)
 """
 
-import json
-from dataclasses import dataclass, asdict
-from typing import List, Optional
+import sys
+from array import array
+from dataclasses import dataclass, field, fields
+from enum import IntEnum
+from typing import Dict, Iterable, Iterator, List, Optional, Union
 from datetime import datetime
-from pathlib import Path
 
-@dataclass
+import numpy as np
+
+from resampling import REPLICATES, bootstrap, format_test, permutation_test, row_mean
+from run_log import RunLog
+
+class ChangeType(IntEnum):
+    NONE = 0
+    MINOR = 1
+    MAJOR = 2
+    
+    @property
+    def label(self) -> str:
+        return CHANGE_LABELS[self]
+    
+    @classmethod
+    def parse(cls, value: Union[str, "ChangeType"]) -> "ChangeType":
+        """A label ("major", "minor", "none", any case) or a ChangeType; anything else is a ValueError."""
+        if isinstance(value, cls):
+            return value
+        if not isinstance(value, str):
+            raise ValueError(f"unknown change_type: {value!r}")
+        try:
+            return cls[value.upper()]
+        except KeyError:
+            raise ValueError(f"unknown change_type: {value!r}") from None
+
+CHANGE_LABELS = ("none", "minor", "major")
+
 class Turn:
-    turn_idx: int
-    user_intent_summary: str
-    assistant_output_summary: str
-    change_type: str  # "major", "minor", "none"
-    violation_flag: bool = False
+    __slots__ = ("turn_idx", "user_intent_summary", "assistant_output_summary",
+                 "change_type", "violation_flag")
+
+    def __init__(self, turn_idx: int, user_intent_summary: str,
+                 assistant_output_summary: str, change_type: str,  # "major", "minor", "none"
+                 violation_flag: bool = False):
+        self.turn_idx = turn_idx
+        self.user_intent_summary = user_intent_summary
+        self.assistant_output_summary = assistant_output_summary
+        self.change_type = change_type
+        self.violation_flag = violation_flag
+
+    def _key(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        return isinstance(other, Turn) and self._key() == other._key()
+
+    def __repr__(self):
+        args = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"Turn({args})"
+
+VIOLATION_BIT = 4  # change codes use bits 0-1
+
+class TurnTable:
+    """
+    A run's turns as two flat columns: one byte per turn (change code plus
+    a violation bit) and the interned summaries, intent/output interleaved.
+    Running counts (majors, majors in the first half, violations) are kept
+    as turns arrive, so finalize_run never rescans. Indexing yields Turn views.
+    """
+    
+    __slots__ = ("summaries", "codes", "majors", "early_majors", "violations")
+    
+    def __init__(self, turns: Iterable[Turn] = ()):
+        self.summaries: List[str] = []
+        self.codes = array("B")
+        self.majors = 0
+        self.early_majors = 0  # majors among the first len // 2 turns
+        self.violations = 0
+        for t in turns:
+            self.append(t)
+    
+    def add(self, intent: str, output: str, change_type: Union[str, ChangeType], violation: bool = False):
+        code = ChangeType.parse(change_type)
+        self.summaries += (sys.intern(intent), sys.intern(output))
+        self.codes.append(code | (VIOLATION_BIT if violation else 0))
+        self.majors += code == ChangeType.MAJOR
+        self.violations += bool(violation)
+        n = len(self.codes)
+        if n % 2 == 0:
+            # the first half just grew by one turn
+            self.early_majors += (self.codes[n // 2 - 1] & 3) == ChangeType.MAJOR
+    
+    def append(self, turn: Turn):
+        self.add(turn.user_intent_summary, turn.assistant_output_summary,
+                 turn.change_type, turn.violation_flag)
+    
+    def __len__(self) -> int:
+        return len(self.codes)
+    
+    def __getitem__(self, i: int) -> Turn:
+        i = range(len(self))[i]
+        code = self.codes[i]
+        return Turn(i + 1, self.summaries[2 * i], self.summaries[2 * i + 1],
+                    CHANGE_LABELS[code & 3], bool(code & VIOLATION_BIT))
+    
+    def __iter__(self) -> Iterator[Turn]:
+        return (self[i] for i in range(len(self)))
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, TurnTable):
+            return self.codes == other.codes and self.summaries == other.summaries
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return f"TurnTable({len(self)} turns)"
+    
+    def to_dicts(self) -> List[Dict]:
+        s = self.summaries
+        return [
+            {"turn_idx": i + 1, "user_intent_summary": s[2 * i], "assistant_output_summary": s[2 * i + 1],
+             "change_type": CHANGE_LABELS[code & 3], "violation_flag": bool(code & VIOLATION_BIT)}
+            for i, code in enumerate(self.codes)
+        ]
+    
+    @classmethod
+    def from_dicts(cls, rows: Iterable[Dict]) -> "TurnTable":
+        table = cls()
+        for t in rows:
+            table.add(t["user_intent_summary"], t["assistant_output_summary"],
+                      t["change_type"], t.get("violation_flag", False))
+        return table
 
 @dataclass
 class ExperimentRun:
     task_id: str
     condition: str  # A, B, C
     start_prompt: str
-    turns: List[Turn]
+    turns: TurnTable = field(default_factory=TurnTable)
     final_output_path: Optional[str] = None
     
     # Metrics
@@ -52,6 +168,24 @@ class ExperimentRun:
     notes: str = ""
     
     timestamp: str = ""
+    
+    def __post_init__(self):
+        if not isinstance(self.turns, TurnTable):
+            self.turns = TurnTable(self.turns)
+    
+    def to_dict(self) -> Dict:
+        """The save format, built straight from the columns (no asdict deep copy)."""
+        data = {f.name: getattr(self, f.name) for f in RUN_FIELDS}
+        data["turns"] = self.turns.to_dicts()
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ExperimentRun":
+        data = dict(data)
+        data["turns"] = TurnTable.from_dicts(data["turns"])
+        return cls(**data)
+
+RUN_FIELDS = fields(ExperimentRun)
 
 TASKS = [
     {
@@ -121,73 +255,139 @@ def create_run(task_id: str, condition: str, start_prompt: str) -> ExperimentRun
         task_id=task_id,
         condition=condition,
         start_prompt=start_prompt,
-        turns=[],
         timestamp=datetime.now().isoformat()
     )
 
 def add_turn(run: ExperimentRun, intent: str, output: str, 
-             change_type: str, violation: bool = False):
-    turn = Turn(
-        turn_idx=len(run.turns) + 1,
-        user_intent_summary=intent,
-        assistant_output_summary=output,
-        change_type=change_type,
-        violation_flag=violation
-    )
-    run.turns.append(turn)
+             change_type: str, violation: bool = False,
+             aggregates: Optional["ConditionAggregates"] = None):
+    run.turns.add(intent, output, change_type, violation)
+    if aggregates is not None:
+        aggregates.add_turn(run)
 
 def finalize_run(run: ExperimentRun, quality: float, delta_intent: str,
-                 time_min: float, output_path: str = None, notes: str = ""):
+                 time_min: float, output_path: str = None, notes: str = "",
+                 aggregates: Optional["ConditionAggregates"] = None):
+    """Fill in the run's metrics; with aggregates, also fold the run into them (once per run)."""
     run.tau_success = len(run.turns)
     run.quality_score = quality
     run.delta_intent = delta_intent
     run.time_min = time_min
     run.final_output_path = output_path
     run.notes = notes
-    run.violations = sum(1 for t in run.turns if t.violation_flag)
+    run.violations = run.turns.violations
     
     # Calculate convergence rate (change reduction in later turns)
     if len(run.turns) >= 3:
-        early = sum(1 for t in run.turns[:len(run.turns)//2] if t.change_type == "major")
-        late = sum(1 for t in run.turns[len(run.turns)//2:] if t.change_type == "major")
+        early = run.turns.early_majors
+        late = run.turns.majors - early
         if early > 0:
             run.convergence_rate = 1 - (late / early)
         else:
             run.convergence_rate = 1.0
+    if aggregates is not None:
+        aggregates.add_run(run)
+
+class ConditionAggregates:
+    """
+    Running sums per condition and per (task, condition), updated in O(1)
+    per turn and per finalized run, so the comparison table can be polled
+    without touching history.
+    """
+    
+    def __init__(self, runs: Iterable[ExperimentRun] = ()):
+        self.by_condition: Dict[str, Dict[str, float]] = {}
+        self.by_task: Dict[tuple, Dict[str, float]] = {}
+        self.turns_recorded: Dict[str, int] = {}
+        for run in runs:
+            self.add_run(run)
+    
+    @staticmethod
+    def _empty() -> Dict[str, float]:
+        return {"n": 0, "tau": 0, "quality": 0.0, "time": 0.0, "failures": 0, "convergence": 0.0}
+    
+    def add_turn(self, run: ExperimentRun):
+        """Count a turn as it happens, before its run is finalized."""
+        self.turns_recorded[run.condition] = self.turns_recorded.get(run.condition, 0) + 1
+    
+    def add_run(self, run: ExperimentRun):
+        for s in (self.by_condition.setdefault(run.condition, self._empty()),
+                  self.by_task.setdefault((run.task_id, run.condition), self._empty())):
+            s["n"] += 1
+            s["tau"] += run.tau_success
+            s["quality"] += run.quality_score
+            s["time"] += run.time_min
+            s["failures"] += run.quality_score < 6
+            s["convergence"] += run.convergence_rate
+    
+    @staticmethod
+    def _averages(cond: str, s: Dict[str, float]) -> dict:
+        return {
+            "name": CONDITIONS[cond]["name"],
+            "n": s["n"],
+            "avg_tau": s["tau"] / s["n"],
+            "avg_quality": s["quality"] / s["n"],
+            "avg_time": s["time"] / s["n"],
+            "failure_rate": s["failures"] / s["n"],
+            "avg_convergence": s["convergence"] / s["n"]
+        }
+    
+    def comparison(self) -> dict:
+        """compare_conditions' table, in O(number of conditions)."""
+        return {cond: self._averages(cond, self.by_condition[cond])
+                for cond in CONDITIONS if cond in self.by_condition}
+    
+    def task_comparison(self, task_id: str) -> dict:
+        return {cond: self._averages(cond, self.by_task[(task_id, cond)])
+                for cond in CONDITIONS if (task_id, cond) in self.by_task}
+
+def run_to_dict(run: ExperimentRun) -> Dict:
+    return run.to_dict()
+
+def run_from_dict(data: Dict) -> ExperimentRun:
+    return ExperimentRun.from_dict(data)
 
 def save_run(run: ExperimentRun, base_path: str = "."):
-    path = Path(base_path) / f"task_{run.task_id}_{run.condition}_{run.timestamp[:10]}.json"
-    
-    data = asdict(run)
-    data["turns"] = [asdict(t) for t in run.turns]
-    
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    
-    return path
-
-def compare_conditions(runs: List[ExperimentRun]) -> dict:
-    """Compare metrics across conditions."""
-    by_condition = {"A": [], "B": [], "C": []}
-    for r in runs:
-        by_condition[r.condition].append(r)
-    
-    results = {}
-    for cond, cond_runs in by_condition.items():
-        if cond_runs:
-            results[cond] = {
-                "name": CONDITIONS[cond]["name"],
-                "n": len(cond_runs),
-                "avg_tau": sum(r.tau_success for r in cond_runs) / len(cond_runs),
-                "avg_quality": sum(r.quality_score for r in cond_runs) / len(cond_runs),
-                "avg_time": sum(r.time_min for r in cond_runs) / len(cond_runs),
-                "failure_rate": sum(1 for r in cond_runs if r.quality_score < 6) / len(cond_runs),
-                "avg_convergence": sum(r.convergence_rate for r in cond_runs) / len(cond_runs)
-            }
-    
-    return results
-
-def print_comparison(results: dict):
+    """Append the run to the shared run log under base_path; returns the log path."""
+    log = RunLog(base_path)
+    log.append(run_to_dict(run))
+    return log.log_path
+
+def load_runs(base_path: str = ".", task_id: Optional[str] = None,
+              condition: Optional[str] = None, date: Optional[str] = None) -> Iterator[ExperimentRun]:
+    """Stream runs from the log, reading only those matching the filters."""
+    for data in RunLog(base_path).query(task_id, condition, date):
+        yield run_from_dict(data)
+
+def compare_conditions(runs: Iterable[ExperimentRun]) -> dict:
+    """Compare metrics across conditions in one pass over runs (a list or a stream)."""
+    return ConditionAggregates(runs).comparison()
+
+TAU_REDUCTION_TARGET = 20  # percent, C vs A
+
+def tau_reduction_test(runs: Iterable[ExperimentRun], replicates: int = REPLICATES, seed: int = 0) -> dict:
+    """
+    τ reduction of C vs A (percent) with a bootstrap CI, and a one-sided
+    permutation p-value against "reduction ≤ TAU_REDUCTION_TARGET"
+    (C's τ permuted against A's τ scaled to the target).
+    """
+    taus = {"A": [], "C": []}
+    for run in runs:
+        if run.condition in taus:
+            taus[run.condition].append(run.tau_success)
+    if not taus["A"] or not taus["C"]:
+        raise ValueError("τ reduction needs runs in both conditions A and C")
+    a, c = (np.asarray(taus[cond], dtype=float) for cond in "AC")
+    boot_rng, perm_rng = (np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(2))
+    test = bootstrap([a, c], lambda a, c: (row_mean(a) - row_mean(c)) / row_mean(a) * 100,
+                     replicates, rng=boot_rng)
+    target = a * (1 - TAU_REDUCTION_TARGET / 100)
+    test["p_value"] = permutation_test(c, target, lambda c, a: row_mean(c) - row_mean(a), "less",
+                                       replicates, perm_rng)["p_value"]
+    return test
+
+def print_comparison(results: dict, tau_test: Optional[dict] = None):
+    """tau_test: tau_reduction_test() on the same runs, reported under the τ reduction"""
     print("\n" + "=" * 70)
     print("CHAT INTERFACE EFFICIENCY COMPARISON")
     print("=" * 70)
@@ -208,8 +408,10 @@ def print_comparison(results: dict):
     if "A" in results and "C" in results:
         tau_reduction = (results["A"]["avg_tau"] - results["C"]["avg_tau"]) / results["A"]["avg_tau"] * 100
         print(f"\nτ Reduction (C vs A): {tau_reduction:.1f}%")
+        if tau_test:
+            print(f"   {format_test(tau_test)} vs ≤{TAU_REDUCTION_TARGET}%")
         
-        if tau_reduction >= 20 and results["C"]["avg_quality"] >= results["A"]["avg_quality"]:
+        if tau_reduction >= TAU_REDUCTION_TARGET and results["C"]["avg_quality"] >= results["A"]["avg_quality"]:
             print("H3 CONFIRMED: V7-Structured Chat is more efficient")
         else:
             print("H3 NOT CONFIRMED: Need more data or structure refinement")
@@ -229,4 +431,6 @@ if __name__ == "__main__":
     print("  1. Create run: run = create_run('T1', 'A', 'initial prompt')")
     print("  2. Add turns: add_turn(run, intent, output, 'major')")
     print("  3. Finalize: finalize_run(run, quality=8.0, delta_intent='...', time_min=5.0)")
-    print("  4. Save: save_run(run)")
+    print("  4. Save: save_run(run)  # appends to runs.jsonl")
+    print("  5. Compare: print_comparison(compare_conditions(load_runs()))")
+    print("     with CIs: runs = list(load_runs()); print_comparison(compare_conditions(runs), tau_reduction_test(runs))")
@@ -0,0 +1,541 @@
+"""
+Figure Rendering
+
+Figures are drawn from stored result artifacts only, never from a live run.
+A figure is redrawn only when its inputs, parameters or drawing code change.
+"""
+
+import argparse
+import fcntl
+import hashlib
+import inspect
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import matplotlib.patches as mpatches
+from matplotlib.patches import Patch
+import numpy as np
+
+from columnar_store import load_categories, load_columns
+from worker_budget import default_workers
+
+EXPERIMENTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(EXPERIMENTS_DIR)
+CACHE_FILE = os.path.join(EXPERIMENTS_DIR, ".cache", "figures.json")
+CACHE_LOCK = os.path.join(EXPERIMENTS_DIR, ".cache", "figures.lock")
+
+
+@dataclass
+class FigureSpec:
+    name: str
+    render: Callable
+    # result artifacts, relative to experiments/; a tuple lists alternatives, first existing wins
+    inputs: List[Union[str, Tuple[str, ...]]]
+    output: str        # image, relative to experiments/
+    params: Dict = field(default_factory=dict)
+    
+    def path(self, relative: str) -> str:
+        return os.path.normpath(os.path.join(EXPERIMENTS_DIR, relative))
+
+    def resolve_inputs(self) -> Tuple[List[str], List[str]]:
+        """(chosen input per slot, slots with no existing alternative), relative paths."""
+        chosen, missing = [], []
+        for slot in self.inputs:
+            options = (slot,) if isinstance(slot, str) else slot
+            found = next((p for p in options if os.path.exists(self.path(p))), None)
+            if found is None:
+                missing.append(" or ".join(options))
+            else:
+                chosen.append(found)
+        return chosen, missing
+
+
+# ---------------------------------------------------------------------------
+# Renderers: (input paths..., output path, **params)
+# ---------------------------------------------------------------------------
+
+def render_adversarial_stress(results_path, output, dpi=200):
+    with open(results_path) as f:
+        results = json.load(f)
+
+    fig, axes = plt.subplots(2, 3, figsize=(15, 10), facecolor='white')
+
+    twists = ['baseline', 'twist1', 'twist2', 'twist4', 'twist5']
+    twist_names = ['Baseline', 'Cost Inflation\n(-10→-50)', 'Freedom\nInjection', 
+                   'Execution\nSpike (2x)', 'Observation\nNoise']
+
+    ax = axes[0, 0]
+    x = np.arange(len(twists))
+    width = 0.25
+    s1_eff = [results[f"{t}_S1"]['effective'] for t in twists]
+    s2_eff = [results[f"{t}_S2"]['effective'] for t in twists]
+    v7_eff = [results[f"{t}_V7"]['effective'] for t in twists]
+
+    ax.bar(x - width, s1_eff, width, label='S1', color='#e53935', alpha=0.8)
+    ax.bar(x, s2_eff, width, label='S2', color='#FFC107', alpha=0.8)
+    ax.bar(x + width, v7_eff, width, label='V7', color='#26a69a', alpha=0.8)
+    ax.set_ylabel('Effective Performance')
+    ax.set_title('Effective Performance Under Stress', weight='bold')
+    ax.set_xticks(x)
+    ax.set_xticklabels(twist_names, fontsize=8)
+    ax.legend()
+    ax.axhline(y=0, color='#cc0000', linestyle='--', alpha=0.5)
+
+    ax = axes[0, 1]
+    s1_cat = [results[f"{t}_S1"]['cat_rate'] for t in twists]
+    s2_cat = [results[f"{t}_S2"]['cat_rate'] for t in twists]
+    v7_cat = [results[f"{t}_V7"]['cat_rate'] for t in twists]
+
+    ax.bar(x - width, s1_cat, width, label='S1', color='#e53935', alpha=0.8)
+    ax.bar(x, s2_cat, width, label='S2', color='#FFC107', alpha=0.8)
+    ax.bar(x + width, v7_cat, width, label='V7', color='#26a69a', alpha=0.8)
+    ax.set_ylabel('Catastrophic Rate (%)')
+    ax.set_title('Catastrophic Rate Under Stress', weight='bold')
+    ax.set_xticks(x)
+    ax.set_xticklabels(twist_names, fontsize=8)
+    ax.legend()
+
+    ax = axes[0, 2]
+    curve = results['erosion_curve']
+    erosion_levels = curve['structure_erosion']
+    erosion_cats = curve['cat_rate']
+
+    ax.plot(erosion_levels, erosion_cats, '-', color='#26a69a', linewidth=2)
+    ax.fill_between(erosion_levels, erosion_cats, alpha=0.3, color='#26a69a')
+    ax.set_xlabel('Structure Erosion Rate')
+    ax.set_ylabel('Catastrophic Rate (%)')
+    ax.set_title('V7: Structure Erosion Effect', weight='bold')
+    ax.axhline(y=0, color='#999', linestyle='--', alpha=0.5)
+
+    ax = axes[1, 0]
+    s1_std = [results[f"{t}_S1"]['std'] for t in twists]
+    s2_std = [results[f"{t}_S2"]['std'] for t in twists]
+    v7_std = [results[f"{t}_V7"]['std'] for t in twists]
+
+    ax.bar(x - width, s1_std, width, label='S1', color='#e53935', alpha=0.8)
+    ax.bar(x, s2_std, width, label='S2', color='#FFC107', alpha=0.8)
+    ax.bar(x + width, v7_std, width, label='V7', color='#26a69a', alpha=0.8)
+    ax.set_ylabel('Standard Deviation')
+    ax.set_title('Variance Under Stress', weight='bold')
+    ax.set_xticks(x)
+    ax.set_xticklabels(twist_names, fontsize=8)
+    ax.legend()
+
+    ax = axes[1, 1]
+    summary_data = {
+        'Cost Inflation': ('No effect', 'Collapse', 'Collapse'),
+        'Freedom Injection': ('Safe', 'Risk ↑', 'Risk ↑'),
+        'Execution Spike': ('Stable', 'Variance ↑', 'Variance ↑'),
+        'Obs Noise': ('Slower', 'Crash', 'Crash'),
+        'Structure Erosion': ('Risk appears', '-', '-')
+    }
+    ax.axis('off')
+    table_data = [['Twist', 'V7', 'S1', 'S2']]
+    for twist, (v7, s1, s2) in summary_data.items():
+        table_data.append([twist, v7, s1, s2])
+
+    table = ax.table(cellText=table_data, loc='center', cellLoc='center',
+                      colWidths=[0.35, 0.2, 0.2, 0.2])
+    table.auto_set_font_size(False)
+    table.set_fontsize(9)
+    table.scale(1.2, 1.8)
+
+    for i in range(4):
+        table[(0, i)].set_facecolor('#333333')
+        table[(0, i)].set_text_props(color='white', weight='bold')
+
+    for i in range(1, 6):
+        table[(i, 1)].set_facecolor('#e0f2f1')
+
+    ax.set_title('Summary: V7 Resilience', weight='bold', pad=20)
+
+    ax = axes[1, 2]
+    ax.text(0.5, 0.7, "V7 is not robust because\nit adapts to stress.", 
+            ha='center', va='center', fontsize=12, style='italic')
+    ax.text(0.5, 0.4, "It is robust because\nstress has nowhere to propagate.", 
+            ha='center', va='center', fontsize=13, weight='bold', color='#00695c')
+    ax.text(0.5, 0.15, "If breaking the system requires\nbreaking the structure,\nthen the structure IS the system.", 
+            ha='center', va='center', fontsize=10, color='#666')
+    ax.axis('off')
+    ax.set_title('Conclusion', weight='bold')
+
+    plt.tight_layout()
+    plt.savefig(output, dpi=dpi, facecolor='white', bbox_inches='tight')
+    plt.close()
+
+
+
+def render_performance_comparison(results_path, output, dpi=200):
+    with open(results_path) as f:
+        data = json.load(f)
+    s1_summary, s1_metrics = data["s1"]["summary"], data["s1"]["metrics"]
+    s2_summary, s2_metrics = data["s2"]["summary"], data["s2"]["metrics"]
+    v7_summary, v7_metrics = data["v7"]["summary"], data["v7"]["metrics"]
+
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5), facecolor='white')
+
+    ax1 = axes[0]
+    for summary, metrics, name, color, alpha in [(s1_summary, s1_metrics, "S1", '#e53935', 0.6),
+                                                 (s2_summary, s2_metrics, "S2", '#FFC107', 0.6),
+                                                 (v7_summary, v7_metrics, "V7", '#26a69a', 0.7)]:
+        hist = summary["histogram"]
+        ax1.hist(hist["edges"][:-1], bins=hist["edges"], weights=hist["counts"], alpha=alpha,
+                 label=f"{name} (μ={metrics['mean']}, cat={metrics['catastrophic_rate']}%)",
+                 color=color, edgecolor='white')
+
+    ax1.axvline(x=0, color='#cc0000', linestyle='--', linewidth=2, alpha=0.7)
+    ax1.text(-5, ax1.get_ylim()[1]*0.8, "Catastrophic\nZone", ha='center', fontsize=9, color='#990000', weight='bold')
+
+    ax1.set_xlabel("Outcome", fontsize=11)
+    ax1.set_ylabel("Frequency", fontsize=11)
+    ax1.set_title("Outcome Distribution", fontsize=13, weight='bold')
+    ax1.legend(loc='upper left', fontsize=9)
+    ax1.set_xlim(-12, 10)
+
+    ax2 = axes[1]
+    for summary, name, color in [(s1_summary, "S1", '#e53935'), 
+                                  (s2_summary, "S2", '#FFC107'),
+                                  (v7_summary, "V7", '#26a69a')]:
+        ax2.plot(summary["cdf"]["x"], summary["cdf"]["p"], label=name, color=color, linewidth=2.5)
+
+    ax2.axvline(x=0, color='#cc0000', linestyle='--', linewidth=1.5, alpha=0.5)
+    ax2.axvline(x=4, color='#999', linestyle=':', linewidth=1.5, alpha=0.5)
+    ax2.text(4.2, 0.05, "Quality\nThreshold", fontsize=8, color='#666')
+
+    ax2.axhline(y=0.1, color='#999', linestyle=':', linewidth=1, alpha=0.5)
+    ax2.text(-11, 0.12, "10% worst", fontsize=8, color='#666')
+
+    ax2.set_xlabel("Outcome", fontsize=11)
+    ax2.set_ylabel("Cumulative Probability", fontsize=11)
+    ax2.set_title("CDF: Probability of Outcome ≤ x", fontsize=13, weight='bold')
+    ax2.legend(loc='lower right', fontsize=10)
+    ax2.set_xlim(-12, 10)
+    ax2.set_ylim(0, 1)
+    ax2.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig(output, dpi=dpi, facecolor='white', bbox_inches='tight')
+    plt.close()
+
+
+
+def _load_states(path):
+    """(columns, system labels, outcome labels) from the columnar store or the JSON export."""
+    names = ["system", "freedom", "failure_cost", "outcome"]
+    if os.path.isdir(path):
+        return load_columns(path, names), load_categories(path, "system"), load_categories(path, "outcome")
+    with open(path) as f:
+        records = json.load(f)
+    systems = list(dict.fromkeys(r["system"] for r in records))
+    outcomes = ["success", "fail", "catastrophic"]
+    cols = {name: np.array([r[name] for r in records], dtype=float) for name in ["freedom", "failure_cost"]}
+    cols["system"] = np.array([systems.index(r["system"]) for r in records])
+    cols["outcome"] = np.array([outcomes.index(r["outcome"]) for r in records])
+    return cols, systems, outcomes
+
+
+def render_freedom_cost(states_path, output, dpi=200):
+    cols, systems, outcomes = _load_states(states_path)
+
+    fig, axes = plt.subplots(1, 3, figsize=(14, 5), facecolor='white')
+
+    color_map = {"success": "#4CAF50", "fail": "#FFC107", "catastrophic": "#F44336"}
+    outcome_colors = np.array([color_map[o] for o in outcomes])
+    catastrophic = outcomes.index("catastrophic")
+
+    for ax, (name, system) in zip(axes, [("S1: No Division", "S1"), 
+                                           ("S2: Weak Division", "S2"), 
+                                           ("V7: Full Structure", "S3_V7")]):
+        mask = cols["system"] == systems.index(system)
+        outcome = cols["outcome"][mask]
+        ax.scatter(cols["freedom"][mask], cols["failure_cost"][mask], c=outcome_colors[outcome],
+                   alpha=0.5, s=15, edgecolors='none')
+
+        ax.axhline(y=0.5, color='#999', linestyle='--', linewidth=1, alpha=0.5)
+        ax.axvline(x=0.5, color='#999', linestyle='--', linewidth=1, alpha=0.5)
+
+        ax.fill_between([0.5, 1.0], 0.5, 1.0, color='#ffcccc', alpha=0.2, zorder=0)
+
+        cat_count = int(np.count_nonzero(outcome == catastrophic))
+        ax.set_title(f"{name}\n(catastrophic: {cat_count})", fontsize=12, weight='bold')
+        ax.set_xlabel("Freedom", fontsize=10)
+        ax.set_ylabel("Failure Cost", fontsize=10)
+        ax.set_xlim(-0.05, 1.05)
+        ax.set_ylim(-0.05, 1.05)
+
+    legend_elements = [
+        Patch(facecolor='#4CAF50', label='Success'),
+        Patch(facecolor='#FFC107', label='Fail'),
+        Patch(facecolor='#F44336', label='Catastrophic'),
+        Patch(facecolor='#ffcccc', alpha=0.5, label='Danger Zone')
+    ]
+    fig.legend(handles=legend_elements, loc='upper center', ncol=4, 
+               bbox_to_anchor=(0.5, 1.02), frameon=False, fontsize=10)
+
+    plt.suptitle("Freedom × Failure Cost Distribution\n", fontsize=14, weight='bold', y=1.08)
+
+    plt.tight_layout()
+    plt.savefig(output, dpi=dpi, facecolor='white', bbox_inches='tight', pad_inches=0.3)
+    plt.close()
+
+
+
+def _violin_stats(metrics):
+    """Violin body from a distribution summary (batched runs keep no outcomes)."""
+    summary = metrics["summary"]
+    edges = np.asarray(summary["histogram"]["edges"])
+    counts = np.asarray(summary["histogram"]["counts"], dtype=float)
+    return {
+        "coords": (edges[:-1] + edges[1:]) / 2,
+        "vals": counts / (counts.sum() * np.diff(edges)),
+        "mean": metrics["mean"],
+        "median": summary["quantiles"]["0.5"],
+        "min": summary["cdf"]["x"][0],
+        "max": summary["cdf"]["x"][-1],
+    }
+
+
+def render_jve_distribution(results_path, output, dpi=200):
+    with open(results_path) as f:
+        data = json.load(f)
+
+    metrics = data["metrics"]
+    B_mean = metrics["B"]["mean"]
+    D_mean = metrics["D"]["mean"]
+
+    fig, ax = plt.subplots(figsize=(8, 6), facecolor='white')
+
+    ax.axhspan(-0.5, 1.5, color='#ffcccc', alpha=0.5, zorder=0)
+    ax.axhline(y=1.5, color='#cc0000', linewidth=1.5, linestyle='--', alpha=0.7)
+    ax.text(1.5, 0.3, "Irreversible Failure Zone", ha="center", fontsize=10, 
+            color='#990000', weight='bold', style='italic')
+
+    if "outcomes" in metrics["B"]:
+        parts = ax.violinplot(
+            [metrics["B"]["outcomes"], metrics["D"]["outcomes"]],
+            positions=[1, 2],
+            showmeans=False,
+            showmedians=False,
+            showextrema=False,
+            widths=0.6
+        )
+    else:
+        parts = ax.violin(
+            [_violin_stats(metrics["B"]), _violin_stats(metrics["D"])],
+            positions=[1, 2],
+            showmeans=False,
+            showmedians=False,
+            showextrema=False,
+            widths=0.6
+        )
+
+    colors = ['#e53935', '#26a69a']
+    for i, pc in enumerate(parts['bodies']):
+        pc.set_facecolor(colors[i])
+        pc.set_edgecolor('#333333')
+        pc.set_linewidth(1.5)
+        pc.set_alpha(0.85)
+
+    ax.scatter([1, 2], [B_mean, D_mean], color="white", s=80, zorder=6, edgecolor='black', linewidth=2)
+
+    ax.annotate(
+        '',
+        xy=(1, 0.5), xytext=(1, 2.5),
+        arrowprops=dict(arrowstyle='<->', color='#cc0000', lw=2),
+        zorder=3
+    )
+    ax.text(0.7, 1.5, "tail\nrisk", ha='center', va='center', fontsize=9, color='#990000', weight='bold')
+
+    ax.annotate(
+        'Bar1 + Constraint',
+        xy=(2, 8.5),
+        ha='center',
+        fontsize=10,
+        color='#00695c',
+        weight='bold',
+        bbox=dict(boxstyle='round,pad=0.3', facecolor='#e0f2f1', edgecolor='#26a69a', linewidth=1.5)
+    )
+
+    ax.set_xticks([1, 2])
+    ax.set_xticklabels(['High-Execution', 'Structured (V7)'], fontsize=12, weight='bold')
+    ax.set_ylabel("Outcome Quality", fontsize=12)
+    ax.set_ylim(-1, 11)
+    ax.set_xlim(0.3, 2.7)
+
+    ax.set_title(
+        "Execution Power vs Execution Structure",
+        fontsize=15,
+        weight='bold',
+        pad=15
+    )
+
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+
+    red_patch = mpatches.Patch(color='#e53935', alpha=0.85, label='High-Execution: Wide variance, 11% catastrophic')
+    teal_patch = mpatches.Patch(color='#26a69a', alpha=0.85, label='Structured (V7): Compressed, 0% catastrophic')
+    ax.legend(handles=[red_patch, teal_patch], loc='upper left', framealpha=0.9, fontsize=9)
+
+    plt.tight_layout()
+    plt.savefig(output, dpi=dpi, facecolor='white', bbox_inches='tight')
+    plt.close()
+
+
+FIGURES = {spec.name: spec for spec in [
+    FigureSpec("adversarial_stress_test", render_adversarial_stress,
+               ["results/adversarial_stress_results.json"],
+               "../images/adversarial_stress_test.png", {"dpi": 200}),
+    FigureSpec("performance_comparison", render_performance_comparison,
+               ["results/performance_comparison.json"],
+               "../images/performance_comparison.png", {"dpi": 200}),
+    FigureSpec("freedom_cost_distribution", render_freedom_cost,
+               [("results/macro_micro_states.cols", "results/macro_micro_states.json")],
+               "../images/freedom_cost_distribution.png", {"dpi": 200}),
+    FigureSpec("judgment_vs_execution_distribution", render_jve_distribution,
+               ["results/jve_results.json"],
+               "../images/judgment_vs_execution_distribution.png", {"dpi": 200}),
+]}
+
+
+# ---------------------------------------------------------------------------
+# Content-hashed cache
+# ---------------------------------------------------------------------------
+
+def _hash_path(h, path):
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                full = os.path.join(root, name)
+                h.update(os.path.relpath(full, path).encode())
+                _hash_path(h, full)
+        return
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+
+
+def figure_hash(spec: FigureSpec) -> str:
+    """sha256 over the drawing code, the plot parameters and every input's bytes."""
+    h = hashlib.sha256()
+    h.update(spec.name.encode())
+    h.update(inspect.getsource(spec.render).encode())
+    h.update(json.dumps(spec.params, sort_keys=True).encode())
+    for relative in spec.resolve_inputs()[0]:
+        h.update(relative.encode())
+        _hash_path(h, spec.path(relative))
+    return h.hexdigest()
+
+
+def _load_cache() -> Dict[str, str]:
+    try:
+        with open(CACHE_FILE) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+@contextmanager
+def _cache_locked():
+    """Serializes the cache's read-modify-write across concurrent renders."""
+    os.makedirs(os.path.dirname(CACHE_LOCK), exist_ok=True)
+    with open(CACHE_LOCK, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _save_cache(cache: Dict[str, str]):
+    os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+    tmp = f"{CACHE_FILE}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp, CACHE_FILE)
+
+
+def _render_one(name: str) -> Tuple[str, Optional[str]]:
+    """(name, None) once drawn; (name, error) if the renderer raised, so one bad input can't stop the rest."""
+    spec = FIGURES[name]
+    output = spec.path(spec.output)
+    try:
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        spec.render(*(spec.path(p) for p in spec.resolve_inputs()[0]), output, **spec.params)
+    except Exception as e:
+        plt.close("all")
+        return name, f"{type(e).__name__}: {e}"
+    return name, None
+
+
+def render_figures(names: Optional[List[str]] = None, force: bool = False,
+                   workers: Optional[int] = None) -> Dict[str, str]:
+    """
+    Render the named figures (all by default), skipping those whose hash
+    matches the cached one. Stale figures render in parallel processes
+    (default: the pipeline's per-stage budget, else all cores).
+    Returns {name: "rendered" | "cached" | "missing input" | "failed"}.
+    """
+    names = list(FIGURES) if names is None else names
+    cache = _load_cache()
+    status, stale = {}, {}
+    
+    for name in names:
+        spec = FIGURES[name]
+        output_rel = os.path.relpath(spec.path(spec.output), REPO_DIR)
+        _, missing = spec.resolve_inputs()
+        if missing:
+            status[name] = "missing input"
+            print(f"⚠️  Skipped: {output_rel} (missing {', '.join(missing)})")
+            continue
+        digest = figure_hash(spec)
+        if not force and cache.get(name) == digest and os.path.exists(spec.path(spec.output)):
+            # the image is current as of now: refresh its mtime so pipeline.py's
+            # timestamp check doesn't keep seeing it as older than its sources
+            os.utime(spec.path(spec.output))
+            status[name] = "cached"
+            print(f"⏭  Up to date: {output_rel}")
+            continue
+        stale[name] = digest
+    
+    workers = min(workers or default_workers(), len(stale))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            done = list(pool.map(_render_one, stale))
+    else:
+        done = [_render_one(name) for name in stale]
+    
+    rendered = {}
+    for name, error in done:
+        output_rel = os.path.relpath(FIGURES[name].path(FIGURES[name].output), REPO_DIR)
+        if error:
+            status[name] = "failed"
+            print(f"❌ Failed: {output_rel} ({error})")
+            continue
+        rendered[name] = stale[name]
+        status[name] = "rendered"
+        print(f"✅ Saved: {output_rel}")
+    if rendered:
+        # reload under the lock: another stage may have saved its figures meanwhile
+        with _cache_locked():
+            _save_cache({**_load_cache(), **rendered})
+    return status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render figures from stored results")
+    parser.add_argument("names", nargs="*", help=f"figures to render (default: all of {', '.join(FIGURES)})")
+    parser.add_argument("--force", action="store_true", help="ignore the cache and re-render")
+    parser.add_argument("--workers", type=int, default=None, help="parallel render processes")
+    args = parser.parse_args()
+    
+    status = render_figures(args.names or None, force=args.force, workers=args.workers)
+    sys.exit(1 if "failed" in status.values() else 0)
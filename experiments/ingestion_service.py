@@ -0,0 +1,248 @@
+"""
+Turn Ingestion Service
+
+Live capture of chat sessions into the run log.
+
+Clients stream newline-delimited JSON events over a unix socket:
+
+    {"event": "open",  "session": "s1", "task_id": "T1", "condition": "C", "prompt": "..."}
+    {"event": "turn",  "session": "s1", "intent": "...", "output": "...",
+                       "change_type": "major", "violation": false}
+    {"event": "close", "session": "s1", "quality": 8.0, "time_min": 5.0,
+                       "delta_intent": "...", "output_path": null, "notes": ""}
+
+A turn event may ask for the session's execution gate with "gate": true;
+the reply is one line {"session", "turn", "gate_open", "bar1", "reason"}
+from the session's online Bar1 detector.
+
+Each session holds one ExperimentRun in memory. A close finalizes the run
+and queues it for the writer, which appends batches to the RunLog. The
+queue is bounded: when storage falls behind, closes wait for room, the
+connection stops being read, and the client is slowed by the socket
+itself. Malformed events are answered with one {"error": ...} line and
+change nothing. Sessions a client leaves open when it disconnects are
+discarded. A batch the log refuses is retried, then dropped and counted.
+
+    python ingestion_service.py --socket /tmp/chat_runs.sock --log runs/
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Dict, Optional, Set
+
+from bar1_detector import SessionGates
+from experiment_design import (CONDITIONS, ChangeType, ConditionAggregates, ExperimentRun, add_turn,
+                               create_run, finalize_run, run_to_dict)
+from run_log import RunLog
+
+QUEUE_SIZE = 10_000
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 0.05  # seconds a partial batch may wait
+WRITE_RETRIES = 3
+RETRY_DELAY = 0.5  # seconds, doubled after each failed append
+
+
+class IngestionService:
+    def __init__(self, log_path: str = ".", socket_path: str = "chat_runs.sock",
+                 queue_size: int = QUEUE_SIZE, batch_size: int = BATCH_SIZE,
+                 flush_interval: float = FLUSH_INTERVAL):
+        self.log = RunLog(log_path)
+        self.socket_path = socket_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sessions: Dict[str, ExperimentRun] = {}
+        self.aggregates = ConditionAggregates()
+        self.gates = SessionGates()
+        self.events = 0
+        self.errors = 0
+        self.runs_written = 0
+        self.batches = 0
+        self.abandoned = 0
+        self.write_errors = 0
+        self.runs_dropped = 0
+        self.last_write_error: Optional[str] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._queue_size = queue_size
+        self._server = None
+        self._writer_task = None
+
+    # -- events ------------------------------------------------------------
+
+    async def handle_event(self, event: Dict, owned: Optional[Set[str]] = None) -> Optional[Dict]:
+        """
+        Apply one event; returns a reply for gate requests, else None.
+        owned: the connection's open sessions, kept up to date on open/close.
+        """
+        reply = None
+        if not isinstance(event, dict):
+            raise TypeError(f"event must be an object, got {type(event).__name__}")
+        kind = event["event"]
+        session = event["session"]
+        if kind != "open" and session not in self.sessions:
+            raise ValueError(f"unknown session: {session}")
+        if kind == "turn":
+            # one normalized label for both the run and the gate ("MAJOR" → "major")
+            change = ChangeType.parse(event["change_type"]).label
+            violation = bool(event.get("violation", False))
+            add_turn(self.sessions[session], event.get("intent", ""), event.get("output", ""),
+                     change, violation, aggregates=self.aggregates)
+            decision = self.gates.update(session, change, violation)
+            if event.get("gate"):
+                reply = {"session": session, "turn": decision.turn_idx, "gate_open": decision.gate_open,
+                         "bar1": decision.bar1, "reason": decision.reason}
+        elif kind == "open":
+            if session in self.sessions:
+                raise ValueError(f"session already open: {session}")
+            condition = event.get("condition", "C")
+            if condition not in CONDITIONS:
+                raise ValueError(f"unknown condition: {condition!r}")
+            self.sessions[session] = create_run(event["task_id"], condition, event.get("prompt", ""))
+            if owned is not None:
+                owned.add(session)
+        elif kind == "close":
+            # every field is checked before the session is touched
+            quality = float(event["quality"])
+            time_min = float(event.get("time_min", 0.0))
+            delta_intent = event.get("delta_intent", "")
+            output_path = event.get("output_path")
+            notes = event.get("notes", "")
+            run = self.sessions.pop(session)
+            self.gates.close(session)
+            if owned is not None:
+                owned.discard(session)
+            finalize_run(run, quality=quality, delta_intent=delta_intent, time_min=time_min,
+                         output_path=output_path, notes=notes, aggregates=self.aggregates)
+            await self._queue.put(run_to_dict(run))
+        else:
+            raise ValueError(f"unknown event: {kind}")
+        self.events += 1
+        return reply
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        owned: Set[str] = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    reply = await self.handle_event(json.loads(line), owned)
+                except Exception as e:
+                    # a bad event is the client's problem, never the connection's
+                    self.errors += 1
+                    message = f"missing field: {e}" if isinstance(e, KeyError) else str(e)
+                    reply = {"error": message or type(e).__name__}
+                if reply is not None:
+                    writer.write((json.dumps(reply) + "\n").encode())
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._abandon(owned)
+            writer.close()
+
+    def _abandon(self, sessions: Set[str]):
+        """Drop sessions whose client went away without closing them."""
+        for session in sessions:
+            if self.sessions.pop(session, None) is not None:
+                self.gates.close(session)
+                self.abandoned += 1
+        sessions.clear()
+
+    # -- storage -----------------------------------------------------------
+
+    async def _writer(self):
+        """Drain the queue into the run log, one append_many per batch."""
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._append(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _append(self, batch):
+        """append_many with retries; a batch that still fails is dropped and counted."""
+        delay = RETRY_DELAY
+        for attempt in range(WRITE_RETRIES + 1):
+            try:
+                await asyncio.to_thread(self.log.append_many, batch)
+            except Exception as e:
+                self.write_errors += 1
+                self.last_write_error = f"{type(e).__name__}: {e}"
+                if attempt == WRITE_RETRIES:
+                    self.runs_dropped += len(batch)
+                    print(f"⚠️  Dropped {len(batch)} runs: {self.last_write_error}")
+                    return
+                await asyncio.sleep(delay)
+                delay *= 2
+            else:
+                self.runs_written += len(batch)
+                self.batches += 1
+                return
+
+    # -- lifecycle ---------------------------------------------------------
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self._queue_size)
+        self._writer_task = asyncio.create_task(self._writer())
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        self._server = await asyncio.start_unix_server(self._handle_client, path=self.socket_path)
+
+    async def stop(self):
+        """Stop accepting clients and flush every finalized run to disk."""
+        self._server.close()
+        await self._server.wait_closed()
+        await self._queue.join()
+        self._writer_task.cancel()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+    def stats(self) -> Dict:
+        return {
+            "events": self.events,
+            "errors": self.errors,
+            "open_sessions": len(self.sessions),
+            "queued": self._queue.qsize() if self._queue else 0,
+            "runs_written": self.runs_written,
+            "batches": self.batches,
+            "abandoned": self.abandoned,
+            "write_errors": self.write_errors,
+            "runs_dropped": self.runs_dropped,
+        }
+
+
+async def serve(log_path: str, socket_path: str, report_every: float = 10.0):
+    service = IngestionService(log_path, socket_path)
+    await service.start()
+    print(f"🔌 Listening on {socket_path}, logging runs to {service.log.log_path}")
+    try:
+        while True:
+            await asyncio.sleep(report_every)
+            print(f"   {service.stats()}")
+    finally:
+        await service.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest live Turn events into the run log")
+    parser.add_argument("--socket", default="chat_runs.sock", help="unix socket path")
+    parser.add_argument("--log", default=".", help="run log directory")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.log, args.socket))
+    except KeyboardInterrupt:
+        pass
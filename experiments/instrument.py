@@ -0,0 +1,185 @@
+"""
+Hot-Path Instrumentation
+
+Opt-in timers, branch counters and RNG-draw counts for the simulation kernels.
+
+Off by default. A kernel asks for a trace once per call; while disabled it
+gets None, and its loop only tests that local. Enabled, each kernel call
+becomes one JSON line: kernel, params, stage timers, branch counters and
+draws by distribution. Scalar and vectorized engines use the same counter
+names, so their per-sample rates can be compared directly.
+
+    SIM_TRACE=results/trace.jsonl python adversarial_stress_test.py
+    python instrument.py results/trace.jsonl          # per-kernel summary
+
+Workers inherit SIM_TRACE and append to the same file.
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+TRACE_ENV = "SIM_TRACE"
+
+ENABLED = bool(os.environ.get(TRACE_ENV))
+TRACE_PATH: Optional[str] = os.environ.get(TRACE_ENV) or None
+_fd: Optional[int] = None
+_traces: List[Dict] = []
+KEEP_IN_MEMORY = 100_000  # finished traces kept for traces(); the file keeps all
+
+
+class Trace:
+    __slots__ = ("kernel", "params", "timers", "counters", "draws", "_start", "_lap")
+
+    def __init__(self, kernel: str, params: Dict):
+        self.kernel = kernel
+        self.params = params
+        self.timers: Dict[str, float] = {}
+        self.counters = Counter()
+        self.draws = Counter()
+        self._start = self._lap = time.perf_counter()
+
+    def count(self, branch: str, k=1):
+        self.counters[branch] += int(k)
+
+    def draw(self, kind: str, k=1):
+        self.draws[kind] += int(k)
+
+    def lap(self, stage: str):
+        """Charge the time since the previous lap (or the start) to stage."""
+        now = time.perf_counter()
+        self.timers[stage] = self.timers.get(stage, 0.0) + now - self._lap
+        self._lap = now
+
+    def finish(self, **extra) -> Dict:
+        self.timers["total"] = time.perf_counter() - self._start
+        record = {
+            "kernel": self.kernel,
+            "params": self.params,
+            "timers": self.timers,
+            "counters": dict(self.counters),
+            "draws": dict(self.draws),
+            "pid": os.getpid(),
+            "time": time.time(),
+            **extra,
+        }
+        if len(_traces) < KEEP_IN_MEMORY:
+            _traces.append(record)
+        if TRACE_PATH:
+            _write(record)
+        return record
+
+
+def _write(record: Dict):
+    global _fd
+    if _fd is None:
+        directory = os.path.dirname(TRACE_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        _fd = os.open(TRACE_PATH, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    # one write per line on an O_APPEND descriptor: concurrent workers never interleave
+    os.write(_fd, (json.dumps(record, default=str) + "\n").encode())
+
+
+def start(kernel: str, **params) -> Optional[Trace]:
+    """A new trace while instrumentation is enabled, else None."""
+    if not ENABLED:
+        return None
+    return Trace(kernel, params)
+
+
+def counted(fn, trace: Optional[Trace], kind: str):
+    """fn itself when not tracing; otherwise fn counting one `kind` draw per call."""
+    if trace is None:
+        return fn
+    draws = trace.draws
+
+    def wrapper(*args, **kwargs):
+        draws[kind] += 1
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+def enable(trace_path: Optional[str] = None):
+    """Turn probes on; trace_path (also exported to child processes) receives JSON lines."""
+    global ENABLED, TRACE_PATH, _fd
+    ENABLED = True
+    if trace_path != TRACE_PATH and _fd is not None:
+        os.close(_fd)
+        _fd = None
+    TRACE_PATH = trace_path
+    if trace_path:
+        os.environ[TRACE_ENV] = trace_path
+
+
+def disable():
+    global ENABLED, TRACE_PATH, _fd
+    ENABLED = False
+    TRACE_PATH = None
+    os.environ.pop(TRACE_ENV, None)
+    if _fd is not None:
+        os.close(_fd)
+        _fd = None
+
+
+def traces() -> List[Dict]:
+    return list(_traces)
+
+
+def reset():
+    _traces.clear()
+
+
+def load(path: str) -> List[Dict]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.endswith("\n")]
+
+
+def summarize(records: List[Dict]) -> Dict[str, Dict]:
+    """
+    Totals per kernel (and system/agent), with counters and draws also
+    given per sample so scalar and vectorized engines line up.
+    """
+    table: Dict[str, Dict] = {}
+    for r in records:
+        p = r["params"]
+        key = r["kernel"] + "".join(f"[{p[k]}]" for k in ("system", "agent", "twist") if k in p)
+        row = table.setdefault(key, {"calls": 0, "samples": 0, "timers": Counter(),
+                                     "counters": Counter(), "draws": Counter()})
+        row["calls"] += 1
+        row["samples"] += p.get("n", 1)
+        row["timers"].update(r["timers"])
+        row["counters"].update(r["counters"])
+        row["draws"].update(r["draws"])
+    for row in table.values():
+        n = row["samples"] or 1
+        row["rates"] = {k: v / n for k, v in row["counters"].items()}
+        row["draws_per_sample"] = {k: v / n for k, v in row["draws"].items()}
+    return table
+
+
+def print_summary(table: Dict[str, Dict]):
+    for key, row in sorted(table.items()):
+        seconds = row["timers"]["total"]
+        print(f"\n{key}")
+        print(f"   calls={row['calls']:,}  samples={row['samples']:,}  "
+              f"{seconds:.3f}s  ({row['samples'] / seconds if seconds else 0:,.0f}/s)")
+        stages = {k: v for k, v in row["timers"].items() if k != "total"}
+        if stages:
+            print("   stages:   " + "  ".join(f"{k}={v / seconds:.0%}" for k, v in stages.items()))
+        if row["rates"]:
+            print("   branches: " + "  ".join(f"{k}={v:.4f}" for k, v in sorted(row["rates"].items())))
+        if row["draws_per_sample"]:
+            print("   draws:    " + "  ".join(f"{k}={v:.2f}" for k, v in sorted(row["draws_per_sample"].items())))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize a simulator trace (JSON lines)")
+    parser.add_argument("trace", help=f"trace file written under {TRACE_ENV}=...")
+    parser.add_argument("-k", "--filter", default=None, help="only kernels whose name contains this")
+    args = parser.parse_args()
+    records = [r for r in load(args.trace) if not args.filter or args.filter in r["kernel"]]
+    print_summary(summarize(records))
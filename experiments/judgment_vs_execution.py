@@ -11,6 +11,7 @@ regardless of judgment quality.
 """
 
 import json
+import math
 import random
 import statistics
 from dataclasses import dataclass, asdict
@@ -18,6 +19,18 @@ from enum import Enum
 from typing import List, Dict, Optional
 from datetime import datetime
 
+import numpy as np
+
+import instrument
+from metrics_stream import OutcomeAccumulator, distribution_summary
+from quantile_sketch import QuantileSketch
+from resampling import (REPLICATES, bootstrap, centered, format_test, permutation_test, proportion_test,
+                        row_std)
+from result_cache import memoize
+
+SKETCH_K = 200  # batched/streamed IQR is exact up to this many runs per agent
+OUTCOME_EDGES = np.linspace(0, 10, 41)
+
 
 class AgentType(Enum):
     JUDGMENT_ONLY = "A"
@@ -57,22 +70,24 @@ class DistributionMetrics:
 
 
 class Task:
-    def __init__(self, seed: int):
-        random.seed(seed)
+    def __init__(self, seed: int, rng: Optional[random.Random] = None):
+        # Each task owns its stream: Random(seed) draws exactly what the
+        # global random.seed(seed) used to, without sharing module state.
+        self.rng = rng if rng is not None else random.Random(seed)
         self.state = TaskState(
-            ambiguity=random.uniform(0.3, 0.9),
-            condition_change_at=random.randint(2, 5),
-            irreversible_cost=random.uniform(0.1, 0.5),
-            goal_revealed_at=random.randint(3, 7)
+            ambiguity=self.rng.uniform(0.3, 0.9),
+            condition_change_at=self.rng.randint(2, 5),
+            irreversible_cost=self.rng.uniform(0.1, 0.5),
+            goal_revealed_at=self.rng.randint(3, 7)
         )
         self.current_turn = 0
         self.executed = False
         self.outcome = None
     
     def get_judgment_signal(self) -> float:
-        base = 0.5 + random.gauss(0, 0.1)
+        base = 0.5 + self.rng.gauss(0, 0.1)
         if self.current_turn < self.state.goal_revealed_at:
-            base += random.gauss(0, self.state.ambiguity * 0.3)
+            base += self.rng.gauss(0, self.state.ambiguity * 0.3)
         return max(0, min(1, base))
     
     def execute(self, quality: float) -> float:
@@ -83,9 +98,9 @@ class Task:
         
         if self.current_turn < self.state.condition_change_at:
             penalty = self.state.irreversible_cost * self.state.ambiguity
-            self.outcome = quality - penalty + random.gauss(0, 0.2)
+            self.outcome = quality - penalty + self.rng.gauss(0, 0.2)
         else:
-            self.outcome = quality + random.gauss(0, 0.05)
+            self.outcome = quality + self.rng.gauss(0, 0.05)
         
         return self.outcome
     
@@ -94,15 +109,20 @@ class Task:
 
 
 class Agent:
-    def __init__(self, agent_type: AgentType):
+    def __init__(self, agent_type: AgentType, trace: Optional[instrument.Trace] = None):
         self.type = agent_type
         self.judgments = []
         self.executions = 0
         self.first_execution_turn = None
+        self.trace = trace
     
     def decide(self, task: Task) -> Optional[float]:
         signal = task.get_judgment_signal()
         self.judgments.append(signal)
+        trace = self.trace
+        if trace:
+            trace.count("decisions")
+            trace.draw("normal", 1 + (task.current_turn < task.state.goal_revealed_at))
         
         if self.type == AgentType.JUDGMENT_ONLY:
             return None
@@ -118,6 +138,8 @@ class Agent:
         elif self.type == AgentType.STRUCTURED_V7:
             if self._bar1_satisfied(task) and self._constraints_met(signal):
                 return self._execute(task, signal)
+            if trace:
+                trace.count("constraint_reject" if self._bar1_satisfied(task) else "bar1_wait")
         
         return None
     
@@ -125,6 +147,12 @@ class Agent:
         if self.first_execution_turn is None:
             self.first_execution_turn = task.current_turn
         self.executions += 1
+        if self.trace:
+            self.trace.count("executions")
+            if task.executed:
+                self.trace.count("repeat_executions")
+            else:
+                self.trace.draw("normal")
         return task.execute(quality)
     
     def _bar1_satisfied(self, task: Task) -> bool:
@@ -139,9 +167,16 @@ class Agent:
         return consistency > 0.5 and signal > 0.45
 
 
-def simulate(agent_type: AgentType, seed: int, max_turns: int = 10) -> ExperimentResult:
-    task = Task(seed)
-    agent = Agent(agent_type)
+def simulate(agent_type: AgentType, seed: int, max_turns: int = 10,
+             rng: Optional[random.Random] = None) -> ExperimentResult:
+    """rng defaults to random.Random(seed); pass one to control the stream explicitly."""
+    trace = instrument.start("jve.simulate", n=1, agent=agent_type.value, seed=seed)
+    task = Task(seed, rng)
+    agent = Agent(agent_type, trace)
+    if trace:
+        trace.draw("uniform", 2)
+        trace.draw("randint", 2)
+        trace.lap("setup")
     
     outcome = None
     for _ in range(max_turns):
@@ -159,6 +194,10 @@ def simulate(agent_type: AgentType, seed: int, max_turns: int = 10) -> Experimen
             outcome = 0.0
     
     is_catastrophic = outcome < 0.1 and agent.executions > 0
+    if trace:
+        trace.count("catastrophic", is_catastrophic)
+        trace.lap("turns")
+        trace.finish()
     
     return ExperimentResult(
         agent=agent_type.value,
@@ -171,6 +210,207 @@ def simulate(agent_type: AgentType, seed: int, max_turns: int = 10) -> Experimen
     )
 
 
+@dataclass
+class BatchResult:
+    """Per-seed ExperimentResult fields for a whole batch, one array per field."""
+    agent: str
+    run_id: np.ndarray
+    outcome_quality: np.ndarray
+    is_catastrophic: np.ndarray
+    time_to_action: np.ndarray
+    execution_count: np.ndarray
+    variance_contribution: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.run_id)
+    
+    def to_results(self) -> List[ExperimentResult]:
+        return [
+            ExperimentResult(agent=self.agent, run_id=r, outcome_quality=q, is_catastrophic=c,
+                             time_to_action=t, execution_count=e, variance_contribution=v)
+            for r, q, c, t, e, v in zip(
+                self.run_id.tolist(), self.outcome_quality.tolist(),
+                self.is_catastrophic.tolist(), self.time_to_action.tolist(),
+                self.execution_count.tolist(), self.variance_contribution.tolist())
+        ]
+    
+    @classmethod
+    def from_results(cls, results: List[ExperimentResult]) -> "BatchResult":
+        return cls(results[0].agent, *(
+            np.array([getattr(r, field) for r in results])
+            for field in ("run_id", "outcome_quality", "is_catastrophic", "time_to_action",
+                          "execution_count", "variance_contribution")))
+
+
+def simulate_batch(agent_type: AgentType, seeds, max_turns: int = 10,
+                   rng=None) -> BatchResult:
+    """
+    Lockstep version of simulate(): every seed's TaskState and agent state
+    is a column, and all seeds advance through the turns together.
+    
+    Same per-seed rules as Task/Agent (signal, Bar1, constraints, the
+    one-shot irreversible execute), drawn from a NumPy generator instead
+    of the per-seed random stream.
+    """
+    rng = np.random.default_rng(rng)
+    run_id = np.asarray(seeds)
+    n = len(run_id)
+    trace = instrument.start("jve.simulate_batch", n=n, agent=agent_type.value)
+    
+    ambiguity = rng.uniform(0.3, 0.9, n)
+    condition_change_at = rng.integers(2, 6, n)
+    irreversible_cost = rng.uniform(0.1, 0.5, n)
+    goal_revealed_at = rng.integers(3, 8, n)
+    if trace:
+        trace.draw("uniform", 2 * n)
+        trace.draw("randint", 2 * n)
+        trace.lap("setup")
+    
+    executed = np.zeros(n, dtype=bool)
+    outcome = np.zeros(n)
+    executions = np.zeros(n, dtype=np.int64)
+    first_execution_turn = np.full(n, -1, dtype=np.int64)
+    prev_signal = None
+    
+    for turn in range(max_turns):
+        base = 0.5 + rng.normal(0, 0.1, n)
+        base += np.where(turn < goal_revealed_at,
+                         rng.standard_normal(n) * ambiguity * 0.3, 0.0)
+        signal = np.clip(base, 0, 1)
+        
+        if agent_type == AgentType.HIGH_EXECUTION:
+            fire = signal > 0.4
+        elif agent_type == AgentType.DELAYED_EXECUTION:
+            fire = signal > 0.5 if turn >= 3 else np.zeros(n, dtype=bool)
+        elif agent_type == AgentType.STRUCTURED_V7:
+            if prev_signal is None:
+                fire = np.zeros(n, dtype=bool)
+            else:
+                consistency = 1 - np.abs(prev_signal - signal)
+                fire = ((turn >= condition_change_at)
+                        & (consistency > 0.5) & (signal > 0.45))
+        else:
+            fire = np.zeros(n, dtype=bool)
+        prev_signal = signal
+        if trace:
+            # same branches Agent.decide counts, one column per seed
+            trace.count("decisions", n)
+            trace.draw("normal", 2 * n)
+            trace.count("executions", np.count_nonzero(fire))
+            trace.count("repeat_executions", np.count_nonzero(fire & executed))
+            if agent_type == AgentType.STRUCTURED_V7:
+                bar1 = turn >= condition_change_at
+                trace.count("bar1_wait", np.count_nonzero(~bar1))
+                trace.count("constraint_reject", np.count_nonzero(bar1 & ~fire))
+        
+        first_execution_turn[fire & (first_execution_turn < 0)] = turn
+        executions += fire
+        
+        first = fire & ~executed
+        if first.any():
+            if trace:
+                trace.draw("normal", n)
+            early = turn < condition_change_at
+            noise = rng.standard_normal(n) * np.where(early, 0.2, 0.05)
+            penalty = np.where(early, irreversible_cost * ambiguity, 0.0)
+            outcome = np.where(first, signal - penalty + noise, outcome)
+            executed |= fire
+    
+    if agent_type == AgentType.JUDGMENT_ONLY:
+        default = 0.3
+    elif agent_type == AgentType.STRUCTURED_V7:
+        default = 0.5
+    else:
+        default = 0.0
+    outcome = np.where(executed, outcome, default)
+    is_catastrophic = (outcome < 0.1) & (executions > 0)
+    if trace:
+        trace.count("catastrophic", np.count_nonzero(is_catastrophic))
+        trace.lap("turns")
+        trace.finish()
+    
+    return BatchResult(
+        agent=agent_type.value,
+        run_id=run_id,
+        outcome_quality=np.clip(outcome, 0, 1) * 10,
+        is_catastrophic=is_catastrophic,
+        # first_execution_turn or max_turns: turn 0 counts as "no action", as in simulate()
+        time_to_action=np.where(first_execution_turn > 0, first_execution_turn, max_turns),
+        execution_count=executions,
+        variance_contribution=np.abs(outcome - 0.5)
+    )
+
+
+class DistributionState:
+    """
+    Mergeable running state behind DistributionMetrics: quality moments,
+    catastrophic and time-to-action totals, and a quantile sketch for the
+    IQR. Chunks and workers each fill one and merge; no outcome is kept.
+    """
+    __slots__ = ("agent", "quality", "sketch", "catastrophic", "time_sum")
+    
+    def __init__(self, agent: str, k: int = SKETCH_K, seed=0):
+        self.agent = agent
+        self.quality = OutcomeAccumulator()
+        self.sketch = QuantileSketch(k, seed)
+        self.catastrophic = 0
+        self.time_sum = 0
+    
+    def update(self, batch: BatchResult) -> "DistributionState":
+        self.quality.update(batch.outcome_quality)
+        self.sketch.update(batch.outcome_quality)
+        self.catastrophic += int(np.count_nonzero(batch.is_catastrophic))
+        self.time_sum += int(batch.time_to_action.sum())
+        return self
+    
+    def merge(self, other: "DistributionState") -> "DistributionState":
+        self.quality.merge(other.quality)
+        self.sketch.merge(other.sketch)
+        self.catastrophic += other.catastrophic
+        self.time_sum += other.time_sum
+        return self
+    
+    def metrics(self) -> DistributionMetrics:
+        n = self.quality.count
+        return DistributionMetrics(
+            agent=self.agent,
+            mean=self.quality.mean,
+            std=math.sqrt(self.quality.m2 / (n - 1)) if n > 1 else 0,
+            iqr=self.sketch.iqr(),
+            catastrophic_rate=self.catastrophic / n,
+            avg_time_to_action=self.time_sum / n,
+            n_runs=n
+        )
+    
+    def to_dict(self) -> Dict:
+        q = self.quality
+        return {
+            "agent": self.agent,
+            "count": q.count,
+            "mean": q.mean,
+            "m2": q.m2,
+            "min": q.min,
+            "catastrophic": self.catastrophic,
+            "time_sum": self.time_sum,
+            "sketch": self.sketch.to_dict(),
+        }
+    
+    @classmethod
+    def from_dict(cls, d: Dict) -> "DistributionState":
+        state = cls(d["agent"])
+        q = state.quality
+        q.count, q.mean, q.m2, q.min = d["count"], d["mean"], d["m2"], d["min"]
+        state.sketch = QuantileSketch.from_dict(d["sketch"])
+        state.catastrophic = d["catastrophic"]
+        state.time_sum = d["time_sum"]
+        return state
+
+
+def analyze_batch(batch: BatchResult) -> DistributionMetrics:
+    """analyze_distribution over a BatchResult, without materializing results."""
+    return DistributionState(batch.agent).update(batch).metrics()
+
+
 def analyze_distribution(results: List[ExperimentResult]) -> DistributionMetrics:
     qualities = [r.outcome_quality for r in results]
     times = [r.time_to_action for r in results]
@@ -192,29 +432,131 @@ def analyze_distribution(results: List[ExperimentResult]) -> DistributionMetrics
     )
 
 
-def run_full_experiment(n_runs: int = 100) -> Dict:
+def _simulate_seed_range(agent_type: AgentType, start: int, stop: int,
+                         cache: bool = False) -> List[ExperimentResult]:
+    run = memoize(simulate, depends_on=(Task, Agent), seed_arg="seed") if cache else simulate
+    return [run(agent_type, seed) for seed in range(start, stop)]
+
+
+def simulate_seeds_parallel(agent_type: AgentType, n_runs: int,
+                            workers: Optional[int] = None, cache: bool = False) -> List[ExperimentResult]:
+    """
+    Split range(n_runs) into contiguous seed blocks over a process pool.
+    Every seed owns its Task RNG, so the merged list (in seed order) is
+    identical to the serial one for any worker count.
+    """
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+    
+    workers = workers or os.cpu_count() or 1
+    block = max(1, -(-n_runs // (workers * 4)))
+    bounds = [(start, min(start + block, n_runs)) for start in range(0, n_runs, block)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = pool.map(_simulate_seed_range, [agent_type] * len(bounds),
+                         [b[0] for b in bounds], [b[1] for b in bounds], [cache] * len(bounds))
+        return [r for part in parts for r in part]
+
+
+def hypothesis_tests(qualities: Dict[str, np.ndarray], catastrophic: Dict[str, int],
+                     replicates: int = REPLICATES, seed: int = 0) -> Dict:
+    """
+    Bootstrap CIs and one-sided p-values for H1–H3 from per-agent outcomes.
+    
+    H1, H3: spread is compared by permuting mean-centered outcomes (H3's
+            null scales B by 0.7, so it tests D.std < 0.7·B.std)
+    H2:     A's catastrophic count against a 5% rate
+    """
+    rngs = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(6)]
+    A, B, D = (np.asarray(qualities[agent], dtype=float) for agent in "ABD")
+    
+    def spread_gap(b, a):
+        return row_std(b) - row_std(a)
+    
+    h1 = bootstrap([A, B, D], lambda a, b, d: np.minimum(row_std(b) - row_std(a), row_std(b) - row_std(d)),
+                   replicates, rng=rngs[0])
+    # both inequalities must hold: the joint p-value is the larger one
+    h1["p_value"] = max(permutation_test(centered(B), centered(A), spread_gap, "greater", replicates, rngs[1])["p_value"],
+                        permutation_test(centered(B), centered(D), spread_gap, "greater", replicates, rngs[2])["p_value"])
+    h1["statistic"] = "min(B.std - A.std, B.std - D.std)"
+    
+    h2 = proportion_test(catastrophic["A"], len(A), 0.05, "less", replicates, rng=rngs[3])
+    h2["statistic"] = "A.catastrophic_rate"
+    
+    h3 = bootstrap([D, B], lambda d, b: row_std(d) / row_std(b), replicates, rng=rngs[4])
+    h3["p_value"] = permutation_test(centered(D), 0.7 * centered(B), spread_gap, "less", replicates, rngs[5])["p_value"]
+    h3["statistic"] = "D.std / B.std"
+    return {"H1": h1, "H2": h2, "H3": h3}
+
+
+def run_full_experiment(n_runs: int = 100, engine: str = "scalar",
+                        chunk_size: int = 100_000, workers: Optional[int] = None,
+                        replicates: int = 0, cache: bool = False) -> Dict:
+    """
+    engine: "scalar" walks one Task/Agent pair per seed (published results);
+            "batched" advances chunk_size seeds at a time with simulate_batch
+            and keeps only a DistributionState per agent, so the JSON holds a
+            sketch-backed distribution summary instead of every outcome
+    workers: scalar engine only; > 1 splits seeds across a process pool
+             (results are bit-identical to the serial run)
+    replicates: > 0 adds bootstrap CIs and permutation p-values to H1–H3
+                (the batched engine then also keeps each agent's outcomes)
+    cache: scalar engine only; reuse cached simulate() runs
+    """
     print(f"\n{'='*60}")
     print("JUDGMENT VS EXECUTION EXPERIMENT")
     print(f"{'='*60}")
     print(f"Runs per agent: {n_runs}")
+    print(f"Engine: {engine}")
     print(f"Timestamp: {datetime.now().isoformat()}")
     print()
     
     all_results = {}
     all_metrics = {}
+    qualities = {}
     
-    for agent_type in AgentType:
+    for agent_index, agent_type in enumerate(AgentType):
         print(f"Running Agent {agent_type.value} ({agent_type.name})...")
-        results = [simulate(agent_type, seed) for seed in range(n_runs)]
-        metrics = analyze_distribution(results)
+        if engine == "batched":
+            rng = np.random.default_rng(np.random.SeedSequence(0, spawn_key=(agent_index,)))
+            state = DistributionState(agent_type.value)
+            kept = []
+            for start in range(0, n_runs, chunk_size):
+                batch = simulate_batch(agent_type, range(start, min(start + chunk_size, n_runs)), rng=rng)
+                state.update(batch)
+                if replicates:
+                    kept.append(batch.outcome_quality)
+            if replicates:
+                qualities[agent_type.value] = np.concatenate(kept)
+            metrics = state.metrics()
+            distribution = {"summary": distribution_summary(state.sketch, OUTCOME_EDGES)}
+        else:
+            if workers and workers > 1:
+                results = simulate_seeds_parallel(agent_type, n_runs, workers, cache)
+            else:
+                results = _simulate_seed_range(agent_type, 0, n_runs, cache)
+            metrics = analyze_distribution(results)
+            all_results[agent_type.value] = [asdict(r) for r in results]
+            distribution = {"outcomes": [r.outcome_quality for r in results]}
+            qualities[agent_type.value] = distribution["outcomes"]
         
-        all_results[agent_type.value] = [asdict(r) for r in results]
-        all_metrics[agent_type.value] = asdict(metrics)
-        all_metrics[agent_type.value]["outcomes"] = [r.outcome_quality for r in results]
+        all_metrics[agent_type.value] = {**asdict(metrics), **distribution}
         
         print(f"  Mean: {metrics.mean:.2f}, Std: {metrics.std:.2f}, "
               f"Catastrophic: {metrics.catastrophic_rate*100:.1f}%")
     
+    tests = None
+    if replicates:
+        catastrophic = {a: round(m["catastrophic_rate"] * m["n_runs"]) for a, m in all_metrics.items()}
+        tests = hypothesis_tests(qualities, catastrophic, replicates)
+    return evaluate_hypotheses(all_metrics, n_runs, tests)
+
+
+def evaluate_hypotheses(all_metrics: Dict, n_runs: int, tests: Optional[Dict] = None) -> Dict:
+    """
+    H1–H3 on per-agent metric dicts (asdict(DistributionMetrics) plus
+    outcomes or summary); prints the report and returns the experiment data.
+    tests: hypothesis_tests() output, reported alongside each verdict
+    """
     print()
     print("="*60)
     print("HYPOTHESIS TESTING")
@@ -232,14 +574,20 @@ def run_full_experiment(n_runs: int = 100) -> Dict:
     print(f"\nH1: Var(B) > Var(A) and Var(B) > Var(D)")
     print(f"    B.std={B['std']:.3f}, A.std={A['std']:.3f}, D.std={D['std']:.3f}")
     print(f"    Result: {'PASS ✓' if h1_pass else 'FAIL ✗'}")
+    if tests:
+        print(f"    {tests['H1']['statistic']}: {format_test(tests['H1'])}")
     
     print(f"\nH2: Catastrophic(A) ≈ 0")
     print(f"    A.catastrophic={A['catastrophic_rate']*100:.1f}%")
     print(f"    Result: {'PASS ✓' if h2_pass else 'FAIL ✗'}")
+    if tests:
+        print(f"    {tests['H2']['statistic']}: {format_test(tests['H2'])}")
     
     print(f"\nH3: Var(D) << Var(B)")
     print(f"    D.std={D['std']:.3f}, B.std={B['std']:.3f}, ratio={D['std']/B['std']:.2f}")
     print(f"    Result: {'PASS ✓' if h3_pass else 'FAIL ✗'}")
+    if tests:
+        print(f"    {tests['H3']['statistic']}: {format_test(tests['H3'])}")
     
     print()
     print("="*60)
@@ -264,6 +612,9 @@ def run_full_experiment(n_runs: int = 100) -> Dict:
         "metrics": all_metrics,
         "all_passed": h1_pass and h2_pass and h3_pass
     }
+    if tests:
+        for h, test in tests.items():
+            experiment_data["hypotheses"][h]["test"] = test
     
     return experiment_data
 
@@ -277,7 +628,22 @@ def save_results(data: Dict, filepath: str = "results/jve_results.json"):
 
 
 if __name__ == "__main__":
-    results = run_full_experiment(n_runs=100)
+    import argparse
+    parser = argparse.ArgumentParser(description="Judgment vs execution experiment")
+    parser.add_argument("--runs", type=int, default=100, help="runs per agent")
+    parser.add_argument("--engine", choices=["scalar", "batched"], default="scalar",
+                        help="scalar reproduces the published results; batched scales to large n_runs")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="process pool size for the scalar engine (default: serial)")
+    parser.add_argument("--bootstrap", type=int, default=0, metavar="R",
+                        help="resampling replicates for H1–H3 CIs and p-values (default: off)")
+    parser.add_argument("--cache", action="store_true", help="reuse cached runs (scalar engine only)")
+    args = parser.parse_args()
+    if args.cache and args.engine != "scalar":
+        parser.error("--cache needs --engine scalar: batched chunks share one RNG stream")
+    
+    results = run_full_experiment(n_runs=args.runs, engine=args.engine, workers=args.workers,
+                                  replicates=args.bootstrap, cache=args.cache)
     save_results(results)
     
     print("\n" + "="*60)
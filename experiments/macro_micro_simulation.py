@@ -4,35 +4,104 @@ Macro → Micro Division Simulation
 Generate 5-axis state space data and visualize Freedom × Cost distribution.
 """
 
+import argparse
 import json
 import random
-import matplotlib.pyplot as plt
+from dataclasses import dataclass
 import numpy as np
 
+import instrument
+from columnar_store import encode_categorical, write_store
+from figures import render_figures
+from result_cache import default_cache, memoize
+
 random.seed(42)
 np.random.seed(42)
 
 N_SAMPLES = 2000
 
+SYSTEMS = ["S1", "S2", "S3_V7"]
+TIME_MODELS = ["tau", "wall"]
+OUTCOMES = ["success", "fail", "catastrophic"]
+FLOAT_AXES = ["freedom", "failure_cost", "reversibility", "info_gain"]
+
+SUCCESS, FAIL, CATASTROPHIC = range(len(OUTCOMES))
+TAU, WALL = range(len(TIME_MODELS))
+
+@dataclass
+class StateBatch:
+    """
+    Struct-of-arrays record batch: one ndarray per axis.
+    time_model and outcome hold codes into TIME_MODELS / OUTCOMES.
+    """
+    system: str
+    freedom: np.ndarray
+    failure_cost: np.ndarray
+    reversibility: np.ndarray
+    time_model: np.ndarray
+    info_gain: np.ndarray
+    outcome: np.ndarray
+    
+    def __len__(self):
+        return len(self.freedom)
+    
+    @classmethod
+    def from_records(cls, data):
+        n = len(data)
+        return cls(
+            system=data[0]["system"] if data else "",
+            freedom=np.fromiter((d["freedom"] for d in data), dtype=float, count=n),
+            failure_cost=np.fromiter((d["failure_cost"] for d in data), dtype=float, count=n),
+            reversibility=np.fromiter((d["reversibility"] for d in data), dtype=float, count=n),
+            time_model=encode_categorical([d["time_model"] for d in data], TIME_MODELS),
+            info_gain=np.fromiter((d["info_gain"] for d in data), dtype=float, count=n),
+            outcome=encode_categorical([d["outcome"] for d in data], OUTCOMES),
+        )
+    
+    def records(self):
+        """Lazy dict-of-records view, same layout as generate_*_data."""
+        time_models = [TIME_MODELS[c] for c in self.time_model.tolist()]
+        outcomes = [OUTCOMES[c] for c in self.outcome.tolist()]
+        for i, (cost, rev, tm, freedom, info, outcome) in enumerate(zip(
+                self.failure_cost.tolist(), self.reversibility.tolist(), time_models,
+                self.freedom.tolist(), self.info_gain.tolist(), outcomes)):
+            yield {
+                "system": self.system,
+                "iteration": i,
+                "failure_cost": cost,
+                "reversibility": rev,
+                "time_model": tm,
+                "freedom": freedom,
+                "info_gain": info,
+                "outcome": outcome
+            }
+
 def generate_s1_data(n):
     """S1: 판단 + 실행 결합 (분업 없음)"""
+    trace = instrument.start("macro_micro.generate_s1_data", n=n, system="S1")
+    uniform = instrument.counted(random.random, trace, "uniform")
+    choice = instrument.counted(random.choice, trace, "choice")
     data = []
     for i in range(n):
-        freedom = random.random()
-        cost = random.random()
-        reversibility = random.random()
-        time_model = random.choice(["tau", "wall"])
-        info_gain = random.random()
+        freedom = uniform()
+        cost = uniform()
+        reversibility = uniform()
+        time_model = choice(["tau", "wall"])
+        info_gain = uniform()
         
         if freedom > 0.6 and cost > 0.5:
-            if random.random() < 0.15:
+            if trace:
+                trace.count("danger")
+            if uniform() < 0.15:
+                if trace:
+                    trace.count("catastrophic")
                 outcome = "catastrophic"
-            elif random.random() < 0.4:
+            elif uniform() < 0.4:
                 outcome = "fail"
             else:
                 outcome = "success"
         else:
-            outcome = "success" if random.random() < 0.7 else "fail"
+            outcome = "success" if uniform() < 0.7 else "fail"
         
         data.append({
             "system": "S1",
@@ -44,27 +113,35 @@ def generate_s1_data(n):
             "info_gain": info_gain,
             "outcome": outcome
         })
+    if trace:
+        trace.finish()
     return data
 
 def generate_s2_data(n):
     """S2: 판단 → 즉시 실행 (약한 분업)"""
+    trace = instrument.start("macro_micro.generate_s2_data", n=n, system="S2")
+    uniform = instrument.counted(random.random, trace, "uniform")
     data = []
     for i in range(n):
-        freedom = random.random()
-        cost = random.random() * 0.8 + 0.1
-        reversibility = random.random() * 0.6
+        freedom = uniform()
+        cost = uniform() * 0.8 + 0.1
+        reversibility = uniform() * 0.6
         time_model = "wall"
-        info_gain = random.random() * 0.5
+        info_gain = uniform() * 0.5
         
         if freedom > 0.5 and cost > 0.4:
-            if random.random() < 0.10:
+            if trace:
+                trace.count("danger")
+            if uniform() < 0.10:
+                if trace:
+                    trace.count("catastrophic")
                 outcome = "catastrophic"
-            elif random.random() < 0.35:
+            elif uniform() < 0.35:
                 outcome = "fail"
             else:
                 outcome = "success"
         else:
-            outcome = "success" if random.random() < 0.75 else "fail"
+            outcome = "success" if uniform() < 0.75 else "fail"
         
         data.append({
             "system": "S2",
@@ -76,26 +153,32 @@ def generate_s2_data(n):
             "info_gain": info_gain,
             "outcome": outcome
         })
+    if trace:
+        trace.finish()
     return data
 
 def generate_v7_data(n):
     """S3 (V7): 관찰 → 구조 → 실행 (완전 분업)"""
+    trace = instrument.start("macro_micro.generate_v7_data", n=n, system="S3_V7")
+    uniform = instrument.counted(random.random, trace, "uniform")
     data = []
     for i in range(n):
-        freedom = random.random()
+        freedom = uniform()
         
         if freedom > 0.5:
-            cost = random.random() * 0.1
-            reversibility = 0.8 + random.random() * 0.2
+            if trace:
+                trace.count("high_freedom")
+            cost = uniform() * 0.1
+            reversibility = 0.8 + uniform() * 0.2
             time_model = "tau"
         else:
-            cost = random.random() * 0.6
-            reversibility = 0.3 + random.random() * 0.4
+            cost = uniform() * 0.6
+            reversibility = 0.3 + uniform() * 0.4
             time_model = "wall"
         
-        info_gain = 0.4 + random.random() * 0.5
+        info_gain = 0.4 + uniform() * 0.5
         
-        outcome = "success" if random.random() < 0.85 else "fail"
+        outcome = "success" if uniform() < 0.85 else "fail"
         
         data.append({
             "system": "S3_V7",
@@ -107,74 +190,159 @@ def generate_v7_data(n):
             "info_gain": info_gain,
             "outcome": outcome
         })
+    if trace:
+        trace.finish()
     return data
 
-s1_data = generate_s1_data(N_SAMPLES)
-s2_data = generate_s2_data(N_SAMPLES)
-v7_data = generate_v7_data(N_SAMPLES)
-
-all_data = s1_data + s2_data + v7_data
+def generate_s1_batch(n, rng=None):
+    """S1 as a StateBatch: rules applied as vectorized masks."""
+    rng = np.random.default_rng(rng)
+    trace = instrument.start("macro_micro.generate_s1_batch", n=n, system="S1")
+    freedom = rng.random(n)
+    cost = rng.random(n)
+    reversibility = rng.random(n)
+    time_model = rng.integers(0, len(TIME_MODELS), n).astype(np.uint8)
+    info_gain = rng.random(n)
+    
+    u1 = rng.random(n)
+    u2 = rng.random(n)
+    danger = (freedom > 0.6) & (cost > 0.5)
+    outcome = np.where(
+        danger,
+        np.where(u1 < 0.15, CATASTROPHIC, np.where(u2 < 0.4, FAIL, SUCCESS)),
+        np.where(u1 < 0.7, SUCCESS, FAIL)
+    ).astype(np.uint8)
+    
+    if trace:
+        trace.count("danger", np.count_nonzero(danger))
+        trace.count("catastrophic", np.count_nonzero(outcome == CATASTROPHIC))
+        trace.draw("uniform", 6 * n)
+        trace.draw("choice", n)
+        trace.finish()
+    return StateBatch("S1", freedom, cost, reversibility, time_model, info_gain, outcome)
 
-with open("results/macro_micro_states.json", "w") as f:
-    json.dump(all_data, f, indent=2)
-print(f"✅ Generated {len(all_data)} state samples")
+def generate_s2_batch(n, rng=None):
+    """S2 as a StateBatch: rules applied as vectorized masks."""
+    rng = np.random.default_rng(rng)
+    trace = instrument.start("macro_micro.generate_s2_batch", n=n, system="S2")
+    freedom = rng.random(n)
+    cost = rng.random(n) * 0.8 + 0.1
+    reversibility = rng.random(n) * 0.6
+    time_model = np.full(n, WALL, dtype=np.uint8)
+    info_gain = rng.random(n) * 0.5
+    
+    u1 = rng.random(n)
+    u2 = rng.random(n)
+    danger = (freedom > 0.5) & (cost > 0.4)
+    outcome = np.where(
+        danger,
+        np.where(u1 < 0.10, CATASTROPHIC, np.where(u2 < 0.35, FAIL, SUCCESS)),
+        np.where(u1 < 0.75, SUCCESS, FAIL)
+    ).astype(np.uint8)
+    
+    if trace:
+        trace.count("danger", np.count_nonzero(danger))
+        trace.count("catastrophic", np.count_nonzero(outcome == CATASTROPHIC))
+        trace.draw("uniform", 6 * n)
+        trace.finish()
+    return StateBatch("S2", freedom, cost, reversibility, time_model, info_gain, outcome)
 
-def count_outcomes(data):
-    outcomes = {"success": 0, "fail": 0, "catastrophic": 0}
-    for d in data:
-        outcomes[d["outcome"]] += 1
-    return outcomes
+def generate_v7_batch(n, rng=None):
+    """S3 (V7) as a StateBatch: rules applied as vectorized masks."""
+    rng = np.random.default_rng(rng)
+    trace = instrument.start("macro_micro.generate_v7_batch", n=n, system="S3_V7")
+    freedom = rng.random(n)
+    high = freedom > 0.5
+    
+    cost = rng.random(n) * np.where(high, 0.1, 0.6)
+    reversibility = np.where(high, 0.8 + rng.random(n) * 0.2, 0.3 + rng.random(n) * 0.4)
+    time_model = np.where(high, TAU, WALL).astype(np.uint8)
+    info_gain = 0.4 + rng.random(n) * 0.5
+    
+    outcome = np.where(rng.random(n) < 0.85, SUCCESS, FAIL).astype(np.uint8)
+    
+    if trace:
+        trace.count("high_freedom", np.count_nonzero(high))
+        # both reversibility branches are drawn for every sample
+        trace.draw("uniform", 6 * n)
+        trace.finish()
+    return StateBatch("S3_V7", freedom, cost, reversibility, time_model, info_gain, outcome)
 
-print("\n📊 Outcome Distribution:")
-for name, data in [("S1", s1_data), ("S2", s2_data), ("V7", v7_data)]:
-    outcomes = count_outcomes(data)
-    cat_rate = outcomes["catastrophic"] / len(data) * 100
-    print(f"  {name}: catastrophic={outcomes['catastrophic']} ({cat_rate:.1f}%)")
+def count_outcomes(batch):
+    counts = np.bincount(batch.outcome, minlength=len(OUTCOMES))
+    return dict(zip(OUTCOMES, counts.tolist()))
 
-fig, axes = plt.subplots(1, 3, figsize=(14, 5), facecolor='white')
+def save_states_columnar(batches, path="results/macro_micro_states.cols"):
+    """Columnar store: float32 axes, dictionary-encoded categoricals."""
+    columns = {
+        "system": np.concatenate([
+            np.full(len(b), SYSTEMS.index(b.system), dtype=np.uint8) for b in batches]),
+        "iteration": np.concatenate([np.arange(len(b), dtype=np.int32) for b in batches]),
+        "time_model": np.concatenate([b.time_model for b in batches]),
+        "outcome": np.concatenate([b.outcome for b in batches]),
+    }
+    for axis in FLOAT_AXES:
+        columns[axis] = np.concatenate([getattr(b, axis) for b in batches]).astype(np.float32)
+    return write_store(path, columns, {
+        "system": SYSTEMS,
+        "time_model": TIME_MODELS,
+        "outcome": OUTCOMES,
+    })
 
-color_map = {"success": "#4CAF50", "fail": "#FFC107", "catastrophic": "#F44336"}
+def save_states_json(batches, path="results/macro_micro_states.json"):
+    """Record-per-sample JSON export."""
+    with open(path, "w") as f:
+        json.dump([record for b in batches for record in b.records()], f, indent=2)
+    return path
 
-for ax, (name, data) in zip(axes, [("S1: No Division", s1_data), 
-                                     ("S2: Weak Division", s2_data), 
-                                     ("V7: Full Structure", v7_data)]):
-    freedoms = [d["freedom"] for d in data]
-    costs = [d["failure_cost"] for d in data]
-    colors = [color_map[d["outcome"]] for d in data]
-    
-    ax.scatter(freedoms, costs, c=colors, alpha=0.5, s=15, edgecolors='none')
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Macro → micro division simulation")
+    parser.add_argument("--no-json", action="store_true",
+                        help="skip the record-per-sample JSON export (columnar store only)")
+    parser.add_argument("--engine", choices=["scalar", "vectorized"], default="scalar",
+                        help="scalar reproduces the published states; vectorized scales to large N")
+    parser.add_argument("--samples", type=int, default=N_SAMPLES, help="samples per system")
+    parser.add_argument("--cache", action="store_true", help="reuse cached batches")
+    args = parser.parse_args(argv)
     
-    ax.axhline(y=0.5, color='#999', linestyle='--', linewidth=1, alpha=0.5)
-    ax.axvline(x=0.5, color='#999', linestyle='--', linewidth=1, alpha=0.5)
-    
-    ax.fill_between([0.5, 1.0], 0.5, 1.0, color='#ffcccc', alpha=0.2, zorder=0)
-    
-    cat_count = sum(1 for d in data if d["outcome"] == "catastrophic")
-    ax.set_title(f"{name}\n(catastrophic: {cat_count})", fontsize=12, weight='bold')
-    ax.set_xlabel("Freedom", fontsize=10)
-    ax.set_ylabel("Failure Cost", fontsize=10)
-    ax.set_xlim(-0.05, 1.05)
-    ax.set_ylim(-0.05, 1.05)
-
-from matplotlib.patches import Patch
-legend_elements = [
-    Patch(facecolor='#4CAF50', label='Success'),
-    Patch(facecolor='#FFC107', label='Fail'),
-    Patch(facecolor='#F44336', label='Catastrophic'),
-    Patch(facecolor='#ffcccc', alpha=0.5, label='Danger Zone')
-]
-fig.legend(handles=legend_elements, loc='upper center', ncol=4, 
-           bbox_to_anchor=(0.5, 1.02), frameon=False, fontsize=10)
-
-plt.suptitle("Freedom × Failure Cost Distribution\n", fontsize=14, weight='bold', y=1.08)
-
-plt.tight_layout()
-plt.savefig("../images/freedom_cost_distribution.png", dpi=200, facecolor='white', 
-            bbox_inches='tight', pad_inches=0.3)
-print("\n✅ Saved: images/freedom_cost_distribution.png")
-plt.close()
-
-print("\n🔍 Key Observation:")
-print("   V7: High freedom points cluster in low-cost region")
-print("   S1/S2: High freedom × High cost region has catastrophic events")
-print("   → V7 structurally removes the danger zone")
+    if args.engine == "vectorized":
+        generators = [generate_s1_batch, generate_s2_batch, generate_v7_batch]
+        if args.cache:
+            generators = [memoize(g) for g in generators]
+        seeds = np.random.SeedSequence(42).spawn(len(generators))
+        s1_data, s2_data, v7_data = (g(args.samples, seed) for g, seed in zip(generators, seeds))
+    else:
+        generators = [generate_s1_data, generate_s2_data, generate_v7_data]
+        if args.cache:
+            # seeded by the shared global stream: its state is part of the key
+            generators = [memoize(g, global_rng=random) for g in generators]
+        s1_data, s2_data, v7_data = (StateBatch.from_records(g(args.samples)) for g in generators)
+    if args.cache:
+        stats = default_cache().stats()
+        print(f"Result cache: {stats['hits']} hits, {stats['misses']} misses")
+
+    batches = [s1_data, s2_data, v7_data]
+
+    store_path = save_states_columnar(batches)
+    print(f"✅ Generated {sum(map(len, batches))} state samples → {store_path}/")
+    if not args.no_json:
+        save_states_json(batches)
+        print("✅ Exported: results/macro_micro_states.json")
+
+    print("\n📊 Outcome Distribution:")
+    for name, data in [("S1", s1_data), ("S2", s2_data), ("V7", v7_data)]:
+        outcomes = count_outcomes(data)
+        cat_rate = outcomes["catastrophic"] / len(data) * 100
+        print(f"  {name}: catastrophic={outcomes['catastrophic']} ({cat_rate:.1f}%)")
+
+    print()
+    render_figures(["freedom_cost_distribution"])
+
+    print("\n🔍 Key Observation:")
+    print("   V7: High freedom points cluster in low-cost region")
+    print("   S1/S2: High freedom × High cost region has catastrophic events")
+    print("   → V7 structurally removes the danger zone")
+
+
+if __name__ == "__main__":
+    main()
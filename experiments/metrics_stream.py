@@ -0,0 +1,240 @@
+"""
+Streaming Outcome Metrics
+
+Constant-memory accumulator for outcome streams.
+Simulators feed it chunk by chunk; the outcome list never has to exist.
+"""
+
+import math
+
+import numpy as np
+
+from quantile_sketch import QuantileSketch
+
+CHUNK_SIZE = 1_000_000
+ADAPTIVE_BATCH = 1_000
+MIN_BATCHES = 10
+Z_95 = 1.959963984540054
+
+
+class OutcomeAccumulator:
+    """
+    Running count, mean, M2 (Welford/Chan), min and catastrophic count.
+
+    Each chunk is reduced with a two-pass mean/M2 and folded in with
+    Chan's parallel update, so accumulators from separate workers merge
+    exactly the same way chunks do.
+    """
+
+    __slots__ = ("count", "mean", "m2", "min", "catastrophic")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.catastrophic = 0
+
+    def update(self, chunk):
+        arr = np.asarray(chunk, dtype=float)
+        if arr.size == 0:
+            return self
+        chunk_mean = float(arr.mean())
+        chunk_m2 = float(np.square(arr - chunk_mean).sum())
+        self._combine(arr.size, chunk_mean, chunk_m2,
+                      float(arr.min()), int(np.count_nonzero(arr < 0)))
+        return self
+
+    def merge(self, other):
+        if other.count:
+            self._combine(other.count, other.mean, other.m2, other.min, other.catastrophic)
+        return self
+
+    def _combine(self, count, mean, m2, min_val, catastrophic):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min = min(self.min, min_val)
+        self.catastrophic += catastrophic
+
+    @property
+    def var(self):
+        """Population variance (matches np.std's default ddof=0)."""
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.var)
+
+    @property
+    def cat_fraction(self):
+        return self.catastrophic / self.count if self.count else 0.0
+
+    def effective(self, lambda_weight=0.5, mu_weight=2.0):
+        """mean - λ·std - μ·cat_rate·10"""
+        return self.mean - lambda_weight * self.std - mu_weight * self.cat_fraction * 10
+
+
+def accumulate_chunks(sample_chunk, n, chunk_size=CHUNK_SIZE, acc=None):
+    """
+    Feed n samples into an accumulator, chunk_size at a time.
+
+    sample_chunk(k) must return k outcomes (list or array).
+    """
+    acc = acc if acc is not None else OutcomeAccumulator()
+    remaining = n
+    while remaining > 0:
+        k = min(chunk_size, remaining)
+        acc.update(sample_chunk(k))
+        remaining -= k
+    return acc
+
+
+def wilson_halfwidth(successes, n, z=Z_95):
+    """Half-width of the Wilson score interval; stays honest at 0 successes."""
+    if n == 0:
+        return 1.0
+    p = successes / n
+    denom = 1 + z * z / n
+    return z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+
+
+def accumulate_adaptive(sample_chunk, tol, cat_tol, max_samples, batch_size=ADAPTIVE_BATCH,
+                        min_batches=MIN_BATCHES, lambda_weight=0.5, mu_weight=2.0, z=Z_95):
+    """
+    Feed batches until the CIs on effective and cat_rate are narrow enough.
+
+    effective: batch-means interval (each full batch's effective is one
+               observation; half-width = z·sd/√batches)
+    cat_rate:  Wilson interval, in percentage points like cat_rate itself
+
+    Stops once both half-widths are within tol / cat_tol, or at max_samples.
+    Returns (accumulator, {"n", "effective_ci", "cat_rate_ci", "converged"}).
+    """
+    acc = OutcomeAccumulator()
+    batches, eff_sum, eff_sumsq = 0, 0.0, 0.0
+    eff_hw = cat_hw = math.inf
+    converged = False
+    while acc.count < max_samples:
+        k = min(batch_size, max_samples - acc.count)
+        batch = OutcomeAccumulator().update(sample_chunk(k))
+        acc.merge(batch)
+        if k == batch_size:
+            eff = batch.effective(lambda_weight, mu_weight)
+            batches += 1
+            eff_sum += eff
+            eff_sumsq += eff * eff
+        if batches >= 2:
+            eff_var = max(0.0, (eff_sumsq - eff_sum * eff_sum / batches) / (batches - 1))
+            eff_hw = z * math.sqrt(eff_var / batches)
+        cat_hw = 100 * wilson_halfwidth(acc.catastrophic, acc.count, z)
+        if batches >= min_batches and eff_hw <= tol and cat_hw <= cat_tol:
+            converged = True
+            break
+    return acc, {
+        "n": acc.count,
+        "effective_ci": round(eff_hw, 4),
+        "cat_rate_ci": round(cat_hw, 4),
+        "converged": converged,
+    }
+
+
+def effective_influence(outcomes, lambda_weight=0.5, mu_weight=2.0):
+    """
+    Per-sample influence of each outcome on effective (mean - λ·std - μ·cat·10).
+    Its mean is 0 and var/n is the delta-method variance of effective, so
+    paired systems can be compared sample by sample.
+    """
+    x = np.asarray(outcomes, dtype=float)
+    mean = x.mean()
+    var = np.square(x - mean).mean()
+    std = math.sqrt(var)
+    cat = (x < 0).astype(float)
+    influence = x - mean - mu_weight * 10 * (cat - cat.mean())
+    if std > 0:
+        influence -= lambda_weight * (np.square(x - mean) - var) / (2 * std)
+    return influence
+
+
+def paired_delta(a, b, lambda_weight=0.5, mu_weight=2.0, z=Z_95):
+    """
+    effective(a) - effective(b) for outcome arrays drawn from common random
+    numbers (a[i] and b[i] share sample i's draws).
+
+    variance_reduction = independent variance / paired variance, i.e. how
+    many times fewer samples the paired design needs for the same precision.
+    """
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    n = len(a)
+    effective = lambda x: OutcomeAccumulator().update(x).effective(lambda_weight, mu_weight)
+    inf_a = effective_influence(a, lambda_weight, mu_weight)
+    inf_b = effective_influence(b, lambda_weight, mu_weight)
+    var_paired = float(np.var(inf_a - inf_b, ddof=1)) / n
+    var_independent = float(np.var(inf_a, ddof=1) + np.var(inf_b, ddof=1)) / n
+    return {
+        "delta_effective": round(effective(a) - effective(b), 4),
+        "delta_mean": round(float((a - b).mean()), 4),
+        "ci_paired": round(z * math.sqrt(var_paired), 4),
+        "ci_independent": round(z * math.sqrt(var_independent), 4),
+        "variance_reduction": round(var_independent / var_paired, 2) if var_paired > 0 else math.inf,
+    }
+
+
+QUANTILES = (0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99, 0.999)
+CDF_POINTS = 256
+
+
+def distribution_summary(outcomes, edges, quantiles=QUANTILES, cdf_points=CDF_POINTS):
+    """
+    Compact stand-in for a raw outcome series: fixed-bin histogram (with
+    under/overflow), exact quantiles, and the empirical CDF thinned to
+    cdf_points of its own steps (x = k-th smallest, p = k/n).
+
+    outcomes may also be a QuantileSketch, for streams that were never
+    kept: the same summary, within the sketch's rank error.
+    """
+    if isinstance(outcomes, QuantileSketch):
+        return _sketch_summary(outcomes, edges, quantiles, cdf_points)
+    x = np.sort(np.asarray(outcomes, dtype=float))
+    n = len(x)
+    edges = np.asarray(edges, dtype=float)
+    counts, _ = np.histogram(x, bins=edges)
+    k = np.unique(np.linspace(0, n - 1, min(cdf_points, n)).round().astype(int))
+    return {
+        "n": n,
+        "histogram": {
+            "edges": np.round(edges, 6).tolist(),
+            "counts": counts.tolist(),
+            "underflow": int(np.count_nonzero(x < edges[0])),
+            "overflow": int(np.count_nonzero(x > edges[-1])),
+        },
+        "quantiles": {str(q): round(float(v), 6) for q, v in zip(quantiles, np.quantile(x, quantiles))},
+        "cdf": {
+            "x": np.round(x[k], 6).tolist(),
+            "p": np.round((k + 1) / n, 6).tolist(),
+        },
+    }
+
+
+def _sketch_summary(sketch, edges, quantiles, cdf_points):
+    x, w = sketch.weighted_items()
+    edges = np.asarray(edges, dtype=float)
+    counts, _ = np.histogram(x, bins=edges, weights=w)
+    cdf_x, cdf_p = sketch.cdf_steps(cdf_points)
+    return {
+        "n": sketch.n,
+        "histogram": {
+            "edges": np.round(edges, 6).tolist(),
+            "counts": counts.astype(np.int64).tolist(),
+            "underflow": int(w[x < edges[0]].sum()),
+            "overflow": int(w[x > edges[-1]].sum()),
+        },
+        "quantiles": {str(q): round(float(v), 6) for q, v in zip(quantiles, sketch.quantiles(quantiles))},
+        "cdf": {
+            "x": np.round(cdf_x, 6).tolist(),
+            "p": np.round(cdf_p, 6).tolist(),
+        },
+    }
@@ -5,168 +5,328 @@ V7 does not outperform by being smarter.
 It outperforms by eliminating bad outcomes.
 """
 
+import argparse
 import json
 import random
 import numpy as np
-import matplotlib.pyplot as plt
+
+import instrument
+from figures import render_figures
+from metrics_stream import OutcomeAccumulator, accumulate_adaptive, distribution_summary, paired_delta
+from quantile_sketch import QuantileSketch
+from rare_events import DEFENSIVE, IS_SAMPLES, structurally_zero, tilted_uniform, weighted_rate
+from result_cache import default_cache, memoize
 
 random.seed(42)
 np.random.seed(42)
 
 N_SAMPLES = 3000
+ADAPTIVE_TOL = 0.05       # half-width of the 95% CI on effective_performance
+ADAPTIVE_CAT_TOL = 0.25   # half-width of the 95% CI on catastrophic_rate, percentage points
+MAX_SAMPLES = 1_000_000
+ADAPTIVE_RANK_ERROR = 0.001  # quantile sketch error for adaptive (streamed) summaries
 LATENT_MU = 6.0
 LATENT_SIGMA = 1.5
 CATASTROPHIC_PENALTY = -10
+HIST_EDGES = np.linspace(-12, 10, 50)
+RESULTS_PATH = "results/performance_comparison.json"
+RAW_PATH = "results/performance_comparison_outcomes.npz"
+
+def _streams(rng, trace=None):
+    """
+    (uniform, normal) draw functions. rng=None keeps the module-level
+    random / np.random streams (published results); a Generator or seed
+    makes the simulator a pure function of (n, rng).
+    """
+    if rng is None:
+        uniform, normal = random.random, np.random.normal
+    else:
+        rng = np.random.default_rng(rng)
+        uniform, normal = rng.random, rng.normal
+    return instrument.counted(uniform, trace, "uniform"), instrument.counted(normal, trace, "normal")
 
-def simulate_s1(n):
+def simulate_s1(n, rng=None):
     """S1: No Division - 판단+실행 결합"""
+    trace = instrument.start("performance_comparison.simulate_s1", n=n, system="S1")
+    uniform, normal = _streams(rng, trace)
     outcomes = []
     for _ in range(n):
-        latent = np.random.normal(LATENT_MU, LATENT_SIGMA)
-        freedom = random.random()
-        cost = random.random()
+        latent = normal(LATENT_MU, LATENT_SIGMA)
+        freedom = uniform()
+        cost = uniform()
         
         if freedom > 0.5 and cost > 0.5:
-            if random.random() < 0.12:
+            if trace:
+                trace.count("danger")
+            if uniform() < 0.12:
+                if trace:
+                    trace.count("catastrophic")
                 outcomes.append(CATASTROPHIC_PENALTY)
                 continue
-            latent += np.random.normal(0, 1.5)
+            latent += normal(0, 1.5)
         
-        outcome = max(0, min(10, latent + np.random.normal(0, 1.0)))
+        outcome = max(0, min(10, latent + normal(0, 1.0)))
         outcomes.append(outcome)
+    if trace:
+        trace.finish()
     return outcomes
 
-def simulate_s2(n):
+def simulate_s2(n, rng=None):
     """S2: Weak Division - 지연 실행, 구조 약함"""
+    trace = instrument.start("performance_comparison.simulate_s2", n=n, system="S2")
+    uniform, normal = _streams(rng, trace)
     outcomes = []
     for _ in range(n):
-        latent = np.random.normal(LATENT_MU, LATENT_SIGMA)
-        freedom = random.random()
-        cost = random.random() * 0.8 + 0.1
+        latent = normal(LATENT_MU, LATENT_SIGMA)
+        freedom = uniform()
+        cost = uniform() * 0.8 + 0.1
         
         if freedom > 0.5 and cost > 0.4:
-            if random.random() < 0.08:
+            if trace:
+                trace.count("danger")
+            if uniform() < 0.08:
+                if trace:
+                    trace.count("catastrophic")
                 outcomes.append(CATASTROPHIC_PENALTY)
                 continue
-            latent += np.random.normal(0, 1.0)
+            latent += normal(0, 1.0)
         
-        outcome = max(0, min(10, latent + np.random.normal(0, 0.8)))
+        outcome = max(0, min(10, latent + normal(0, 0.8)))
         outcomes.append(outcome)
+    if trace:
+        trace.finish()
     return outcomes
 
-def simulate_v7(n):
+def simulate_v7(n, rng=None):
     """V7: Full Structure - STATE→STRUCTURE→EXECUTE"""
+    trace = instrument.start("performance_comparison.simulate_v7", n=n, system="V7")
+    uniform, normal = _streams(rng, trace)
     outcomes = []
     for _ in range(n):
-        latent = np.random.normal(LATENT_MU, LATENT_SIGMA)
-        freedom = random.random()
+        latent = normal(LATENT_MU, LATENT_SIGMA)
+        freedom = uniform()
         
         if freedom > 0.5:
-            cost = random.random() * 0.1
+            if trace:
+                trace.count("high_freedom")
+            cost = uniform() * 0.1
         else:
-            cost = random.random() * 0.5
+            cost = uniform() * 0.5
         
-        outcome = max(2.0, min(10, latent + np.random.normal(0, 0.5)))
+        outcome = max(2.0, min(10, latent + normal(0, 0.5)))
         outcomes.append(outcome)
+    if trace:
+        trace.finish()
     return outcomes
 
-print("🔄 Running simulations...")
-s1_outcomes = simulate_s1(N_SAMPLES)
-s2_outcomes = simulate_s2(N_SAMPLES)
-v7_outcomes = simulate_v7(N_SAMPLES)
+def simulate_paired(n, rng=None):
+    """
+    S1, S2 and V7 evaluated on common random numbers: sample i of every
+    system shares its latent, freedom, cost, coin and noise draws.
+    Each system keeps its own outcome distribution; only the pairing changes.
+    """
+    rng = np.random.default_rng(rng)
+    latent = LATENT_MU + LATENT_SIGMA * rng.standard_normal(n)
+    freedom = rng.random(n)
+    u_cost = rng.random(n)
+    coin = rng.random(n)
+    danger_noise = rng.standard_normal(n)
+    noise = rng.standard_normal(n)
+    
+    s1_danger = (freedom > 0.5) & (u_cost > 0.5)
+    s1 = np.clip(latent + np.where(s1_danger, 1.5 * danger_noise, 0.0) + noise, 0, 10)
+    s1[s1_danger & (coin < 0.12)] = CATASTROPHIC_PENALTY
+    
+    s2_danger = (freedom > 0.5) & (u_cost * 0.8 + 0.1 > 0.4)
+    s2 = np.clip(latent + np.where(s2_danger, 1.0 * danger_noise, 0.0) + 0.8 * noise, 0, 10)
+    s2[s2_danger & (coin < 0.08)] = CATASTROPHIC_PENALTY
+    
+    v7 = np.clip(latent + 0.5 * noise, 2.0, 10)
+    return {"s1": s1, "s2": s2, "v7": v7}
+
+def catastrophic_rate_is(n, system, rng=None, defensive=DEFENSIVE):
+    """
+    Importance-sampled catastrophic rate for 's1', 's2' or 'v7': freedom,
+    cost and the catastrophe coin are tilted toward the danger region.
+    V7 has no catastrophe branch, so its rate is exactly 0.
+    """
+    if system == "v7":
+        return structurally_zero(n)
+    rng = np.random.default_rng(rng)
+    # S2 draws cost as u·0.8 + 0.1, so cost > 0.4 means u > 0.375
+    cost_threshold, cat_prob = (0.5, 0.12) if system == "s1" else (0.375, 0.08)
+    freedom, w_f = tilted_uniform(rng, n, 0.5, 1.0, defensive)
+    u_c, w_c = tilted_uniform(rng, n, cost_threshold, 1.0, defensive)
+    coin, w_k = tilted_uniform(rng, n, 0.0, cat_prob, defensive)
+    catastrophic = (freedom > 0.5) & (u_c > cost_threshold) & (coin < cat_prob)
+    return weighted_rate(catastrophic, w_f * w_c * w_k)
 
-def calc_metrics(outcomes, name):
-    arr = np.array(outcomes)
-    mean = arr.mean()
-    std = arr.std()
-    min_val = arr.min()
-    catastrophic = sum(1 for x in outcomes if x < 0)
-    cat_rate = catastrophic / len(outcomes) * 100
+def sample_adaptive(simulate, rng, tol, cat_tol, max_samples):
+    """
+    accumulate_adaptive over simulate(k, rng) in constant memory: chunks feed
+    the accumulator, a quantile sketch and exact histogram counts, then are
+    dropped. Returns (accumulator, adaptive info, distribution summary).
+    """
+    sketch = QuantileSketch.for_error(ADAPTIVE_RANK_ERROR)
+    counts = np.zeros(len(HIST_EDGES) - 1, dtype=np.int64)
+    tails = [0, 0]
+    
+    def sample_chunk(k):
+        chunk = np.asarray(simulate(k, rng), dtype=float)
+        sketch.update(chunk)
+        counts[:] += np.histogram(chunk, bins=HIST_EDGES)[0]
+        tails[0] += int(np.count_nonzero(chunk < HIST_EDGES[0]))
+        tails[1] += int(np.count_nonzero(chunk > HIST_EDGES[-1]))
+        return chunk
     
+    acc, info = accumulate_adaptive(sample_chunk, tol, cat_tol, max_samples)
+    summary = distribution_summary(sketch, HIST_EDGES)
+    summary["histogram"].update(counts=counts.tolist(), underflow=tails[0], overflow=tails[1])
+    return acc, info, summary
+
+def calc_metrics(outcomes, name):
+    return metrics_from_accumulator(OutcomeAccumulator().update(outcomes), name)
+
+def metrics_from_accumulator(acc, name):
+    """calc_metrics from a streaming OutcomeAccumulator."""
     lambda_weight = 0.5
     mu_weight = 2.0
-    effective = mean - lambda_weight * std - mu_weight * (catastrophic / len(outcomes)) * 10
+    effective = acc.effective(lambda_weight, mu_weight)
     
     return {
         "system": name,
-        "mean": round(mean, 2),
-        "std": round(std, 2),
-        "min": round(min_val, 2),
-        "catastrophic": catastrophic,
-        "catastrophic_rate": round(cat_rate, 1),
+        "mean": round(acc.mean, 2),
+        "std": round(acc.std, 2),
+        "min": round(acc.min, 2),
+        "catastrophic": acc.catastrophic,
+        "catastrophic_rate": round(acc.cat_fraction * 100, 1),
         "effective_performance": round(effective, 2)
     }
 
-s1_metrics = calc_metrics(s1_outcomes, "S1")
-s2_metrics = calc_metrics(s2_outcomes, "S2")
-v7_metrics = calc_metrics(v7_outcomes, "V7")
-
-print("\n📊 Performance Metrics:")
-print("-" * 70)
-print(f"{'System':<8} {'Mean':<8} {'Std':<8} {'Min':<8} {'Cat%':<8} {'Effective':<10}")
-print("-" * 70)
-for m in [s1_metrics, s2_metrics, v7_metrics]:
-    print(f"{m['system']:<8} {m['mean']:<8} {m['std']:<8} {m['min']:<8} {m['catastrophic_rate']:<8} {m['effective_performance']:<10}")
-
-with open("results/performance_comparison.json", "w") as f:
-    json.dump({
-        "n_samples": N_SAMPLES,
-        "s1": {"outcomes": s1_outcomes, "metrics": s1_metrics},
-        "s2": {"outcomes": s2_outcomes, "metrics": s2_metrics},
-        "v7": {"outcomes": v7_outcomes, "metrics": v7_metrics}
-    }, f, indent=2)
-print("\n✅ Saved: results/performance_comparison.json")
-
-fig, axes = plt.subplots(1, 2, figsize=(14, 5), facecolor='white')
-
-ax1 = axes[0]
-bins = np.linspace(-12, 10, 50)
-ax1.hist(s1_outcomes, bins=bins, alpha=0.6, label=f"S1 (μ={s1_metrics['mean']}, cat={s1_metrics['catastrophic_rate']}%)", 
-         color='#e53935', edgecolor='white')
-ax1.hist(s2_outcomes, bins=bins, alpha=0.6, label=f"S2 (μ={s2_metrics['mean']}, cat={s2_metrics['catastrophic_rate']}%)", 
-         color='#FFC107', edgecolor='white')
-ax1.hist(v7_outcomes, bins=bins, alpha=0.7, label=f"V7 (μ={v7_metrics['mean']}, cat={v7_metrics['catastrophic_rate']}%)", 
-         color='#26a69a', edgecolor='white')
-
-ax1.axvline(x=0, color='#cc0000', linestyle='--', linewidth=2, alpha=0.7)
-ax1.text(-5, ax1.get_ylim()[1]*0.8, "Catastrophic\nZone", ha='center', fontsize=9, color='#990000', weight='bold')
-
-ax1.set_xlabel("Outcome", fontsize=11)
-ax1.set_ylabel("Frequency", fontsize=11)
-ax1.set_title("Outcome Distribution", fontsize=13, weight='bold')
-ax1.legend(loc='upper left', fontsize=9)
-ax1.set_xlim(-12, 10)
-
-ax2 = axes[1]
-for outcomes, name, color in [(s1_outcomes, "S1", '#e53935'), 
-                               (s2_outcomes, "S2", '#FFC107'),
-                               (v7_outcomes, "V7", '#26a69a')]:
-    sorted_data = np.sort(outcomes)
-    cdf = np.arange(1, len(sorted_data) + 1) / len(sorted_data)
-    ax2.plot(sorted_data, cdf, label=name, color=color, linewidth=2.5)
-
-ax2.axvline(x=0, color='#cc0000', linestyle='--', linewidth=1.5, alpha=0.5)
-ax2.axvline(x=4, color='#999', linestyle=':', linewidth=1.5, alpha=0.5)
-ax2.text(4.2, 0.05, "Quality\nThreshold", fontsize=8, color='#666')
-
-ax2.axhline(y=0.1, color='#999', linestyle=':', linewidth=1, alpha=0.5)
-ax2.text(-11, 0.12, "10% worst", fontsize=8, color='#666')
-
-ax2.set_xlabel("Outcome", fontsize=11)
-ax2.set_ylabel("Cumulative Probability", fontsize=11)
-ax2.set_title("CDF: Probability of Outcome ≤ x", fontsize=13, weight='bold')
-ax2.legend(loc='lower right', fontsize=10)
-ax2.set_xlim(-12, 10)
-ax2.set_ylim(0, 1)
-ax2.grid(True, alpha=0.3)
-
-plt.tight_layout()
-plt.savefig("../images/performance_comparison.png", dpi=200, facecolor='white', bbox_inches='tight')
-print("✅ Saved: images/performance_comparison.png")
-plt.close()
-
-print("\n🔍 Key Findings:")
-print(f"   • V7 Effective Performance: {v7_metrics['effective_performance']} (highest)")
-print(f"   • V7 Min Outcome: {v7_metrics['min']} (no negative)")
-print(f"   • V7 Std: {v7_metrics['std']} (lowest)")
-print("   → V7 wins by eliminating bad outcomes, not by maximizing average")
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Performance comparison: S1 vs S2 vs V7")
+    parser.add_argument("--cache", action="store_true",
+                        help="seed each system separately and reuse cached outcomes")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="sample each system until its confidence intervals converge")
+    parser.add_argument("--tol", type=float, default=ADAPTIVE_TOL,
+                        help="adaptive: target CI half-width on effective performance")
+    parser.add_argument("--cat-tol", type=float, default=ADAPTIVE_CAT_TOL,
+                        help="adaptive: target CI half-width on catastrophic rate (percentage points)")
+    parser.add_argument("--max-samples", type=int, default=MAX_SAMPLES,
+                        help="adaptive: per-system sample budget")
+    parser.add_argument("--importance", action="store_true",
+                        help="add an importance-sampled catastrophic rate with its standard error")
+    parser.add_argument("--is-samples", type=int, default=IS_SAMPLES,
+                        help="importance samples per system")
+    parser.add_argument("--no-raw", action="store_true",
+                        help=f"skip the raw outcome sidecar ({RAW_PATH}; --adaptive never writes it)")
+    parser.add_argument("--paired", action="store_true",
+                        help="common random numbers across systems; report per-sample paired deltas")
+    args = parser.parse_args(argv)
+    if args.cache and args.adaptive:
+        parser.error("--cache and --adaptive are exclusive: an adaptive run's N is not known up front")
+    if args.paired and (args.adaptive or args.cache):
+        parser.error("--paired needs one fixed N shared by every system (no --adaptive or --cache)")
+    
+    print("🔄 Running simulations...")
+    adaptive = {}
+    if args.paired:
+        paired = simulate_paired(N_SAMPLES, np.random.SeedSequence(42))
+        s1_outcomes, s2_outcomes, v7_outcomes = paired["s1"], paired["s2"], paired["v7"]
+    elif args.adaptive:
+        # up to max_samples per system: streamed, never kept (no raw sidecar)
+        for key, simulate, seed in zip(["s1", "s2", "v7"], [simulate_s1, simulate_s2, simulate_v7],
+                                       np.random.SeedSequence(42).spawn(3)):
+            adaptive[key] = sample_adaptive(simulate, np.random.default_rng(seed),
+                                            args.tol, args.cat_tol, args.max_samples)
+    elif args.cache:
+        # One independent stream per system, so editing one simulator
+        # leaves the other systems' cache entries valid.
+        seeds = np.random.SeedSequence(42).spawn(3)
+        kernel = {"depends_on": (_streams,),
+                  "constants": {"LATENT_MU": LATENT_MU, "LATENT_SIGMA": LATENT_SIGMA,
+                                "CATASTROPHIC_PENALTY": CATASTROPHIC_PENALTY}}
+        s1_outcomes = memoize(simulate_s1, **kernel)(N_SAMPLES, seeds[0])
+        s2_outcomes = memoize(simulate_s2, **kernel)(N_SAMPLES, seeds[1])
+        v7_outcomes = memoize(simulate_v7, **kernel)(N_SAMPLES, seeds[2])
+        stats = default_cache().stats()
+        print(f"   result cache: {stats['hits']} hits, {stats['misses']} misses")
+    else:
+        s1_outcomes = simulate_s1(N_SAMPLES)
+        s2_outcomes = simulate_s2(N_SAMPLES)
+        v7_outcomes = simulate_v7(N_SAMPLES)
+
+    if adaptive:
+        summaries = {key: summary for key, (_, _, summary) in adaptive.items()}
+        s1_metrics, s2_metrics, v7_metrics = (metrics_from_accumulator(adaptive[key][0], key.upper())
+                                              for key in ["s1", "s2", "v7"])
+        for key, m in zip(["s1", "s2", "v7"], [s1_metrics, s2_metrics, v7_metrics]):
+            info = adaptive[key][1]
+            m.update(n=info["n"], effective_ci=info["effective_ci"],
+                     catastrophic_rate_ci=info["cat_rate_ci"], converged=info["converged"])
+    else:
+        summaries = {key: distribution_summary(outcomes, HIST_EDGES)
+                     for key, outcomes in [("s1", s1_outcomes), ("s2", s2_outcomes), ("v7", v7_outcomes)]}
+        s1_metrics = calc_metrics(s1_outcomes, "S1")
+        s2_metrics = calc_metrics(s2_outcomes, "S2")
+        v7_metrics = calc_metrics(v7_outcomes, "V7")
+    write_raw = not args.no_raw and not adaptive
+    if args.importance:
+        for m, seed in zip([s1_metrics, s2_metrics, v7_metrics], np.random.SeedSequence(43).spawn(3)):
+            r = catastrophic_rate_is(args.is_samples, m["system"].lower(), seed)
+            m.update(catastrophic_rate_is=r["cat_rate_is"], catastrophic_rate_se=r["cat_rate_se"],
+                     is_samples=r["is_samples"], mc_equivalent_n=r["mc_equivalent_n"])
+
+    print("\n📊 Performance Metrics:")
+    print("-" * 70)
+    print(f"{'System':<8} {'Mean':<8} {'Std':<8} {'Min':<8} {'Cat%':<8} {'Effective':<10}")
+    print("-" * 70)
+    for m in [s1_metrics, s2_metrics, v7_metrics]:
+        line = f"{m['system']:<8} {m['mean']:<8} {m['std']:<8} {m['min']:<8} {m['catastrophic_rate']:<8} {m['effective_performance']:<10}"
+        if "n" in m:
+            line += (f" N={m['n']:,} ±{m['effective_ci']:.3f} eff, ±{m['catastrophic_rate_ci']:.3f}% cat"
+                     + ("" if m["converged"] else ", budget hit"))
+        if "catastrophic_rate_is" in m:
+            line += f" IS: {m['catastrophic_rate_is']:.3g}% ± {m['catastrophic_rate_se']:.2g}"
+        print(line)
+
+    deltas = {}
+    if args.paired:
+        print("\n📐 Paired Deltas (common random numbers, 95% CI half-widths):")
+        print("-" * 70)
+        for a, b in [("v7", "s1"), ("v7", "s2"), ("s2", "s1")]:
+            d = deltas[f"{a}-{b}"] = paired_delta(paired[a], paired[b])
+            print(f"{a.upper()}-{b.upper():<5} ΔEff={d['delta_effective']:+.3f} ±{d['ci_paired']:.3f} "
+                  f"(independent ±{d['ci_independent']:.3f}, {d['variance_reduction']:.1f}x fewer samples)")
+
+    # Summaries go in the JSON; raw samples only in the binary sidecar
+    with open(RESULTS_PATH, "w") as f:
+        output = {
+            "n_samples": {k: v[1]["n"] for k, v in adaptive.items()} if adaptive else N_SAMPLES,
+            "s1": {"metrics": s1_metrics, "summary": summaries["s1"]},
+            "s2": {"metrics": s2_metrics, "summary": summaries["s2"]},
+            "v7": {"metrics": v7_metrics, "summary": summaries["v7"]}
+        }
+        if write_raw:
+            output["raw_outcomes"] = RAW_PATH
+        if deltas:
+            output["paired_deltas"] = deltas
+        json.dump(output, f, indent=2)
+    print(f"\n✅ Saved: {RESULTS_PATH}")
+    if write_raw:
+        np.savez_compressed(RAW_PATH, s1=np.asarray(s1_outcomes, dtype=float),
+                            s2=np.asarray(s2_outcomes, dtype=float), v7=np.asarray(v7_outcomes, dtype=float))
+        print(f"✅ Saved: {RAW_PATH}")
+
+    render_figures(["performance_comparison"])
+
+    print("\n🔍 Key Findings:")
+    print(f"   • V7 Effective Performance: {v7_metrics['effective_performance']} (highest)")
+    print(f"   • V7 Min Outcome: {v7_metrics['min']} (no negative)")
+    print(f"   • V7 Std: {v7_metrics['std']} (lowest)")
+    print("   → V7 wins by eliminating bad outcomes, not by maximizing average")
+
+
+if __name__ == "__main__":
+    main()
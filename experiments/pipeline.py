@@ -0,0 +1,233 @@
+"""
+Experiment Pipeline
+
+Every experiment declares the artifacts it reads and writes.
+The runner orders them by those declarations, runs independent ones
+concurrently and skips any whose outputs are already up to date.
+
+    python pipeline.py                    # everything that is stale
+    python pipeline.py jve_distribution_plot --force   # one target and its upstream
+    python pipeline.py --dry-run
+"""
+
+import argparse
+import ast
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from worker_budget import WORKERS_ENV
+
+EXPERIMENTS_DIR = os.path.dirname(os.path.abspath(__file__))
+LOG_DIR = os.path.join(EXPERIMENTS_DIR, ".cache", "logs")
+THREAD_ENVS = ["OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"]
+
+
+@dataclass
+class Experiment:
+    name: str
+    script: str
+    args: List[str] = field(default_factory=list)
+    inputs: List[str] = field(default_factory=list)   # relative to experiments/
+    outputs: List[str] = field(default_factory=list)  # relative to experiments/
+
+
+REGISTRY = [
+    Experiment("judgment_vs_execution", "judgment_vs_execution.py",
+               outputs=["results/jve_results.json"]),
+    Experiment("jve_distribution_plot", "generate_distribution_plot.py",
+               inputs=["results/jve_results.json"],
+               outputs=["../images/judgment_vs_execution_distribution.png"]),
+    Experiment("adversarial_stress_test", "adversarial_stress_test.py",
+               outputs=["results/adversarial_stress_results.json",
+                        "../images/adversarial_stress_test.png"]),
+    Experiment("twist_grid_sweep", "twist_grid_sweep.py",
+               outputs=["results/twist_grid_sweep.csv"]),
+    Experiment("performance_comparison", "performance_comparison.py",
+               outputs=["results/performance_comparison.json",
+                        "results/performance_comparison_outcomes.npz",
+                        "../images/performance_comparison.png"]),
+    Experiment("macro_micro_simulation", "macro_micro_simulation.py",
+               outputs=["results/macro_micro_states.cols",
+                        "results/macro_micro_states.json",
+                        "../images/freedom_cost_distribution.png"]),
+]
+
+EXPERIMENTS = {e.name: e for e in REGISTRY}
+
+
+def _path(relative: str) -> str:
+    return os.path.normpath(os.path.join(EXPERIMENTS_DIR, relative))
+
+
+def local_sources(script: str) -> List[str]:
+    """The script plus every experiments/ module it imports, transitively."""
+    seen, pending = set(), [script]
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        with open(_path(name)) as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            modules = []
+            if isinstance(node, ast.Import):
+                modules = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                modules = [node.module]
+            for module in modules:
+                candidate = f"{module.split('.')[0]}.py"
+                if os.path.exists(_path(candidate)):
+                    pending.append(candidate)
+    return sorted(seen)
+
+
+def dependencies() -> Dict[str, List[str]]:
+    """name → experiments that produce one of its inputs."""
+    producers = {}
+    for e in REGISTRY:
+        for out in e.outputs:
+            producers[_path(out)] = e.name
+    return {e.name: sorted({producers[_path(i)] for i in e.inputs if _path(i) in producers})
+            for e in REGISTRY}
+
+
+def _mtime(path: str) -> Optional[float]:
+    """Latest mtime under path (a file or a store directory); None if missing."""
+    if not os.path.exists(path):
+        return None
+    if not os.path.isdir(path):
+        return os.path.getmtime(path)
+    latest = os.path.getmtime(path)
+    for root, _, files in os.walk(path):
+        for name in files:
+            latest = max(latest, os.path.getmtime(os.path.join(root, name)))
+    return latest
+
+
+def is_up_to_date(e: Experiment) -> bool:
+    """Every output exists and is newer than every input and source file."""
+    out_times = [_mtime(_path(o)) for o in e.outputs]
+    if not out_times or None in out_times:
+        return False
+    in_times = [_mtime(_path(p)) for p in e.inputs + local_sources(e.script)]
+    if None in in_times:
+        return False
+    # Store directories report their newest file; judge outputs by their oldest.
+    return min(out_times) >= max(in_times, default=0)
+
+
+def select(targets: Optional[List[str]]) -> List[str]:
+    """Targets plus everything upstream of them, in registry order."""
+    if not targets:
+        return [e.name for e in REGISTRY]
+    deps = dependencies()
+    wanted, pending = set(), list(targets)
+    while pending:
+        name = pending.pop()
+        if name not in EXPERIMENTS:
+            raise SystemExit(f"unknown experiment: {name} (known: {', '.join(EXPERIMENTS)})")
+        if name not in wanted:
+            wanted.add(name)
+            pending.extend(deps[name])
+    return [e.name for e in REGISTRY if e.name in wanted]
+
+
+def _run(e: Experiment, workers: int = 1) -> Tuple[int, float, str]:
+    """Run one stage; workers is its share of the cores (process pools and BLAS threads)."""
+    os.makedirs(LOG_DIR, exist_ok=True)
+    log_path = os.path.join(LOG_DIR, f"{e.name}.log")
+    env = dict(os.environ, MPLBACKEND="Agg")
+    env.setdefault(WORKERS_ENV, str(workers))
+    for name in THREAD_ENVS:
+        env.setdefault(name, str(workers))
+    start = time.perf_counter()
+    with open(log_path, "w") as log:
+        code = subprocess.call([sys.executable, e.script, *e.args], cwd=EXPERIMENTS_DIR,
+                               stdout=log, stderr=subprocess.STDOUT, env=env)
+    return code, time.perf_counter() - start, log_path
+
+
+def run_pipeline(targets: Optional[List[str]] = None, jobs: Optional[int] = None,
+                 force: bool = False, dry_run: bool = False) -> Dict[str, dict]:
+    """
+    Run the selected experiments as a DAG. A stage starts once all of its
+    upstream stages have finished; it is skipped when up to date (unless
+    forced or an upstream stage was rebuilt) and when an upstream failed.
+    Each stage gets cpu_count // jobs workers, so -j N stages don't
+    oversubscribe the machine.
+    Returns {name: {"status": ..., "seconds": ...}}.
+    """
+    names = select(targets)
+    deps = {name: [d for d in ds if d in names] for name, ds in dependencies().items() if name in names}
+    report = {}
+    pending = list(names)
+    running = {}
+    jobs = jobs or os.cpu_count() or 1
+    workers = max(1, (os.cpu_count() or 1) // jobs)
+
+    def ready(name):
+        return all(d in report for d in deps[name])
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            for name in [n for n in pending if ready(n)]:
+                if len(running) >= jobs:
+                    break
+                pending.remove(name)
+                upstream = [report[d]["status"] for d in deps[name]]
+                e = EXPERIMENTS[name]
+                if any(s in ("failed", "blocked") for s in upstream):
+                    report[name] = {"status": "blocked", "seconds": 0.0}
+                elif (not force and not {"ran", "would run"} & set(upstream)
+                      and is_up_to_date(e)):
+                    report[name] = {"status": "up to date", "seconds": 0.0}
+                elif dry_run:
+                    report[name] = {"status": "would run", "seconds": 0.0}
+                else:
+                    print(f"▶ {name}")
+                    running[pool.submit(_run, e, workers)] = name
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                code, seconds, log_path = future.result()
+                status = "ran" if code == 0 else "failed"
+                report[name] = {"status": status, "seconds": seconds, "log": log_path}
+                mark = "✅" if code == 0 else "❌"
+                print(f"{mark} {name} ({seconds:.1f}s)" + ("" if code == 0 else f" — see {log_path}"))
+    return report
+
+
+def print_report(report: Dict[str, dict]):
+    print("\n" + "=" * 60)
+    print("PIPELINE REPORT")
+    print("=" * 60)
+    print(f"{'Stage':<28} {'Status':<12} {'Time':>8}")
+    print("-" * 60)
+    for name, r in report.items():
+        print(f"{name:<28} {r['status']:<12} {r['seconds']:>7.1f}s")
+    total = sum(r["seconds"] for r in report.values())
+    print("-" * 60)
+    print(f"{'stage time (sum)':<41} {total:>7.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the experiments as a dependency DAG")
+    parser.add_argument("targets", nargs="*", help=f"experiments to build (default: all of {', '.join(EXPERIMENTS)})")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="concurrent stages (default: all cores)")
+    parser.add_argument("--force", action="store_true", help="rerun even if outputs are up to date")
+    parser.add_argument("--dry-run", action="store_true", help="show what would run")
+    args = parser.parse_args()
+
+    wall = time.perf_counter()
+    report = run_pipeline(args.targets, jobs=args.jobs, force=args.force, dry_run=args.dry_run)
+    print_report(report)
+    print(f"{'wall time':<41} {time.perf_counter() - wall:>7.1f}s")
+    sys.exit(1 if any(r["status"] == "failed" for r in report.values()) else 0)
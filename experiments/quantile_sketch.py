@@ -0,0 +1,183 @@
+"""
+Streaming Quantile Sketch
+
+KLL-style mergeable sketch for quantiles, ranks and CDFs of outcome streams
+too long to sort.
+
+Items live in a stack of levels; an item on level h stands for 2^h inputs.
+When a level outgrows its capacity (k on the top level, shrinking by 2/3
+per level below), it is sorted and every other item, from a random offset,
+is promoted to the next level. Memory stays O(k · log(n/k)) and the rank
+error of any quantile is about RANK_ERROR / k of n. Sketches from separate
+chunks or workers merge level by level. Up to k items nothing is ever
+compacted, so small runs give exact order statistics.
+"""
+
+import math
+
+import numpy as np
+
+DEFAULT_K = 200
+SHRINK = 2 / 3
+RANK_ERROR = 2.0  # empirical normalized rank error · k (see rank_error)
+
+
+class QuantileSketch:
+    __slots__ = ("k", "n", "min", "max", "seed", "_levels", "_rng", "_sorted")
+
+    def __init__(self, k: int = DEFAULT_K, seed=0):
+        if k < 8:
+            raise ValueError(f"k must be at least 8, got {k}")
+        self.k = k
+        self.n = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.seed = seed
+        self._levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+        self._sorted = None
+
+    @classmethod
+    def for_error(cls, eps: float, seed=0):
+        """Smallest sketch whose rank error is about eps (as a fraction of n)."""
+        return cls(max(8, math.ceil(RANK_ERROR / eps)), seed)
+
+    @property
+    def rank_error(self) -> float:
+        """Typical worst-case quantile rank error, as a fraction of n (0 while exact)."""
+        return 0.0 if len(self._levels) == 1 else RANK_ERROR / self.k
+
+    @property
+    def exact(self) -> bool:
+        return len(self._levels) == 1
+
+    def __len__(self) -> int:
+        return self.n
+
+    def size(self) -> int:
+        """Items retained (the memory footprint)."""
+        return sum(len(level) for level in self._levels)
+
+    # -- building ------------------------------------------------------------
+
+    def update(self, values):
+        arr = np.asarray(values, dtype=float).ravel()
+        if arr.size == 0:
+            return self
+        self.n += arr.size
+        self.min = min(self.min, float(arr.min()))
+        self.max = max(self.max, float(arr.max()))
+        self._levels[0] = np.concatenate([self._levels[0], arr])
+        self._compress()
+        return self
+
+    def merge(self, other: "QuantileSketch"):
+        if not other.n:
+            return self
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+        for h, level in enumerate(other._levels):
+            self._levels[h] = np.concatenate([self._levels[h], level])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _capacity(self, h: int) -> int:
+        depth = len(self._levels) - h - 1
+        return max(2, math.ceil(self.k * SHRINK ** depth))
+
+    def _compress(self):
+        self._sorted = None
+        while True:
+            over = [h for h, level in enumerate(self._levels) if len(level) > self._capacity(h)]
+            if not over:
+                return
+            self._compact(over[0])
+
+    def _compact(self, h: int):
+        level = np.sort(self._levels[h])
+        # an odd item out stays behind, so the promoted half is exactly half the weight
+        keep = level[-1:] if len(level) % 2 else level[:0]
+        pairs = level[:len(level) - len(keep)]
+        promoted = pairs[self._rng.integers(2)::2]
+        if h + 1 == len(self._levels):
+            self._levels.append(np.empty(0))
+        self._levels[h] = keep
+        self._levels[h + 1] = np.concatenate([self._levels[h + 1], promoted])
+
+    # -- queries -------------------------------------------------------------
+
+    def weighted_items(self):
+        """(values, weights) in ascending order; weights sum to n."""
+        if self._sorted is None:
+            values = np.concatenate(self._levels)
+            weights = np.concatenate([np.full(len(level), 2 ** h, dtype=np.int64)
+                                      for h, level in enumerate(self._levels)])
+            order = np.argsort(values, kind="stable")
+            self._sorted = values[order], weights[order]
+        return self._sorted
+
+    def quantiles(self, qs):
+        """
+        Lower order statistics: the item of 0-based rank floor(q·n), as
+        sorted(x)[int(q * n)] would give (clamped to the last item).
+        """
+        if not self.n:
+            raise ValueError("quantile of an empty sketch")
+        values, weights = self.weighted_items()
+        cum = np.cumsum(weights)
+        ranks = np.minimum(np.floor(np.asarray(qs, dtype=float) * self.n), self.n - 1)
+        return values[np.searchsorted(cum, ranks, side="right")]
+
+    def quantile(self, q: float) -> float:
+        return float(self.quantiles([q])[0])
+
+    def iqr(self) -> float:
+        q1, q3 = self.quantiles([0.25, 0.75])
+        return float(q3 - q1)
+
+    def rank(self, x) -> np.ndarray:
+        """Estimated number of inputs ≤ x."""
+        values, weights = self.weighted_items()
+        cum = np.concatenate([[0], np.cumsum(weights)])
+        return cum[np.searchsorted(values, x, side="right")]
+
+    def cdf(self, x) -> np.ndarray:
+        """Estimated P(X ≤ x)."""
+        return self.rank(x) / self.n if self.n else np.zeros(np.shape(x))
+
+    def cdf_steps(self, points: int):
+        """
+        The sketch's CDF thinned to about `points` of its own steps:
+        (x, p) with p the estimated fraction of inputs ≤ x.
+        """
+        values, weights = self.weighted_items()
+        cum = np.cumsum(weights)
+        k = np.unique(np.linspace(0, len(values) - 1, min(points, len(values))).round().astype(int))
+        return values[k], cum[k] / self.n
+
+    # -- serialization -------------------------------------------------------
+
+    def to_dict(self):
+        return {
+            "k": self.k,
+            "n": self.n,
+            "min": self.min,
+            "max": self.max,
+            "seed": self.seed,
+            "levels": [level.tolist() for level in self._levels],
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        seed = d.get("seed", 0)
+        sketch = cls(d["k"], seed)
+        # continue on a stream that differs from a fresh sketch's
+        sketch._rng = np.random.default_rng(None if seed is None else [seed, d["n"]])
+        sketch.n = d["n"]
+        sketch.min = d["min"]
+        sketch.max = d["max"]
+        sketch._levels = [np.asarray(level, dtype=float) for level in d["levels"]]
+        return sketch
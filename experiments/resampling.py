@@ -0,0 +1,122 @@
+"""
+Resampling Tests
+
+Bootstrap confidence intervals and permutation p-values for the
+hypothesis checks, vectorized over replicates.
+
+Replicates are drawn as index (or permutation) arrays, a chunk of rows at a
+time: each row is one replicate, and the statistic is evaluated along
+axis 1 for the whole chunk at once. Memory is bounded by chunk_elements
+regardless of the replicate count.
+"""
+
+import numpy as np
+
+REPLICATES = 10_000
+ALPHA = 0.05
+CHUNK_ELEMENTS = 4_000_000  # index-array elements per chunk
+
+
+def row_mean(a):
+    return a.mean(axis=1)
+
+
+def row_std(a):
+    """Sample standard deviation of each replicate (ddof=1, as statistics.stdev)."""
+    return a.std(axis=1, ddof=1) if a.shape[1] > 1 else np.zeros(len(a))
+
+
+def _chunk_rows(replicates, width, chunk_elements):
+    rows = max(1, chunk_elements // max(1, width))
+    for start in range(0, replicates, rows):
+        yield min(rows, replicates - start)
+
+
+def _p_value(extreme, replicates):
+    """(1 + #as-extreme) / (1 + R): never 0, valid for a finite R."""
+    return (1 + extreme) / (1 + replicates)
+
+
+def bootstrap(samples, statistic, replicates=REPLICATES, alpha=ALPHA, rng=None,
+              chunk_elements=CHUNK_ELEMENTS):
+    """
+    Percentile bootstrap of statistic(*groups) over independent samples.
+
+    samples: 1-D arrays, each resampled with replacement within itself
+    statistic: maps groups shaped (m, n_g) to m values
+    Returns {"estimate", "ci": [lo, hi], "se", "replicates"}.
+    """
+    rng = np.random.default_rng(rng)
+    samples = [np.asarray(x, dtype=float) for x in samples]
+    estimate = float(statistic(*(x[None, :] for x in samples))[0])
+    width = sum(len(x) for x in samples)
+    values = np.empty(replicates)
+    done = 0
+    for m in _chunk_rows(replicates, width, chunk_elements):
+        groups = [x[rng.integers(0, len(x), (m, len(x)))] for x in samples]
+        values[done:done + m] = statistic(*groups)
+        done += m
+    lo, hi = np.quantile(values, [alpha / 2, 1 - alpha / 2])
+    return {"estimate": estimate, "ci": [float(lo), float(hi)],
+            "se": float(values.std(ddof=1)), "replicates": replicates}
+
+
+def permutation_test(x, y, statistic, alternative="greater", replicates=REPLICATES, rng=None,
+                     chunk_elements=CHUNK_ELEMENTS):
+    """
+    p-value of statistic(x, y) under exchangeability of the pooled samples.
+
+    alternative: "greater" (large values are evidence), "less", or
+    "two-sided" (large |value|). Returns {"observed", "p_value", "replicates"}.
+    """
+    rng = np.random.default_rng(rng)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    observed = float(statistic(x[None, :], y[None, :])[0])
+    pooled = np.concatenate([x, y])
+    extreme = 0
+    for m in _chunk_rows(replicates, len(pooled), chunk_elements):
+        perm = rng.permuted(np.tile(pooled, (m, 1)), axis=1)
+        values = statistic(perm[:, :len(x)], perm[:, len(x):])
+        if alternative == "greater":
+            extreme += int(np.count_nonzero(values >= observed))
+        elif alternative == "less":
+            extreme += int(np.count_nonzero(values <= observed))
+        elif alternative == "two-sided":
+            extreme += int(np.count_nonzero(np.abs(values) >= abs(observed)))
+        else:
+            raise ValueError(f"unknown alternative: {alternative}")
+    return {"observed": observed, "p_value": _p_value(extreme, replicates), "replicates": replicates}
+
+
+def proportion_test(successes, n, p0, alternative="less", replicates=REPLICATES, alpha=ALPHA, rng=None):
+    """
+    A rate against p0. Resampling a 0/1 series is a binomial draw, so the
+    bootstrap CI and the null distribution (rate = p0) are drawn directly
+    as binomial counts, with no index arrays.
+    """
+    rng = np.random.default_rng(rng)
+    estimate = successes / n
+    boot = rng.binomial(n, estimate, replicates) / n
+    null = rng.binomial(n, p0, replicates)
+    if alternative == "less":
+        extreme = int(np.count_nonzero(null <= successes))
+    elif alternative == "greater":
+        extreme = int(np.count_nonzero(null >= successes))
+    else:
+        raise ValueError(f"unknown alternative: {alternative}")
+    lo, hi = np.quantile(boot, [alpha / 2, 1 - alpha / 2])
+    return {"estimate": estimate, "ci": [float(lo), float(hi)],
+            "p_value": _p_value(extreme, replicates), "replicates": replicates}
+
+
+def centered(x):
+    """x minus its mean: permuting centered groups tests spread, not location."""
+    x = np.asarray(x, dtype=float)
+    return x - x.mean() if len(x) else x
+
+
+def format_test(test):
+    """'[lo, hi], p=…' for report lines."""
+    lo, hi = test["ci"]
+    return f"95% CI [{lo:.3f}, {hi:.3f}], p={test['p_value']:.2g}"
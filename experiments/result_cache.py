@@ -0,0 +1,251 @@
+"""
+Simulation Result Cache
+
+Content-addressed memoization for simulators that are pure functions of
+their parameters and seed.
+
+Key = function identity + source hash (of the function and the
+      depends_on functions/classes) + declared constants
+      + canonical parameters, seed included.
+Entries are pickles under .cache/results/, evicted least-recently-used
+once the cache outgrows its byte budget.
+
+Only declared code and constants are hashed. After editing anything else
+a cached simulator reaches (a helper module, an undeclared constant),
+clear the cache: rm -rf experiments/.cache/results
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import random
+from enum import Enum
+
+import numpy as np
+
+DEFAULT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "results")
+DEFAULT_MAX_BYTES = 1 << 30
+
+
+class Uncacheable(Exception):
+    """A parameter has no stable content identity (e.g. a live RNG object)."""
+
+
+def canonical(value):
+    """JSON-able, order-independent identity for a parameter value."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Enum):
+        return f"{type(value).__name__}.{value.name}"
+    if isinstance(value, dict):
+        return {"__dict__": sorted((str(k), canonical(v)) for k, v in value.items())}
+    if isinstance(value, (list, tuple)):
+        return [canonical(v) for v in value]
+    if isinstance(value, range):
+        return {"__range__": [value.start, value.stop, value.step]}
+    if isinstance(value, np.random.SeedSequence):
+        return {"__seed_sequence__": [canonical(value.entropy), list(value.spawn_key)]}
+    if isinstance(value, np.ndarray):
+        return {"__ndarray__": [value.dtype.str, list(value.shape),
+                                hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()]}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (np.random.Generator, np.random.RandomState, random.Random)):
+        raise Uncacheable(f"live RNG object {type(value).__name__} has no content identity")
+    raise Uncacheable(f"no canonical form for {type(value).__name__}")
+
+
+def source_hash(*functions):
+    h = hashlib.sha256()
+    for fn in functions:
+        h.update(inspect.getsource(fn).encode())
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    On-disk pickle store with size-bounded LRU eviction.
+
+    An entry's mtime is its last access, so several processes can share
+    one cache directory without a shared index file. The byte total is
+    scanned once and then tracked per write; the tree is only walked again
+    when the running total crosses the budget (which also resyncs it with
+    other processes' writes).
+    """
+
+    def __init__(self, root=DEFAULT_ROOT, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+        self._bytes = None  # running total; None until the first scan
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], f"{key}.pkl")
+
+    def get(self, key):
+        """(True, value) on a hit, (False, None) on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return False, None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass  # evicted by another process after the load; the value is still good
+        self.hits += 1
+        return True, value
+
+    def put(self, key, value):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        if self._bytes is None:
+            self._bytes = sum(size for _, size, _ in self.entries())
+        try:
+            self._bytes -= os.path.getsize(path)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp, path)
+        self._bytes += os.path.getsize(path)
+        if self._bytes > self.max_bytes:
+            self.evict()
+
+    def entries(self):
+        """[(mtime, size, path)] for every stored entry."""
+        found = []
+        for root, _, files in os.walk(self.root):
+            for name in files:
+                if name.endswith(".pkl"):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    found.append((st.st_mtime, st.st_size, path))
+        return found
+
+    def evict(self):
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.evictions += 1
+        self._bytes = total
+
+    def clear(self):
+        for _, _, path in self.entries():
+            os.remove(path)
+        self._bytes = 0
+
+    def stats(self):
+        entries = self.entries()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
+
+
+_default_cache = None
+
+
+def default_cache():
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResultCache()
+    return _default_cache
+
+
+def memoize(fn=None, *, cache=None, depends_on=(), constants=None, unseeded=("rng",), seed_arg=None,
+            global_rng=None):
+    """
+    Wrap a pure simulator with the result cache.
+
+    depends_on: functions or classes whose source also goes into the key
+                (the kernel a thin driver calls, the objects it builds)
+    constants:  {name: value} of module-level settings the code reads;
+                their values go into the key, since editing one changes
+                no function's source
+    unseeded:   parameters that draw fresh entropy when left as None;
+                such calls (and calls with live RNG objects) bypass the cache
+    seed_arg:   the parameter that seeds the call (e.g. "seed" for a
+                simulator whose rng=None falls back to Random(seed)); when
+                given, only a None seed bypasses the cache and `unseeded`
+                is ignored
+    global_rng: a module-level generator the function draws from (e.g. the
+                random module); its state joins the key, and a hit restores
+                the state the original call left behind
+    """
+    if fn is None:
+        return functools.partial(memoize, cache=cache, depends_on=depends_on, constants=constants,
+                                 unseeded=unseeded, seed_arg=seed_arg, global_rng=global_rng)
+
+    signature = inspect.signature(fn)
+    module = fn.__module__
+    if module == "__main__":
+        # a script run directly shares entries with the same module imported elsewhere
+        module = os.path.splitext(os.path.basename(inspect.getfile(fn)))[0]
+    identity = f"{module}.{fn.__qualname__}"
+    code = source_hash(fn, *depends_on)
+    if constants:
+        code = hashlib.sha256((code + json.dumps(canonical(constants), sort_keys=True)).encode()).hexdigest()
+    if seed_arg is not None and seed_arg not in signature.parameters:
+        raise ValueError(f"{identity} has no parameter {seed_arg!r}")
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        store = cache or default_cache()
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        try:
+            if seed_arg is not None:
+                if bound.arguments[seed_arg] is None:
+                    raise Uncacheable("unseeded call")
+            elif any(bound.arguments.get(name, 0) is None for name in unseeded):
+                raise Uncacheable("unseeded call")
+            params = {name: canonical(value) for name, value in bound.arguments.items()}
+        except Uncacheable:
+            store.bypassed += 1
+            return fn(*args, **kwargs)
+        if global_rng is not None:
+            params["__global_rng__"] = canonical(global_rng.getstate())
+
+        key = hashlib.sha256(json.dumps(
+            {"function": identity, "source": code, "params": params}, sort_keys=True
+        ).encode()).hexdigest()
+        hit, value = store.get(key)
+        if hit:
+            if global_rng is None:
+                return value
+            value, state = value
+            global_rng.setstate(state)
+            return value
+        value = fn(*args, **kwargs)
+        store.put(key, value if global_rng is None else (value, global_rng.getstate()))
+        return value
+
+    wrapper.cache_key_source = code
+    return wrapper
@@ -0,0 +1,154 @@
+"""
+Experiment Run Log
+
+Append-only JSON-lines log of finalized runs, shared by concurrent writers,
+with a sidecar index so queries by task, condition or date read only the
+matching records.
+
+Layout:
+    <dir>/runs.jsonl    one run per line, never rewritten
+    <dir>/runs.idx      one [task_id, condition, date, offset, length] per line
+    <dir>/runs.lock     flock target serializing writers
+
+A record is durable once its line is fsynced; the index entry follows it.
+A crash can leave a torn last line in either file: recover() truncates the
+log to its last complete line and re-indexes whatever the index is missing.
+"""
+
+import fcntl
+import json
+import os
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+LOG_FILE = "runs.jsonl"
+INDEX_FILE = "runs.idx"
+LOCK_FILE = "runs.lock"
+
+IndexEntry = Tuple[str, str, str, int, int]
+
+
+def index_key(record: Dict) -> Tuple[str, str, str]:
+    return record["task_id"], record["condition"], record.get("timestamp", "")[:10]
+
+
+class RunLog:
+    def __init__(self, path: str = "."):
+        self.path = path
+        self.log_path = os.path.join(path, LOG_FILE)
+        self.index_path = os.path.join(path, INDEX_FILE)
+        self.lock_path = os.path.join(path, LOCK_FILE)
+
+    @contextmanager
+    def _locked(self):
+        os.makedirs(self.path, exist_ok=True)
+        with open(self.lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def append(self, record: Dict) -> int:
+        """Append one run record; returns its byte offset in the log."""
+        return self.append_many([record])[0]
+
+    def append_many(self, records: Iterable[Dict]) -> List[int]:
+        """Append a batch under one lock and one fsync per file."""
+        lines = [(index_key(r), (json.dumps(r, ensure_ascii=False) + "\n").encode()) for r in records]
+        if not lines:
+            return []
+        with self._locked():
+            self._recover_locked()
+            with open(self.log_path, "ab") as log:
+                offset = log.tell()
+                entries = []
+                for key, line in lines:
+                    entries.append((*key, offset, len(line)))
+                    offset += len(line)
+                log.write(b"".join(line for _, line in lines))
+                log.flush()
+                os.fsync(log.fileno())
+            self._write_index(entries)
+        return [e[3] for e in entries]
+
+    def _write_index(self, entries: List[IndexEntry], mode: str = "a"):
+        with open(self.index_path, mode) as idx:
+            idx.write("".join(json.dumps(list(e), ensure_ascii=False) + "\n" for e in entries))
+            idx.flush()
+            os.fsync(idx.fileno())
+
+    def read_index(self) -> List[IndexEntry]:
+        """Complete index entries; a torn trailing line is ignored."""
+        if not os.path.exists(self.index_path):
+            return []
+        entries = []
+        with open(self.index_path) as idx:
+            for line in idx:
+                if not line.endswith("\n"):
+                    break
+                entries.append(tuple(json.loads(line)))
+        return entries
+
+    def recover(self):
+        with self._locked():
+            self._recover_locked()
+
+    def _recover_locked(self):
+        """Drop a torn log tail, then index every complete record past the index's end."""
+        if not os.path.exists(self.log_path):
+            return
+        entries = self.read_index()
+        indexed_end = entries[-1][3] + entries[-1][4] if entries else 0
+        size = os.path.getsize(self.log_path)
+
+        if os.path.exists(self.index_path) and os.path.getsize(self.index_path) and self._index_is_torn():
+            self._write_index(entries, mode="w")
+        if size == indexed_end:
+            return
+
+        missing = []
+        with open(self.log_path, "rb") as log:
+            log.seek(indexed_end)
+            offset = indexed_end
+            for line in log:
+                if not line.endswith(b"\n"):
+                    break
+                missing.append((*index_key(json.loads(line)), offset, len(line)))
+                offset += len(line)
+        if offset < size:
+            with open(self.log_path, "r+b") as log:
+                log.truncate(offset)
+                os.fsync(log.fileno())
+        if missing:
+            self._write_index(missing)
+
+    def _index_is_torn(self) -> bool:
+        with open(self.index_path, "rb") as idx:
+            idx.seek(-1, os.SEEK_END)
+            return idx.read(1) != b"\n"
+
+    def rebuild_index(self):
+        """Regenerate the index from the log alone."""
+        with self._locked():
+            if os.path.exists(self.index_path):
+                os.remove(self.index_path)
+            self._recover_locked()
+
+    def query(self, task_id: Optional[str] = None, condition: Optional[str] = None,
+              date: Optional[str] = None) -> Iterator[Dict]:
+        """Stream matching records, reading only their byte ranges."""
+        if not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, "rb") as log:
+            for t, c, d, offset, length in self.read_index():
+                if ((task_id is None or t == task_id) and (condition is None or c == condition)
+                        and (date is None or d == date)):
+                    log.seek(offset)
+                    yield json.loads(log.read(length))
+
+    def __iter__(self) -> Iterator[Dict]:
+        return self.query()
+
+    def __len__(self) -> int:
+        return len(self.read_index())
@@ -0,0 +1,317 @@
+"""
+Sharded Judgment vs Execution
+
+run_full_experiment split into (agent, seed-range) work units, so n_runs
+can be spread over any number of processes and hosts.
+
+A work queue is a directory (shared storage for several hosts):
+
+    <queue>/plan.json          n_runs, unit_size, engine, sketch k, root seed
+    <queue>/pending/<unit>     units nobody has claimed
+    <queue>/claimed/<unit>     units being run (mtime = last heartbeat)
+    <queue>/done/<unit>        the unit's DistributionState partial
+
+A worker claims a unit by renaming it from pending/ to claimed/, which
+succeeds for exactly one claimant, and publishes its partial with an
+atomic rename into done/. Units are deterministic (the scalar engine's
+seeds own their streams, the batched engine seeds from (agent, start)),
+so a unit re-run after a lost worker gives the same partial. The
+coordinator merges partials in unit order: counts, sums and M2 combine
+exactly, the quantile sketches within their rank error.
+
+    python sharded_experiment.py plan  --queue q/ --runs 1000000000 --unit-size 10000000 --engine batched
+    python sharded_experiment.py work  --queue q/ --processes 8      # on every host
+    python sharded_experiment.py status --queue q/
+    python sharded_experiment.py merge --queue q/
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import time
+from dataclasses import asdict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from judgment_vs_execution import (OUTCOME_EDGES, SKETCH_K, AgentType, BatchResult, DistributionState,
+                                   evaluate_hypotheses, save_results, simulate, simulate_batch)
+from metrics_stream import distribution_summary
+
+UNIT_SIZE = 1_000_000
+CHUNK_SIZE = 100_000
+LEASE = 3600.0  # seconds without a heartbeat before a claimed unit is requeued
+RESULTS_PATH = "results/jve_sharded_results.json"
+
+
+# ---------------------------------------------------------------------------
+# Work units
+# ---------------------------------------------------------------------------
+
+def plan_units(n_runs: int, unit_size: int = UNIT_SIZE, engine: str = "batched") -> List[Dict]:
+    return [
+        {"unit": f"{agent_type.value}-{start:012d}", "agent": agent_type.value,
+         "start": start, "stop": min(start + unit_size, n_runs), "engine": engine}
+        for agent_type in AgentType
+        for start in range(0, n_runs, unit_size)
+    ]
+
+
+def run_unit(unit: Dict, k: int = SKETCH_K, root_seed: int = 0,
+             heartbeat: Optional[Callable[[], None]] = None) -> DistributionState:
+    """
+    Simulate seeds [start, stop) of one agent into a fresh partial state.
+    The batched engine's stream and the sketch's compaction coins are both
+    seeded from (agent, start), so no two units share a stream.
+    """
+    agent_type = AgentType(unit["agent"])
+    agent_index = list(AgentType).index(agent_type)
+    sequence = np.random.SeedSequence(root_seed, spawn_key=(agent_index, unit["start"]))
+    sketch_seed, = sequence.spawn(1)[0].generate_state(1).tolist()
+    state = DistributionState(agent_type.value, k, sketch_seed)
+    if unit["engine"] == "batched":
+        rng = np.random.default_rng(sequence)
+    for start in range(unit["start"], unit["stop"], CHUNK_SIZE):
+        seeds = range(start, min(start + CHUNK_SIZE, unit["stop"]))
+        if unit["engine"] == "batched":
+            state.update(simulate_batch(agent_type, seeds, rng=rng))
+        else:
+            state.update(BatchResult.from_results([simulate(agent_type, seed) for seed in seeds]))
+        if heartbeat:
+            heartbeat()
+    return state
+
+
+# ---------------------------------------------------------------------------
+# File-based work queue
+# ---------------------------------------------------------------------------
+
+class WorkQueue:
+    def __init__(self, path: str):
+        self.path = path
+        self.pending = os.path.join(path, "pending")
+        self.claimed = os.path.join(path, "claimed")
+        self.done = os.path.join(path, "done")
+
+    def _write(self, directory: str, name: str, data: Dict):
+        """Write-then-rename, so readers never see a partial file."""
+        tmp = os.path.join(directory, f".{name}.{socket.gethostname()}.{os.getpid()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, os.path.join(directory, name))
+
+    def create(self, plan: Dict, units: List[Dict]):
+        if os.path.exists(os.path.join(self.path, "plan.json")):
+            raise FileExistsError(f"queue already planned: {self.path}")
+        for directory in (self.pending, self.claimed, self.done):
+            os.makedirs(directory, exist_ok=True)
+        for unit in units:
+            self._write(self.pending, unit["unit"], unit)
+        self._write(self.path, "plan.json", {**plan, "units": len(units)})
+
+    def plan(self) -> Dict:
+        with open(os.path.join(self.path, "plan.json")) as f:
+            return json.load(f)
+
+    def claim(self) -> Optional[Dict]:
+        """Take one pending unit; None when nothing is pending."""
+        for name in sorted(os.listdir(self.pending)):
+            if name.startswith("."):
+                continue
+            source = os.path.join(self.pending, name)
+            target = os.path.join(self.claimed, name)
+            try:
+                # heartbeat before the rename, so requeue_stale never sees an old mtime
+                os.utime(source)
+                os.rename(source, target)
+            except FileNotFoundError:
+                continue  # another worker got it first
+            try:
+                if os.path.exists(os.path.join(self.done, name)):
+                    os.remove(target)  # requeued after its first run finished
+                    continue
+                with open(target) as f:
+                    return json.load(f)
+            except FileNotFoundError:
+                continue  # requeued from under us; whoever claims it next runs it
+        return None
+
+    def heartbeat(self, unit: Dict):
+        try:
+            os.utime(os.path.join(self.claimed, unit["unit"]))
+        except FileNotFoundError:
+            pass
+
+    def complete(self, unit: Dict, state: DistributionState, worker: str):
+        self._write(self.done, unit["unit"], {**unit, "worker": worker, "state": state.to_dict()})
+        try:
+            os.remove(os.path.join(self.claimed, unit["unit"]))
+        except FileNotFoundError:
+            pass
+
+    def requeue_stale(self, lease: float = LEASE) -> int:
+        """Return units whose worker stopped heartbeating to pending."""
+        requeued = 0
+        cutoff = time.time() - lease
+        for name in os.listdir(self.claimed):
+            path = os.path.join(self.claimed, name)
+            try:
+                if os.path.getmtime(path) >= cutoff:
+                    continue
+                if os.path.exists(os.path.join(self.done, name)):
+                    os.remove(path)
+                else:
+                    os.rename(path, os.path.join(self.pending, name))
+                    requeued += 1
+            except FileNotFoundError:
+                continue
+        return requeued
+
+    def status(self) -> Dict:
+        def count(directory):
+            return sum(1 for name in os.listdir(directory) if not name.startswith("."))
+        return {"units": self.plan()["units"], "pending": count(self.pending),
+                "claimed": count(self.claimed), "done": count(self.done)}
+
+    def partials(self) -> List[Dict]:
+        parts = []
+        for name in sorted(os.listdir(self.done)):
+            if not name.startswith("."):
+                with open(os.path.join(self.done, name)) as f:
+                    parts.append(json.load(f))
+        return parts
+
+
+# ---------------------------------------------------------------------------
+# Worker and coordinator
+# ---------------------------------------------------------------------------
+
+def work(queue_path: str, lease: float = LEASE, max_units: Optional[int] = None) -> int:
+    """Claim and run units until the queue is drained; returns units run."""
+    queue = WorkQueue(queue_path)
+    plan = queue.plan()
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    ran = 0
+    while max_units is None or ran < max_units:
+        unit = queue.claim()
+        if unit is None:
+            if queue.requeue_stale(lease):
+                continue
+            break
+        start = time.perf_counter()
+        state = run_unit(unit, plan["k"], plan["root_seed"], heartbeat=lambda: queue.heartbeat(unit))
+        queue.complete(unit, state, worker)
+        ran += 1
+        print(f"   {worker} {unit['unit']} ({unit['stop'] - unit['start']:,} runs, "
+              f"{time.perf_counter() - start:.1f}s)")
+    return ran
+
+
+def merge_partials(parts: List[Dict]) -> Tuple[Dict[str, DistributionState], int]:
+    """Per-agent states merged in unit order (so the result is independent of scheduling)."""
+    states: Dict[str, DistributionState] = {}
+    for part in sorted(parts, key=lambda p: (p["agent"], p["start"])):
+        state = DistributionState.from_dict(part["state"])
+        if part["agent"] in states:
+            states[part["agent"]].merge(state)
+        else:
+            states[part["agent"]] = state
+    return states, len(parts)
+
+
+def coordinate(queue_path: str, output: str = RESULTS_PATH, allow_partial: bool = False) -> Dict:
+    queue = WorkQueue(queue_path)
+    plan = queue.plan()
+    status = queue.status()
+    if status["done"] < status["units"] and not allow_partial:
+        raise RuntimeError(f"{status['done']}/{status['units']} units done "
+                           f"({status['pending']} pending, {status['claimed']} claimed)")
+    states, merged = merge_partials(queue.partials())
+
+    all_metrics = {}
+    for agent_type in AgentType:
+        state = states.get(agent_type.value)
+        if state is None:
+            print(f"Agent {agent_type.value} ({agent_type.name}): no finished units")
+            continue
+        metrics = state.metrics()
+        all_metrics[agent_type.value] = {**asdict(metrics),
+                                         "summary": distribution_summary(state.sketch, OUTCOME_EDGES)}
+        print(f"Agent {agent_type.value} ({agent_type.name}): {metrics.n_runs:,} runs, "
+              f"Mean: {metrics.mean:.2f}, Std: {metrics.std:.2f}, "
+              f"Catastrophic: {metrics.catastrophic_rate*100:.1f}%")
+
+    missing = [agent_type.value for agent_type in AgentType if agent_type.value not in all_metrics]
+    # a partial merge may hold fewer runs than planned, and unequal counts per agent
+    n_runs = min((m["n_runs"] for m in all_metrics.values()), default=0)
+    if missing:
+        print(f"\n⚠️  H1–H3 not evaluated: no runs yet for agent(s) {', '.join(missing)}")
+        data = {"experiment": "Judgment vs Execution", "timestamp": datetime.now().isoformat(),
+                "n_runs": n_runs, "metrics": all_metrics, "all_passed": None}
+    else:
+        data = evaluate_hypotheses(all_metrics, n_runs)
+    data["sharding"] = {"engine": plan["engine"], "unit_size": plan["unit_size"],
+                        "units": plan["units"], "units_merged": merged,
+                        "n_runs_planned": plan["n_runs"], "missing_agents": missing}
+    save_results(data, output)
+    return data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sharded judgment vs execution experiment")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("plan", help="split the seed space into pending units")
+    p.add_argument("--queue", required=True, help="queue directory (shared storage for multi-host runs)")
+    p.add_argument("--runs", type=int, required=True, help="runs per agent")
+    p.add_argument("--unit-size", type=int, default=UNIT_SIZE, help="seeds per work unit")
+    p.add_argument("--engine", choices=["scalar", "batched"], default="batched")
+    p.add_argument("--sketch-k", type=int, default=SKETCH_K, help="quantile sketch size per partial")
+    p.add_argument("--seed", type=int, default=0, help="root seed for the batched engine")
+
+    p = commands.add_parser("work", help="run units until the queue is drained")
+    p.add_argument("--queue", required=True)
+    p.add_argument("--processes", type=int, default=1, help="local worker processes")
+    p.add_argument("--lease", type=float, default=LEASE,
+                   help="seconds without a heartbeat before another worker takes a unit over")
+
+    p = commands.add_parser("status", help="unit counts by state")
+    p.add_argument("--queue", required=True)
+
+    p = commands.add_parser("requeue", help="return stale claims to pending")
+    p.add_argument("--queue", required=True)
+    p.add_argument("--lease", type=float, default=LEASE)
+
+    p = commands.add_parser("merge", help="combine partials and test H1–H3")
+    p.add_argument("--queue", required=True)
+    p.add_argument("--out", default=RESULTS_PATH)
+    p.add_argument("--partial", action="store_true", help="merge whatever is done so far")
+    args = parser.parse_args(argv)
+
+    if args.command == "plan":
+        units = plan_units(args.runs, args.unit_size, args.engine)
+        WorkQueue(args.queue).create({"n_runs": args.runs, "unit_size": args.unit_size, "engine": args.engine,
+                                      "k": args.sketch_k, "root_seed": args.seed}, units)
+        print(f"✅ Planned {len(units):,} units in {args.queue}")
+    elif args.command == "work":
+        if args.processes > 1:
+            with multiprocessing.get_context("spawn").Pool(args.processes) as pool:
+                ran = sum(pool.starmap(work, [(args.queue, args.lease)] * args.processes))
+        else:
+            ran = work(args.queue, args.lease)
+        print(f"✅ Ran {ran:,} units; {WorkQueue(args.queue).status()}")
+    elif args.command == "status":
+        print(WorkQueue(args.queue).status())
+    elif args.command == "requeue":
+        print(f"Requeued {WorkQueue(args.queue).requeue_stale(args.lease)} units")
+    elif args.command == "merge":
+        coordinate(args.queue, args.out, args.partial)
+
+
+if __name__ == "__main__":
+    main()
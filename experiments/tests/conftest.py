@@ -0,0 +1,5 @@
+import os
+import sys
+
+# experiments/ is a flat directory of scripts, imported by bare module name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
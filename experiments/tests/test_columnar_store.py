@@ -0,0 +1,66 @@
+import os
+
+import numpy as np
+import pytest
+
+from columnar_store import (decode_categorical, encode_categorical, load_categories, load_columns,
+                            read_schema, write_store)
+
+LABELS = ["success", "fail", "catastrophic"]
+
+
+def columns(n, seed=0):
+    rng = np.random.default_rng(seed)
+    values = rng.choice(LABELS, n).tolist()
+    return {"freedom": rng.random(n).astype(np.float32),
+            "outcome": encode_categorical(values, LABELS)}, values
+
+
+def test_round_trip(tmp_path):
+    store = str(tmp_path / "s.cols")
+    cols, values = columns(100)
+    write_store(store, cols, {"outcome": LABELS})
+    loaded = load_columns(store)
+    assert read_schema(store)["length"] == 100
+    np.testing.assert_array_equal(loaded["freedom"], cols["freedom"])
+    assert load_categories(store, "outcome") == LABELS
+    assert decode_categorical(loaded["outcome"], LABELS).tolist() == values
+
+
+def test_unequal_columns_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        write_store(str(tmp_path / "s.cols"), {"a": np.zeros(3), "b": np.zeros(4)})
+
+
+def test_overwrite_leaves_only_the_new_store(tmp_path):
+    store = str(tmp_path / "s.cols")
+    write_store(store, {"a": np.arange(3)})
+    write_store(store, {"a": np.arange(5)})
+    np.testing.assert_array_equal(load_columns(store)["a"], np.arange(5))
+    assert os.listdir(tmp_path) == ["s.cols"]
+
+
+def test_crash_between_renames_keeps_old_store_readable(tmp_path):
+    store = str(tmp_path / "s.cols")
+    write_store(store, {"a": np.arange(3)})
+    os.replace(store, f"{store}.old")  # the old store moved aside, the new one never arrived
+
+    np.testing.assert_array_equal(load_columns(store)["a"], np.arange(3))
+    assert read_schema(store)["length"] == 3
+
+    write_store(store, {"a": np.arange(4)})
+    np.testing.assert_array_equal(load_columns(store)["a"], np.arange(4))
+    assert os.listdir(tmp_path) == ["s.cols"]
+
+
+def test_crash_while_writing_keeps_old_store(tmp_path):
+    store = str(tmp_path / "s.cols")
+    write_store(store, {"a": np.arange(3)})
+    os.makedirs(f"{store}.tmp")  # a half-written replacement
+    with open(os.path.join(f"{store}.tmp", "a.npy"), "wb") as f:
+        f.write(b"\x93NUMPY")
+
+    np.testing.assert_array_equal(load_columns(store)["a"], np.arange(3))
+    write_store(store, {"a": np.arange(2)})
+    np.testing.assert_array_equal(load_columns(store)["a"], np.arange(2))
+    assert os.listdir(tmp_path) == ["s.cols"]
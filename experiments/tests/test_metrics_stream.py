@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from metrics_stream import OutcomeAccumulator, accumulate_chunks
+
+
+def outcomes(n=10_000, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(5.0, 2.0, n)
+    x[rng.random(n) < 0.03] = -10.0
+    return x
+
+
+def assert_matches(acc, x):
+    assert acc.count == len(x)
+    assert acc.mean == pytest.approx(x.mean(), rel=1e-12)
+    assert acc.std == pytest.approx(x.std(), rel=1e-12)
+    assert acc.min == x.min()
+    assert acc.catastrophic == np.count_nonzero(x < 0)
+
+
+def test_update_matches_numpy():
+    x = outcomes()
+    assert_matches(OutcomeAccumulator().update(x), x)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1_000, 9_999])
+def test_chunked_equals_whole(chunk_size):
+    x = outcomes()
+    chunks = iter(np.array_split(x, range(chunk_size, len(x), chunk_size)))
+    acc = accumulate_chunks(lambda k: next(chunks), len(x), chunk_size)
+    assert_matches(acc, x)
+
+
+def test_merge_equals_whole():
+    x = outcomes()
+    parts = [OutcomeAccumulator().update(part) for part in np.array_split(x, 13)]
+    merged = OutcomeAccumulator()
+    for part in parts:
+        merged.merge(part)
+    assert_matches(merged, x)
+
+
+def test_merge_empty_is_identity():
+    x = outcomes(100)
+    acc = OutcomeAccumulator().update(x)
+    acc.merge(OutcomeAccumulator())
+    assert_matches(acc, x)
+    assert_matches(OutcomeAccumulator().merge(acc), x)
+
+
+def test_merge_is_stable_for_large_offsets():
+    # a shifted stream must not lose its variance to cancellation
+    x = outcomes() + 1e9
+    merged = OutcomeAccumulator()
+    for part in np.array_split(x, 50):
+        merged.merge(OutcomeAccumulator().update(part))
+    assert merged.std == pytest.approx(x.std(), rel=1e-6)
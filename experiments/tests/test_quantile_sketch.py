@@ -0,0 +1,87 @@
+import json
+
+import numpy as np
+import pytest
+
+from judgment_vs_execution import AgentType, DistributionState, simulate_batch
+from quantile_sketch import QuantileSketch
+
+QS = np.linspace(0.01, 0.99, 25)
+
+
+def stream(n=50_000, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(0.0, 1.0, n)
+    x[rng.random(n) < 0.05] = -8.0  # a point mass, as catastrophic outcomes give
+    return x
+
+
+def rank_errors(sketch, x):
+    """How far q falls outside the true rank range of each estimate (ties span a range)."""
+    xs = np.sort(x)
+    est = sketch.quantiles(QS)
+    lo = np.searchsorted(xs, est, side="left") / len(xs)
+    hi = np.searchsorted(xs, est, side="right") / len(xs)
+    return np.maximum(0, np.maximum(lo - QS, QS - hi))
+
+
+def test_exact_up_to_k():
+    x = stream(200)
+    sketch = QuantileSketch(k=200).update(x)
+    assert sketch.exact and sketch.rank_error == 0.0
+    xs = np.sort(x)
+    np.testing.assert_array_equal(sketch.quantiles(QS), xs[(QS * len(x)).astype(int)])
+
+
+def test_whole_stream_within_rank_error():
+    x = stream()
+    sketch = QuantileSketch.for_error(0.01).update(x)
+    assert not sketch.exact
+    assert sketch.size() < len(x) // 10
+    assert rank_errors(sketch, x).max() <= sketch.rank_error
+    assert (sketch.min, sketch.max) == (x.min(), x.max())
+
+
+@pytest.mark.parametrize("parts", [2, 13, 100])
+def test_merged_chunks_within_rank_error(parts):
+    x = stream()
+    merged = QuantileSketch.for_error(0.01)
+    for i, part in enumerate(np.array_split(x, parts)):
+        merged.merge(QuantileSketch.for_error(0.01, seed=i).update(part))
+    assert merged.n == len(x)
+    assert (merged.min, merged.max) == (x.min(), x.max())
+    assert rank_errors(merged, x).max() <= merged.rank_error
+
+
+def test_dict_round_trip():
+    x = stream()
+    sketch = QuantileSketch(k=64).update(x[:30_000])
+    restored = QuantileSketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+    np.testing.assert_array_equal(restored.quantiles(QS), sketch.quantiles(QS))
+    assert restored.size() == sketch.size()
+    # the restored sketch keeps absorbing the stream
+    restored.update(x[30_000:])
+    assert restored.n == len(x)
+    assert rank_errors(restored, x).max() <= restored.rank_error
+
+
+def test_distribution_state_merge_equals_whole():
+    batches = [simulate_batch(AgentType.STRUCTURED_V7, range(i * 500, (i + 1) * 500), rng=i)
+               for i in range(8)]
+    whole = DistributionState("D")
+    for batch in batches:
+        whole.update(batch)
+    merged = DistributionState("D")
+    for i, batch in enumerate(batches):
+        part = DistributionState("D", seed=i).update(batch)
+        merged.merge(DistributionState.from_dict(json.loads(json.dumps(part.to_dict()))))
+
+    a, b = whole.metrics(), merged.metrics()
+    assert a.n_runs == b.n_runs == 4_000
+    assert a.catastrophic_rate == b.catastrophic_rate
+    assert a.avg_time_to_action == b.avg_time_to_action
+    assert b.mean == pytest.approx(a.mean, rel=1e-12)
+    assert b.std == pytest.approx(a.std, rel=1e-12)
+
+    x = np.concatenate([batch.outcome_quality for batch in batches])
+    assert rank_errors(merged.sketch, x).max() <= merged.sketch.rank_error
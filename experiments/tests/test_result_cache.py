@@ -0,0 +1,110 @@
+import os
+import random
+import time
+
+import numpy as np
+import pytest
+
+from result_cache import ResultCache, memoize
+
+CALLS = []
+SCALE = 2.0
+
+
+def kernel(n, rng=None):
+    CALLS.append(n)
+    return np.random.default_rng(rng).random(n)
+
+
+def helper():
+    return 1
+
+
+def seeded(n, seed, rng=None):
+    CALLS.append(n)
+    return random.Random(seed).random() * n
+
+
+def from_global(n):
+    CALLS.append(n)
+    return [random.random() for _ in range(n)]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    CALLS.clear()
+    return ResultCache(str(tmp_path), max_bytes=1 << 20)
+
+
+def test_hit_returns_stored_value(cache):
+    f = memoize(kernel, cache=cache)
+    first = f(10, 3)
+    np.testing.assert_array_equal(f(10, 3), first)
+    assert CALLS == [10]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_unseeded_and_live_rng_calls_bypass(cache):
+    f = memoize(kernel, cache=cache)
+    f(10)
+    f(10, np.random.default_rng(0))
+    assert cache.bypassed == 2 and cache.entries() == []
+
+
+def test_seed_arg_caches_calls_with_rng_none(cache):
+    f = memoize(seeded, cache=cache, seed_arg="seed")
+    assert f(3, 7) == f(3, 7)
+    assert CALLS == [3]
+    f(3, None)
+    assert cache.bypassed == 1
+
+
+def test_dependencies_and_constants_change_the_key(cache):
+    base = memoize(kernel, cache=cache).cache_key_source
+    assert memoize(kernel, cache=cache, depends_on=(helper,)).cache_key_source != base
+    salted = memoize(kernel, cache=cache, constants={"SCALE": SCALE}).cache_key_source
+    assert salted != base
+    assert memoize(kernel, cache=cache, constants={"SCALE": 3.0}).cache_key_source != salted
+
+
+def test_global_rng_hit_restores_stream(cache):
+    f = memoize(from_global, cache=cache, global_rng=random)
+    random.seed(1)
+    first, after_first = f(5), random.random()
+    random.seed(1)
+    assert f(5) == first
+    assert random.random() == after_first
+    assert CALLS == [5]
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=3000)
+    for i in range(3):
+        cache.put(f"{i:064x}", b"x" * 800)
+        time.sleep(0.01)
+    cache.get(f"{0:064x}")  # refresh entry 0
+    time.sleep(0.01)
+    cache.put(f"{3:064x}", b"x" * 800)
+
+    kept = {os.path.basename(p)[:64] for _, _, p in cache.entries()}
+    assert f"{1:064x}" not in kept
+    assert {f"{0:064x}", f"{3:064x}"} <= kept
+    assert cache.stats()["bytes"] <= 3000
+    assert cache._bytes == cache.stats()["bytes"]
+
+
+def test_overwrite_does_not_double_count(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=10_000)
+    for _ in range(5):
+        cache.put("ab" * 32, b"x" * 1000)
+    assert cache._bytes == cache.stats()["bytes"]
+    assert cache.evictions == 0
+
+
+def test_entry_evicted_after_load_is_still_a_hit(cache, monkeypatch):
+    cache.put("cd" * 32, 42)
+
+    def evicted(path, *args):
+        raise FileNotFoundError(path)
+    monkeypatch.setattr(os, "utime", evicted)
+    assert cache.get("cd" * 32) == (True, 42)
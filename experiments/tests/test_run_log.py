@@ -0,0 +1,79 @@
+import json
+import multiprocessing
+import os
+
+from run_log import RunLog
+
+
+def record(i, task="T1", condition="A"):
+    return {"task_id": task, "condition": condition, "timestamp": f"2026-01-0{1 + i % 3}T00:00:00",
+            "quality": float(i), "notes": "é" * (i % 4)}
+
+
+def filled(tmp_path, n=6):
+    log = RunLog(str(tmp_path))
+    log.append_many([record(i, condition="AB"[i % 2]) for i in range(n)])
+    return log
+
+
+def test_append_and_query(tmp_path):
+    log = filled(tmp_path)
+    assert len(log) == 6
+    assert [r["quality"] for r in log] == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+    assert [r["quality"] for r in log.query(condition="B")] == [1.0, 3.0, 5.0]
+    assert [r["quality"] for r in log.query(date="2026-01-02")] == [1.0, 4.0]
+
+
+def test_torn_log_tail_is_truncated(tmp_path):
+    log = filled(tmp_path)
+    size = os.path.getsize(log.log_path)
+    with open(log.log_path, "ab") as f:
+        f.write(b'{"task_id": "T1", "condit')  # crashed mid-write
+    log.recover()
+    assert os.path.getsize(log.log_path) == size
+    assert len(log) == 6
+    log.append(record(6))
+    assert [r["quality"] for r in log][-1] == 6.0
+
+
+def test_records_past_the_index_are_reindexed(tmp_path):
+    log = filled(tmp_path)
+    with open(log.log_path, "ab") as f:  # durable in the log, crashed before the index write
+        f.write((json.dumps(record(6, condition="B")) + "\n").encode())
+    log.recover()
+    assert len(log) == 7
+    assert [r["quality"] for r in log.query(condition="B")] == [1.0, 3.0, 5.0, 6.0]
+
+
+def test_torn_index_tail_is_repaired(tmp_path):
+    log = filled(tmp_path)
+    with open(log.index_path, "rb") as f:
+        lines = f.read().splitlines(keepends=True)
+    with open(log.index_path, "wb") as f:
+        f.write(b"".join(lines[:-1]) + lines[-1][:7])
+    assert len(log) == 5  # readers skip the torn entry
+    log.recover()
+    assert len(log) == 6
+    assert [r["quality"] for r in log] == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+def test_rebuild_index_matches_original(tmp_path):
+    log = filled(tmp_path)
+    original = log.read_index()
+    log.rebuild_index()
+    assert log.read_index() == original
+
+
+def _append_from_process(path, worker):
+    RunLog(path).append_many([record(worker * 100 + i) for i in range(50)])
+
+
+def test_concurrent_writers_do_not_interleave(tmp_path):
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_append_from_process, args=(str(tmp_path), w)) for w in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    log = RunLog(str(tmp_path))
+    assert sorted(r["quality"] for r in log) == sorted(float(w * 100 + i) for w in range(4) for i in range(50))
@@ -0,0 +1,107 @@
+import os
+import time
+
+import pytest
+
+from sharded_experiment import WorkQueue, merge_partials, plan_units, run_unit, work
+
+PLAN = {"n_runs": 600, "unit_size": 200, "engine": "scalar", "k": 64, "root_seed": 0}
+
+
+def planned(tmp_path, n_runs=600, unit_size=200):
+    queue = WorkQueue(str(tmp_path))
+    queue.create({**PLAN, "n_runs": n_runs, "unit_size": unit_size},
+                 plan_units(n_runs, unit_size, "scalar"))
+    return queue
+
+
+def age(path, seconds):
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+
+def test_plan_covers_every_seed_once():
+    units = plan_units(1_050, 200)
+    assert len(units) == 4 * 6
+    for agent in "ABCD":
+        spans = [(u["start"], u["stop"]) for u in units if u["agent"] == agent]
+        assert spans[0][0] == 0 and spans[-1][1] == 1_050
+        assert all(a[1] == b[0] for a, b in zip(spans, spans[1:]))
+
+
+def test_claims_are_exclusive(tmp_path):
+    queue = planned(tmp_path)
+    claimed = [queue.claim() for _ in range(12)]
+    assert len({unit["unit"] for unit in claimed}) == 12
+    assert queue.claim() is None
+    assert queue.status() == {"units": 12, "pending": 0, "claimed": 12, "done": 0}
+
+
+def test_claim_refreshes_the_lease(tmp_path):
+    queue = planned(tmp_path)
+    for name in os.listdir(queue.pending):
+        age(os.path.join(queue.pending, name), 7200)
+    queue.claim()
+    assert queue.requeue_stale(lease=60) == 0
+
+
+def test_expired_lease_is_requeued(tmp_path):
+    queue = planned(tmp_path)
+    unit = queue.claim()
+    age(os.path.join(queue.claimed, unit["unit"]), 7200)
+    assert queue.requeue_stale(lease=60) == 1
+    assert unit["unit"] in os.listdir(queue.pending)
+    assert queue.claim() == unit
+
+
+def test_heartbeat_keeps_the_lease(tmp_path):
+    queue = planned(tmp_path)
+    unit = queue.claim()
+    age(os.path.join(queue.claimed, unit["unit"]), 7200)
+    queue.heartbeat(unit)
+    assert queue.requeue_stale(lease=60) == 0
+
+
+def test_claim_skips_units_already_done(tmp_path):
+    queue = planned(tmp_path, n_runs=200)
+    unit = queue.claim()
+    age(os.path.join(queue.claimed, unit["unit"]), 7200)
+    queue.requeue_stale(lease=60)  # the slow worker finishes after its lease ran out
+    queue.complete(unit, run_unit(unit, k=64), "slow")
+    claimed = [queue.claim() for _ in range(4)]
+    assert unit not in claimed and None not in claimed[:3]
+    assert queue.claim() is None
+    assert unit["unit"] not in os.listdir(queue.claimed)
+
+
+def test_stale_claim_of_done_unit_is_dropped(tmp_path):
+    queue = planned(tmp_path, n_runs=200)
+    unit = queue.claim()
+    queue._write(queue.done, unit["unit"], {**unit, "state": run_unit(unit, k=64).to_dict()})
+    age(os.path.join(queue.claimed, unit["unit"]), 7200)
+    assert queue.requeue_stale(lease=60) == 0
+    assert unit["unit"] not in os.listdir(queue.claimed) + os.listdir(queue.pending)
+
+
+def test_planning_twice_is_refused(tmp_path):
+    planned(tmp_path)
+    with pytest.raises(FileExistsError):
+        planned(tmp_path)
+
+
+def test_sharded_run_matches_one_unit(tmp_path):
+    queue = planned(tmp_path)
+    assert work(str(tmp_path)) == 12
+    assert queue.status()["done"] == 12
+    states, merged = merge_partials(queue.partials())
+    assert merged == 12
+
+    for agent, state in states.items():
+        whole = run_unit({"agent": agent, "start": 0, "stop": 600, "engine": "scalar"}, k=64)
+        a, b = whole.metrics(), state.metrics()
+        assert b.n_runs == a.n_runs == 600
+        assert b.catastrophic_rate == a.catastrophic_rate
+        assert b.avg_time_to_action == a.avg_time_to_action
+        assert b.mean == pytest.approx(a.mean, rel=1e-12)
+        assert b.std == pytest.approx(a.std, rel=1e-12)
+        assert state.sketch.n == 600
@@ -0,0 +1,113 @@
+"""
+Twist Grid Sweep
+
+Every combination of twist knobs, crossed with S1/S2/V7.
+Each cell owns its RNG stream, so the table never depends on the worker count.
+"""
+
+import argparse
+import csv
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from adversarial_stress_test import ROOT_SEED, accumulate_system, cached_accumulate, cell_seed, effective_metrics
+from worker_budget import WORKERS_ENV, default_workers
+
+SYSTEMS = ['S1', 'S2', 'V7']
+
+TWIST_GRID = {
+    'cat_penalty': [-10, -50],
+    'freedom_boost': [0, 0.3],
+    'structure_erosion': [0, 0.1, 0.3],
+    'exec_spike': [1.0, 2.0],
+    'obs_noise': [0, 1.5],
+}
+
+N_SAMPLES = 100_000
+
+METRIC_FIELDS = ['mean', 'std', 'min', 'catastrophic', 'cat_rate', 'effective']
+
+
+def grid_cells(grid=None, systems=None):
+    """Yield (system_type, twist_config) for the full Cartesian grid."""
+    grid = grid or TWIST_GRID
+    knobs = list(grid)
+    for values in itertools.product(*(grid[k] for k in knobs)):
+        twist_config = dict(zip(knobs, values))
+        for system_type in systems or SYSTEMS:
+            yield system_type, twist_config
+
+
+def run_cell(cell, n=N_SAMPLES, root_seed=ROOT_SEED, use_cache=False):
+    system_type, twist_config = cell
+    seed = cell_seed(system_type, twist_config, root_seed)
+    if use_cache:
+        acc = cached_accumulate(system_type)(n, system_type, twist_config, seed)
+    else:
+        acc = accumulate_system(n, system_type, twist_config, seed)
+    row = {"system": system_type, **twist_config, "n": n}
+    row.update(effective_metrics(acc))
+    return row
+
+
+def _run_cell_args(args):
+    return run_cell(*args)
+
+
+def sweep(n=N_SAMPLES, grid=None, systems=None, workers=None, root_seed=ROOT_SEED,
+          use_cache=False):
+    """Run every grid cell over a process pool; rows come back in grid order."""
+    cells = list(grid_cells(grid, systems))
+    workers = workers or default_workers()
+    jobs = [(cell, n, root_seed, use_cache) for cell in cells]
+    if workers == 1:
+        return [_run_cell_args(job) for job in jobs]
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_run_cell_args, jobs, chunksize=chunksize))
+
+
+def save_table(rows, filepath="results/twist_grid_sweep.csv"):
+    os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+    fieldnames = ["system", *TWIST_GRID, "n", *METRIC_FIELDS]
+    with open(filepath, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    return filepath
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Full-factorial twist grid sweep")
+    parser.add_argument("--samples", type=int, default=N_SAMPLES, help="samples per cell")
+    parser.add_argument("--workers", type=int, default=None, help=f"process pool size (default: ${WORKERS_ENV}, else all cores)")
+    parser.add_argument("--seed", type=int, default=ROOT_SEED, help="root seed for every cell stream")
+    parser.add_argument("--out", default="results/twist_grid_sweep.csv")
+    parser.add_argument("--cache", action="store_true", help="reuse cached cell results")
+    args = parser.parse_args(argv)
+
+    print("=" * 70)
+    print("TWIST GRID SWEEP")
+    print("=" * 70)
+    n_cells = len(list(grid_cells()))
+    print(f"Cells: {n_cells}, samples/cell: {args.samples}, workers: {args.workers or default_workers()}")
+
+    rows = sweep(args.samples, workers=args.workers, root_seed=args.seed, use_cache=args.cache)
+    path = save_table(rows, args.out)
+
+    worst = {}
+    for row in rows:
+        if row["system"] not in worst or row["effective"] < worst[row["system"]]["effective"]:
+            worst[row["system"]] = row
+    print("\nWorst cell per system:")
+    for system_type in SYSTEMS:
+        row = worst[system_type]
+        knobs = ", ".join(f"{k}={row[k]}" for k in TWIST_GRID)
+        print(f"  {system_type}: Eff={row['effective']}, Cat={row['cat_rate']}%  ({knobs})")
+
+    print(f"\n✅ Saved: {path}")
+
+
+if __name__ == "__main__":
+    main()
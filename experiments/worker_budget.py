@@ -0,0 +1,16 @@
+"""
+Worker Budget
+
+How many processes a stage may use. pipeline.py splits the cores between
+the stages it runs concurrently and exports each stage's share in
+EXPERIMENT_WORKERS; process pools started inside a stage default to it.
+"""
+
+import os
+
+WORKERS_ENV = "EXPERIMENT_WORKERS"
+
+
+def default_workers() -> int:
+    """The pipeline's per-stage budget if set, else every core."""
+    return int(os.environ.get(WORKERS_ENV) or 0) or os.cpu_count() or 1